@@ -0,0 +1,374 @@
+"""Benchmark cases for the request hot paths, run by benchmarks.runner.
+
+Each case is a generator function: it builds its fixtures, yields the
+operation to time and cleans up once the runner closes it.
+"""
+
+import contextlib
+from datetime import datetime, timedelta
+import functools
+import os
+import shutil
+import tempfile
+
+from shrikenet import create_app
+from shrikenet.adapters.login_throttle import MemoryLoginThrottle
+from shrikenet.adapters.markdown import MarkdownAdapter
+from shrikenet.adapters.memory import Memory
+from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.adapters.sqlite_pool import close_all_pools
+from shrikenet.adapters.swapcase import SwapcaseAdapter
+from shrikenet.adapters.zxcvbn import zxcvbnAdapter
+from shrikenet.api.token_authority import create_token
+from shrikenet.db import get_services, init_db
+from shrikenet.entities.app_user import AppUser
+from shrikenet.entities.post import Post
+from shrikenet.entities.services import Services
+from shrikenet.usecases.login_to_system import LoginToSystem
+
+USERNAME = "fmulder"
+PASSWORD = "likesScully!"
+IP_ADDRESS = "1.2.3.4"
+SECRET_KEY = "benchmark-secret-key-0123456789abcdef"
+
+FIELD_NOTES = (
+    "## Field notes\n\n"
+    "The **truth** is out there, and it is *probably* in a "
+    "[basement](https://example.com/basement) somewhere.\n\n"
+    "- item one with `inline code`\n"
+    "- item two\n"
+    "- item three\n\n"
+    "```python\nprint('hello, world')\n```\n\n"
+    "| case | status |\n|------|--------|\n| X-1  | open   |\n\n"
+)
+MARKDOWN_BODY = FIELD_NOTES * 8
+SEARCH_CASE_COUNT = 1000  # each search case term is in 1 of this many posts
+
+
+def create_app_user(db, username=USERNAME, password=PASSWORD):
+    password_hash = SwapcaseAdapter().generate_hash_from_string(password)
+    app_user = AppUser(username, "Fox Mulder", password_hash)
+    if isinstance(db, Memory):
+        app_user.oid = db.get_next_app_user_oid()
+        db.add_app_user(app_user)
+    else:
+        app_user.oid = db.add_app_user(app_user)
+    db.commit()
+    return app_user
+
+
+def create_memory():
+    db = Memory()
+    db.open()
+    return db
+
+
+@contextlib.contextmanager
+def scratch_directory():
+    work_dir = tempfile.mkdtemp(prefix="shrikenet-bench-")
+    try:
+        yield work_dir
+    finally:
+        close_all_pools()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def create_login_services(db):
+    rules = db.get_rules()
+    rules.login_fail_threshold_count = 10**9  # never lock the user
+    db.save_rules(rules)
+    db.commit()
+    return Services(db, None, SwapcaseAdapter(), zxcvbnAdapter())
+
+
+def login_case(create_db, password):
+    with scratch_directory() as work_dir:
+        db = create_db(work_dir)
+        create_app_user(db)
+        login_to_system = LoginToSystem(create_login_services(db))
+        operation = functools.partial(
+            login_to_system.run, USERNAME, password, IP_ADDRESS
+        )
+        if isinstance(db, SQLiteAdapter):
+            yield operation, lambda: {"statements": db.statement_count}
+        else:
+            yield operation
+        db.close()
+
+
+def throttled_login_case(create_db):
+    with scratch_directory() as work_dir:
+        db = create_db(work_dir)
+        create_app_user(db)
+        services = create_login_services(db)
+        services.login_throttle = MemoryLoginThrottle()
+        login_to_system = LoginToSystem(services)
+        attempt = functools.partial(
+            login_to_system.run, "unknown", PASSWORD, IP_ADDRESS
+        )
+        for _ in range(db.get_rules().login_throttle_ip_attempts + 1):
+            attempt()  # use up the allowance so each attempt is rejected
+        yield attempt, lambda: {"statements": db.statement_count}
+        db.close()
+
+
+def create_sqlite(work_dir):
+    db = SQLiteAdapter(os.path.join(work_dir, "bench.db"))
+    db.open()
+    db.build_database_schema()
+    db.commit()
+    return db
+
+
+def create_test_app(work_dir, **config):
+    app_config = {
+        "TESTING": True,
+        "SECRET_KEY": SECRET_KEY,
+        "STORAGE_PROVIDER_DB": os.path.join(work_dir, "bench.db"),
+        "CRYPTO_PROVIDER_MODULE": "shrikenet.adapters.swapcase",
+        "CRYPTO_PROVIDER_CLASS": "SwapcaseAdapter",
+        "LOGGING_LEVEL": "WARNING",
+    }
+    app_config.update(config)
+    app = create_app(app_config)
+    with app.app_context():
+        init_db()
+    return app
+
+
+def insert_posts(app, count, author_oid):
+    start_time = datetime(2020, 1, 1)
+    rows = [
+        (
+            f"Post #{index}",
+            MARKDOWN_BODY,
+            author_oid,
+            (start_time + timedelta(minutes=index)).isoformat(
+                timespec="microseconds"
+            ),
+        )
+        for index in range(count)
+    ]
+    with app.app_context():
+        db = get_services().storage_provider
+        db.connection.executemany(
+            "INSERT INTO post (title, body, author_oid, created_time) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        db.connection.execute("ANALYZE")
+        db.commit()
+
+
+def blog_index_case(post_count):
+    with scratch_directory() as work_dir:
+        app = create_test_app(work_dir)
+        with app.app_context():
+            author = create_app_user(get_services().storage_provider)
+        insert_posts(app, post_count, author.oid)
+        client = app.test_client()
+        yield functools.partial(client.get, "/")
+
+
+def verify_token_case(token_cache_size):
+    with scratch_directory() as work_dir:
+        app = create_test_app(work_dir, TOKEN_CACHE_SIZE=token_cache_size)
+        with app.app_context():
+            user = create_app_user(get_services().storage_provider)
+        expire_time = datetime.now() + timedelta(days=1)
+        token = create_token(user.oid, expire_time, SECRET_KEY)
+        client = app.test_client()
+        yield functools.partial(
+            client.post, "/api/verify_token", headers={"TOKEN": token}
+        )
+
+
+def sqlite_crud_case(operation_name):
+    with scratch_directory() as work_dir:
+        db = create_sqlite(work_dir)
+        author = create_app_user(db)
+        post = Post(
+            "a title",
+            MARKDOWN_BODY,
+            author_oid=author.oid,
+            created_time=datetime.now(),
+        )
+        post.oid = db.add_post(post)
+        db.commit()
+
+        def add_post():
+            db.add_post(post)
+            db.commit()
+
+        def update_post():
+            db.update_post(post)
+            db.commit()
+
+        def add_and_delete_post():
+            db.delete_post_by_oid(db.add_post(post))
+            db.commit()
+
+        operations = {
+            "add_post": add_post,
+            "get_post_by_oid": functools.partial(
+                db.get_post_by_oid, post.oid
+            ),
+            "update_post": update_post,
+            "add_and_delete_post": add_and_delete_post,
+            "get_app_user_by_username": functools.partial(
+                db.get_app_user_by_username, USERNAME
+            ),
+            "get_app_user_by_oid": functools.partial(
+                db.get_app_user_by_oid, author.oid
+            ),
+        }
+        yield operations[operation_name]
+        db.close()
+
+
+def memory_commit_case(user_count, change_count):
+    db = create_memory()
+    for index in range(user_count):
+        create_app_user(db, f"user{index}")
+    app_users = [
+        db.get_app_user_by_username(f"user{index}")
+        for index in range(change_count)
+    ]
+
+    def update_and_commit():
+        for app_user in app_users:
+            app_user.ongoing_password_failure_count += 1
+            db.update_app_user(app_user)
+        db.commit()
+
+    yield update_and_commit
+    db.close()
+
+
+def memory_posts_page_case(post_count):
+    db = create_memory()
+    author = create_app_user(db)
+    start_time = datetime(2020, 1, 1)
+    for index in range(post_count):
+        post = Post(
+            f"Post #{index}",
+            MARKDOWN_BODY,
+            oid=db.get_next_post_oid(),
+            author_oid=author.oid,
+            created_time=start_time + timedelta(minutes=index),
+        )
+        db.add_post(post)
+    db.commit()
+    middle = db.get_posts_page(limit=post_count // 2)[-1]
+    yield functools.partial(
+        db.get_posts_page,
+        before_created_time=middle.created_time,
+        before_oid=middle.oid,
+        limit=21,
+    )
+    db.close()
+
+
+def search_posts_case(create_db, post_count):
+    with scratch_directory() as work_dir:
+        db = create_db(work_dir)
+        author = create_app_user(db)
+        start_time = datetime(2020, 1, 1)
+        posts = [
+            Post(
+                f"Post #{index}",
+                f"{FIELD_NOTES}Filed as case{index % SEARCH_CASE_COUNT}.",
+                author_oid=author.oid,
+                created_time=start_time + timedelta(minutes=index),
+            )
+            for index in range(post_count)
+        ]
+        db.add_posts(posts)
+        db.commit()
+        yield functools.partial(
+            db.search_posts, "basement case42", limit=21
+        )
+        db.close()
+
+
+def markdown_case():
+    transformer = MarkdownAdapter()
+    yield functools.partial(transformer.transform_to_html, MARKDOWN_BODY)
+
+
+CASES = {
+    "login.memory.success": functools.partial(
+        login_case, lambda work_dir: create_memory(), PASSWORD
+    ),
+    "login.memory.wrong_password": functools.partial(
+        login_case, lambda work_dir: create_memory(), "wrong"
+    ),
+    "login.sqlite.success": functools.partial(
+        login_case, create_sqlite, PASSWORD
+    ),
+    "login.sqlite.wrong_password": functools.partial(
+        login_case, create_sqlite, "wrong"
+    ),
+    "login.sqlite.throttled": functools.partial(
+        throttled_login_case, create_sqlite
+    ),
+    "api.verify_token.cached": functools.partial(verify_token_case, 10000),
+    "api.verify_token.uncached": functools.partial(verify_token_case, 0),
+    "blog.index.10_posts": functools.partial(blog_index_case, 10),
+    "blog.index.1k_posts": functools.partial(blog_index_case, 1000),
+    "blog.index.100k_posts": functools.partial(blog_index_case, 100000),
+    "sqlite.add_post": functools.partial(sqlite_crud_case, "add_post"),
+    "sqlite.get_post_by_oid": functools.partial(
+        sqlite_crud_case, "get_post_by_oid"
+    ),
+    "sqlite.update_post": functools.partial(
+        sqlite_crud_case, "update_post"
+    ),
+    "sqlite.add_and_delete_post": functools.partial(
+        sqlite_crud_case, "add_and_delete_post"
+    ),
+    "sqlite.get_app_user_by_username": functools.partial(
+        sqlite_crud_case, "get_app_user_by_username"
+    ),
+    "sqlite.get_app_user_by_oid": functools.partial(
+        sqlite_crud_case, "get_app_user_by_oid"
+    ),
+    "memory.commit.1_change.1k_users": functools.partial(
+        memory_commit_case, 1000, 1
+    ),
+    "memory.commit.1_change.100k_users": functools.partial(
+        memory_commit_case, 100000, 1
+    ),
+    "memory.commit.100_changes.100k_users": functools.partial(
+        memory_commit_case, 100000, 100
+    ),
+    "memory.get_posts_page.1k_posts": functools.partial(
+        memory_posts_page_case, 1000
+    ),
+    "memory.get_posts_page.100k_posts": functools.partial(
+        memory_posts_page_case, 100000
+    ),
+    "search.sqlite.1k_posts": functools.partial(
+        search_posts_case, create_sqlite, 1000
+    ),
+    "search.sqlite.100k_posts": functools.partial(
+        search_posts_case, create_sqlite, 100000
+    ),
+    "search.memory.1k_posts": functools.partial(
+        search_posts_case, lambda work_dir: create_memory(), 1000
+    ),
+    "search.memory.100k_posts": functools.partial(
+        search_posts_case, lambda work_dir: create_memory(), 100000
+    ),
+    "markdown.transform_to_html": markdown_case,
+}
+
+# too slow to set up for a --quick run
+SLOW_CASES = {
+    "blog.index.100k_posts",
+    "memory.commit.1_change.100k_users",
+    "memory.commit.100_changes.100k_users",
+    "memory.get_posts_page.100k_posts",
+    "search.sqlite.100k_posts",
+    "search.memory.100k_posts",
+}
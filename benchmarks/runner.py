@@ -0,0 +1,173 @@
+"""Time the request hot paths and save the results as JSON.
+
+Every case builds its own fixtures (Memory or a scratch SQLite database,
+SwapcaseAdapter in place of real password hashing) and is timed
+in-process, so runs on the same machine can be compared between
+commits:
+
+    python -m benchmarks.runner --output before.json
+    python -m benchmarks.runner --output after.json --compare before.json
+
+Use --quick for a short smoke run and --filter to select cases by name.
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+
+from benchmarks.hot_paths import CASES, SLOW_CASES
+
+MIN_ROUNDS = 5
+MIN_SECONDS = 1.0
+QUICK_MIN_SECONDS = 0.1
+
+
+def measure(operation, min_rounds=MIN_ROUNDS, min_seconds=MIN_SECONDS):
+    operation()  # warm up caches and lazily created objects
+    durations = []
+    stop_time = time.perf_counter() + min_seconds
+    while len(durations) < min_rounds or time.perf_counter() < stop_time:
+        start = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return {
+        "rounds": len(durations),
+        "mean_ms": statistics.mean(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "p95_ms": durations[int(len(durations) * 0.95)] * 1000,
+        "min_ms": durations[0] * 1000,
+        "max_ms": durations[-1] * 1000,
+        "ops_per_second": len(durations) / sum(durations),
+    }
+
+
+def run_case(case, min_seconds=MIN_SECONDS):
+    """Run one case, a generator that sets up its fixtures, yields the
+    operation to time and cleans up when closed.
+
+    A case may yield (operation, get_counts) instead, get_counts returning
+    running totals such as {"statements": 12}; the result then also holds
+    each total's average per operation.
+    """
+    fixture = case()
+    try:
+        operation = next(fixture)
+        if not isinstance(operation, tuple):
+            return measure(operation, min_seconds=min_seconds)
+        operation, get_counts = operation
+        return measure_counted(operation, get_counts, min_seconds)
+    finally:
+        fixture.close()
+
+
+def measure_counted(operation, get_counts, min_seconds):
+    calls = 0
+
+    def counted_operation():
+        nonlocal calls
+        calls += 1
+        operation()
+
+    before = get_counts()
+    result = measure(counted_operation, min_seconds=min_seconds)
+    after = get_counts()
+    result["per_operation"] = {
+        name: (after[name] - before[name]) / calls for name in after
+    }
+    return result
+
+
+def run(names=None, quick=False, report=None):
+    min_seconds = QUICK_MIN_SECONDS if quick else MIN_SECONDS
+    results = {}
+    for name, case in CASES.items():
+        if names is not None and not any(part in name for part in names):
+            continue
+        if quick and name in SLOW_CASES:
+            continue
+        results[name] = run_case(case, min_seconds)
+        if report is not None:
+            report(name, results[name])
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def create_report(results):
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def print_result(name, result):
+    counts = "".join(
+        f"  {value:.1f} {count_name}/op"
+        for count_name, value in result.get("per_operation", {}).items()
+    )
+    print(
+        f"{name:<40} {result['median_ms']:10.4f} ms median  "
+        f"{result['p95_ms']:10.4f} ms p95  "
+        f"{result['ops_per_second']:12.1f} ops/s{counts}"
+    )
+
+
+def print_comparison(results, baseline):
+    print()
+    print(
+        f"compared with {baseline.get('commit')} ({baseline['created']}):"
+    )
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = (result["median_ms"] / before["median_ms"] - 1) * 100
+        print(
+            f"{name:<40} {before['median_ms']:10.4f} -> "
+            f"{result['median_ms']:10.4f} ms  {change:+7.1f}%"
+        )
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--compare", help="a previous result file")
+    parser.add_argument(
+        "--filter",
+        action="append",
+        help="only run cases whose name contains this (repeatable)",
+    )
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.quick, report=print_result)
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(create_report(results), output_file, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            print_comparison(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
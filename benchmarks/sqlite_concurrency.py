@@ -0,0 +1,151 @@
+"""Measure reader latency while a writer commits log entries.
+
+Runs one writer process that records log entries the way
+LoginToSystem._record_log_entry does (insert then commit) alongside
+several reader processes that fetch the blog index, first with SQLite's
+default settings and then with the tuned PRAGMA profile used by
+create_app. With the rollback journal every commit blocks the readers;
+with WAL they proceed concurrently.
+
+    python -m benchmarks.sqlite_concurrency [--readers N] [--seconds S]
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.entities.log_entry import LogEntry
+from shrikenet.entities.post import Post
+
+DEFAULT_PROFILE = {}
+TUNED_PROFILE = {
+    "STORAGE_PROVIDER_BUSY_TIMEOUT_MS": 5000,
+    "STORAGE_PROVIDER_JOURNAL_MODE": "WAL",
+    "STORAGE_PROVIDER_SYNCHRONOUS": "NORMAL",
+    "STORAGE_PROVIDER_CACHE_SIZE": -16000,
+    "STORAGE_PROVIDER_MMAP_SIZE": 134217728,
+    "STORAGE_PROVIDER_TEMP_STORE": "MEMORY",
+}
+POST_COUNT = 50
+
+
+def build_database(config):
+    db = SQLiteAdapter(config)
+    db.open()
+    db.build_database_schema()
+    for index in range(POST_COUNT):
+        post = Post(f"title #{index}", f"body #{index} " * 20)
+        post.author_oid = None
+        post.created_time = datetime.now()
+        db.add_post(post)
+    db.commit()
+    db.close()
+
+
+def run_writer(config, stop_time, results):
+    db = SQLiteAdapter(config)
+    db.open()
+    commits = 0
+    while time.monotonic() < stop_time:
+        log_entry = LogEntry(
+            -1, datetime.now(), None, "bench", "benchmark entry", "bench"
+        )
+        db.add_log_entry(log_entry)
+        db.commit()
+        commits += 1
+    db.close()
+    results.put(("writer", commits, []))
+
+
+def run_reader(config, stop_time, results):
+    db = SQLiteAdapter(config)
+    db.open()
+    latencies = []
+    while time.monotonic() < stop_time:
+        start = time.perf_counter()
+        db.get_posts()
+        db.rollback()  # end the read transaction like a request would
+        latencies.append(time.perf_counter() - start)
+    db.close()
+    results.put(("reader", len(latencies), latencies))
+
+
+def run_profile(name, profile, reader_count, seconds, work_dir):
+    config = dict(profile)
+    config["STORAGE_PROVIDER_DB"] = os.path.join(work_dir, f"{name}.db")
+    build_database(config)
+
+    results = multiprocessing.Queue()
+    stop_time = time.monotonic() + seconds
+    processes = [
+        multiprocessing.Process(
+            target=run_writer, args=(config, stop_time, results)
+        )
+    ]
+    for _ in range(reader_count):
+        processes.append(
+            multiprocessing.Process(
+                target=run_reader, args=(config, stop_time, results)
+            )
+        )
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    commits = sum(count for role, count, _ in outcomes if role == "writer")
+    latencies = sorted(
+        latency
+        for role, _, reader_latencies in outcomes
+        if role == "reader"
+        for latency in reader_latencies
+    )
+    return {
+        "profile": name,
+        "writer_commits_per_second": commits / seconds,
+        "reads_per_second": len(latencies) / seconds,
+        "read_median_ms": statistics.median(latencies) * 1000,
+        "read_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "read_max_ms": latencies[-1] * 1000,
+    }
+
+
+def print_result(result):
+    print(
+        f"{result['profile']:>8}: "
+        f"{result['writer_commits_per_second']:9.1f} commits/s  "
+        f"{result['reads_per_second']:9.1f} reads/s  "
+        f"median {result['read_median_ms']:7.3f} ms  "
+        f"p99 {result['read_p99_ms']:7.3f} ms  "
+        f"max {result['read_max_ms']:8.3f} ms"
+    )
+
+
+def run(reader_count=4, seconds=3.0):
+    with tempfile.TemporaryDirectory() as work_dir:
+        return [
+            run_profile(name, profile, reader_count, seconds, work_dir)
+            for name, profile in (
+                ("default", DEFAULT_PROFILE),
+                ("tuned", TUNED_PROFILE),
+            )
+        ]
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    for result in run(args.readers, args.seconds):
+        print_result(result)
+
+
+if __name__ == "__main__":
+    main()
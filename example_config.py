@@ -1,12 +1,41 @@
 # Flask
 # SECRET_KEY = 'server-dev'
 # TOKEN_LIFESPAN_DAYS = 30
+# TOKEN_CACHE_SIZE = 10000
+# TOKEN_CACHE_SECONDS = 5
+# (verified API tokens are cached per process for up to TOKEN_CACHE_SECONDS
+# so token checks skip the database; a size of 0 disables the cache. Only
+# a login in the same process drops a user's entries, so a lock, dormancy
+# or password change made by another worker or the CLI is not seen for up
+# to this long; raise it only if that delay is acceptable)
 SECRET_KEY = "changeThisLMAO"
 
 # StorageProvider
 # STORAGE_PROVIDER_MODULE = 'shrikenet.adapters.sqlite'
 # STORAGE_PROVIDER_CLASS = 'SQLiteAdapter'
 # STORAGE_PROVIDER_DB = "instance/server-dev.db"
+# STORAGE_PROVIDER_POOL_SIZE = 5
+# STORAGE_PROVIDER_POOL_MAX_IDLE_SECONDS = 300
+# STORAGE_PROVIDER_POOL_TIMEOUT_SECONDS = 10
+# (SQLiteAdapter connections are pooled per process; 0 disables pooling)
+# STORAGE_PROVIDER_BUSY_TIMEOUT_MS = 5000
+# STORAGE_PROVIDER_JOURNAL_MODE = "WAL"
+# STORAGE_PROVIDER_SYNCHRONOUS = "NORMAL"
+# STORAGE_PROVIDER_CACHE_SIZE = -16000
+# STORAGE_PROVIDER_MMAP_SIZE = 134217728
+# STORAGE_PROVIDER_TEMP_STORE = "MEMORY"
+# (SQLite PRAGMAs applied to each new connection; None leaves SQLite's
+# default, a negative CACHE_SIZE is in KiB rather than pages)
+# STORAGE_PROVIDER_RULES_CACHE_SECONDS = 30
+# (seconds cached rules are trusted before rechecking their change count;
+# 0 reads the rule table on every get_rules)
+# STORAGE_PROVIDER_CACHED_STATEMENTS = 256
+# (prepared statements each SQLite connection keeps for reuse)
+# STORAGE_PROVIDER_INSTRUMENT = False
+# STORAGE_PROVIDER_SLOW_QUERY_MS = 100
+# (INSTRUMENT times each SQL statement of a request, logs those taking
+# SLOW_QUERY_MS or more without their parameters, and in debug mode adds
+# X-DB-Time and Server-Timing headers to responses)
 
 # TextTransformer (Markup)
 # TEXT_TRANSFORMER_MODULE = 'shrikenet.adapters.markdown'
@@ -17,6 +46,11 @@ SECRET_KEY = "changeThisLMAO"
 # CRYPTO_PROVIDER_CLASS = "WerkzeugAdapter"
 # shrikenet.adapters.swapcase / SwapcaseAdapter is available
 # (insecure, used to ease hand entry of app_user records for testing)
+# CRYPTO_PROVIDER_POOL_SIZE = 0
+# CRYPTO_PROVIDER_QUEUE_SIZE = 16
+# CRYPTO_PROVIDER_TIMEOUT_SECONDS = 10
+# (POOL_SIZE > 0 runs hashing on that many worker processes per server
+# process; requests beyond POOL_SIZE + QUEUE_SIZE are refused with 503)
 
 # PasswordChecker
 # PASSWORD_CHECKER_MODULE = "shrikenet.adapters.zxcvbn"
@@ -32,3 +66,51 @@ SECRET_KEY = "changeThisLMAO"
 LOGGING_FILE = "instance/server-dev.log"
 # LOGGING_FILE_MAX_BYTES = 102400
 # LOGGING_FILE_BACKUP_COUNT = 5
+# LOG_ENTRY_BUFFER_SIZE = 100
+# LOG_ENTRY_FLUSH_SECONDS = 1.0
+# (business log entries, e.g. login attempts, are stored in batches by a
+# background thread; a size of 0 stores each one as it happens, as does
+# a storage provider whose instances do not share their data)
+# LOG_ENTRY_BUFFER_LIMIT = 10000
+# (entries kept for retry while the database can not be written; older
+# ones beyond this are logged and dropped)
+# LOG_ENTRY_SYNCHRONOUS = False
+# (True stores each buffered entry before the request goes on, e.g. for
+# tests that read back the entries they caused)
+
+# Login throttling (limits are the login_throttle_* rules)
+# LOGIN_THROTTLE_DB = None
+# (None counts attempts per process; a SQLite file path shares the counts
+# between workers)
+# LOGIN_THROTTLE_MAX_KEYS = 100000
+# (IP addresses and usernames tracked per process when not shared)
+# TRUSTED_PROXY_COUNT = 0
+# (attempts are counted per request.remote_addr; behind a reverse proxy or
+# load balancer that is the proxy, so every client shares one limit. Set
+# this to the number of proxies in front of the app to read the client
+# address from X-Forwarded-For instead. Only set it when those proxies
+# overwrite the header, as clients could otherwise pick their address)
+
+# Metrics
+# METRICS_ENABLED = False
+# (True counts requests, logins, token checks, hashing and rendering and
+# serves them at /metrics in the Prometheus text format; SQL timings also
+# need STORAGE_PROVIDER_INSTRUMENT)
+# METRICS_DIR = None
+# METRICS_FLUSH_SECONDS = 1.0
+# (None keeps the counts per process; a directory, emptied before each
+# start, adds up the counts of every worker process, each written there
+# at most every FLUSH_SECONDS)
+
+# Blog
+# POSTS_PER_PAGE = 20
+# FEED_POST_COUNT = 20
+# (newest posts listed in /feed.atom)
+# BLOG_CACHE_MAX_AGE = 0
+# (seconds a shared cache may serve the anonymous index and the feed
+# before revalidating them with their ETag)
+# POST_HTML_CACHE_SIZE = 1000
+# (rendered post bodies kept in memory per process; 0 disables)
+# POST_BODY_HTML_PERSIST = False
+# (store rendered bodies in post.body_html so views skip rendering; run
+# "flask upgrade-db" on databases built before the column was added)
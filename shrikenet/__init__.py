@@ -3,6 +3,7 @@ from logging.handlers import RotatingFileHandler
 import os
 
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +17,49 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY=DEV_SECRET_KEY,
         TOKEN_LIFESPAN_DAYS=30,
+        TOKEN_CACHE_SIZE=10000,
+        TOKEN_CACHE_SECONDS=5,
         STORAGE_PROVIDER_MODULE="shrikenet.adapters.sqlite",
         STORAGE_PROVIDER_CLASS="SQLiteAdapter",
         STORAGE_PROVIDER_DB="instance/server-dev.db",
+        STORAGE_PROVIDER_POOL_SIZE=5,
+        STORAGE_PROVIDER_POOL_MAX_IDLE_SECONDS=300,
+        STORAGE_PROVIDER_POOL_TIMEOUT_SECONDS=10,
+        STORAGE_PROVIDER_BUSY_TIMEOUT_MS=5000,
+        STORAGE_PROVIDER_JOURNAL_MODE="WAL",
+        STORAGE_PROVIDER_SYNCHRONOUS="NORMAL",
+        STORAGE_PROVIDER_CACHE_SIZE=-16000,
+        STORAGE_PROVIDER_MMAP_SIZE=134217728,
+        STORAGE_PROVIDER_TEMP_STORE="MEMORY",
+        STORAGE_PROVIDER_RULES_CACHE_SECONDS=30,
+        STORAGE_PROVIDER_CACHED_STATEMENTS=256,
+        STORAGE_PROVIDER_INSTRUMENT=False,
+        STORAGE_PROVIDER_SLOW_QUERY_MS=100,
         TEXT_TRANSFORMER_MODULE="shrikenet.adapters.markdown",
         TEXT_TRANSFORMER_CLASS="MarkdownAdapter",
         CRYPTO_PROVIDER_MODULE="shrikenet.adapters.werkzeug",
-        CRYPTO_PROVIDER_CLASS="Werkzeug",
+        CRYPTO_PROVIDER_CLASS="WerkzeugAdapter",
+        CRYPTO_PROVIDER_POOL_SIZE=0,
+        CRYPTO_PROVIDER_QUEUE_SIZE=16,
+        CRYPTO_PROVIDER_TIMEOUT_SECONDS=10,
         PASSWORD_CHECKER_MODULE="shrikenet.adapters.zxcvbn",
         PASSWORD_CHECKER_CLASS="zxcvbnAdapter",
         PASSWORD_MIN_STRENGTH=2,
+        LOG_ENTRY_BUFFER_SIZE=100,
+        LOG_ENTRY_FLUSH_SECONDS=1.0,
+        LOG_ENTRY_BUFFER_LIMIT=10000,
+        LOG_ENTRY_SYNCHRONOUS=False,
+        LOGIN_THROTTLE_DB=None,
+        LOGIN_THROTTLE_MAX_KEYS=100000,
+        TRUSTED_PROXY_COUNT=0,
+        METRICS_ENABLED=False,
+        METRICS_DIR=None,
+        METRICS_FLUSH_SECONDS=1.0,
+        POSTS_PER_PAGE=20,
+        FEED_POST_COUNT=20,
+        BLOG_CACHE_MAX_AGE=0,
+        POST_HTML_CACHE_SIZE=1000,
+        POST_BODY_HTML_PERSIST=False,
         LOGGING_FORMAT="%(asctime)s %(levelname)s %(name)s -> %(message)s",
         LOGGING_DATE_FORMAT="%Y-%m-%d %H:%M:%S",
         LOGGING_LEVEL="DEBUG",
@@ -41,6 +75,12 @@ def create_app(test_config=None):
         # load the test config if passed in
         app.config.from_mapping(test_config)
 
+    # behind proxies, take the client address from X-Forwarded-For, so
+    # the login throttle and logs see clients rather than the proxy
+    trusted_proxy_count = app.config["TRUSTED_PROXY_COUNT"]
+    if trusted_proxy_count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxy_count)
+
     # ensure the instance folder exists
     try:
         os.makedirs(app.instance_path)
@@ -84,6 +124,10 @@ def create_app(test_config=None):
 
     db.init_app(app)
 
+    from . import metrics
+
+    metrics.init_app(app)
+
     from . import auth
 
     app.register_blueprint(auth.bp)
@@ -0,0 +1,146 @@
+import atexit
+import logging
+import threading
+
+from shrikenet.entities.log_entry_writer import LogEntryWriter
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedLogEntryWriter(LogEntryWriter):
+    """Collects log entries and stores them in batches.
+
+    A background thread flushes the buffer every max_seconds, or sooner
+    once it holds max_entries, in a single transaction on a connection
+    of its own from storage_provider_factory. In synchronous mode each
+    write is flushed before it returns, which suits tests. Whatever is
+    still buffered is flushed by close(), which also runs at exit.
+
+    Entries that fail to store are kept for the next flush, up to
+    max_buffered; beyond that the oldest are logged and dropped so an
+    unwritable database can not exhaust memory.
+    """
+
+    DEFAULT_MAX_BUFFERED = 10000
+
+    def __init__(
+        self,
+        storage_provider_factory,
+        max_entries=100,
+        max_seconds=1.0,
+        synchronous=False,
+        max_buffered=DEFAULT_MAX_BUFFERED,
+    ):
+        self.storage_provider_factory = storage_provider_factory
+        self.max_entries = max_entries
+        self.max_seconds = max_seconds
+        self.synchronous = synchronous
+        self.max_buffered = max_buffered
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._is_closed = False
+        self.flush_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        atexit.register(self.close)
+
+    def write(self, log_entry):
+        with self._buffer_lock:
+            self._buffer.append(log_entry)
+            dropped = self._trim_buffer()
+            buffered_count = len(self._buffer)
+        self._log_dropped(dropped)
+        if self.synchronous or self._is_closed:
+            self.flush()
+            return
+        self._start_thread()
+        if buffered_count >= self.max_entries:
+            self._wakeup.set()
+
+    def _start_thread(self):
+        if self._thread is not None:
+            return
+        with self._buffer_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="BufferedLogEntryWriter",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._is_closed:
+            self._wakeup.wait(self.max_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._buffer_lock:
+                log_entries = self._buffer
+                self._buffer = []
+            if not log_entries:
+                return 0
+            try:
+                self._store(log_entries)
+            except Exception as e:
+                with self._buffer_lock:
+                    self._buffer = log_entries + self._buffer
+                    dropped = self._trim_buffer()
+                logger.error(
+                    "Could not store %d buffered log entries, will retry. "
+                    "Reason: %s",
+                    len(log_entries),
+                    str(e),
+                )
+                self._log_dropped(dropped)
+                return 0
+            self.flush_count += 1
+            self.written_count += len(log_entries)
+            return len(log_entries)
+
+    def _trim_buffer(self):
+        # called holding _buffer_lock, returns the entries dropped
+        excess = len(self._buffer) - self.max_buffered
+        if excess <= 0:
+            return []
+        dropped = self._buffer[:excess]
+        del self._buffer[:excess]
+        self.dropped_count += excess
+        return dropped
+
+    def _log_dropped(self, dropped):
+        for log_entry in dropped:
+            logger.error(
+                "Dropped log entry since the buffer is full "
+                "(max_buffered=%d, tag=%s, time=%s): %s",
+                self.max_buffered,
+                log_entry.tag,
+                log_entry.time,
+                log_entry.text,
+            )
+
+    def _store(self, log_entries):
+        storage_provider = self.storage_provider_factory()
+        storage_provider.open()
+        try:
+            storage_provider.add_log_entries(log_entries)
+            storage_provider.commit()
+        finally:
+            storage_provider.close()
+
+    def get_buffered_count(self):
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def close(self):
+        self._is_closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
@@ -21,6 +21,10 @@ CREATE TABLE log_entry (
     text TEXT,
     usecase_tag TEXT
 );
+CREATE INDEX log_entry_app_user_time_idx
+ON log_entry (app_user_oid, time DESC, oid DESC);
+CREATE INDEX log_entry_tag_time_idx ON log_entry (tag, time DESC, oid DESC);
+CREATE INDEX log_entry_time_idx ON log_entry (time DESC, oid DESC);
 
 DROP TABLE IF EXISTS post;
 CREATE TABLE post (
@@ -28,8 +32,35 @@ CREATE TABLE post (
     title TEXT,
     body TEXT,
     author_oid INTEGER,
-    created_time TEXT
+    created_time TEXT,
+    body_html TEXT
 );
+CREATE INDEX post_created_time_oid_idx ON post (created_time DESC, oid DESC);
+
+-- full-text index of post, kept in sync by the triggers
+DROP TABLE IF EXISTS post_fts;
+CREATE VIRTUAL TABLE post_fts USING fts5(
+    title,
+    body,
+    content='post',
+    content_rowid='oid'
+);
+INSERT INTO post_fts (post_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+CREATE TRIGGER post_fts_insert AFTER INSERT ON post BEGIN
+    INSERT INTO post_fts (rowid, title, body)
+    VALUES (new.oid, new.title, new.body);
+END;
+CREATE TRIGGER post_fts_delete AFTER DELETE ON post BEGIN
+    INSERT INTO post_fts (post_fts, rowid, title, body)
+    VALUES ('delete', old.oid, old.title, old.body);
+END;
+CREATE TRIGGER post_fts_update
+AFTER UPDATE OF title, body ON post BEGIN
+    INSERT INTO post_fts (post_fts, rowid, title, body)
+    VALUES ('delete', old.oid, old.title, old.body);
+    INSERT INTO post_fts (rowid, title, body)
+    VALUES (new.oid, new.title, new.body);
+END;
 
 DROP TABLE IF EXISTS rule;
 CREATE TABLE rule (
@@ -38,8 +69,25 @@ CREATE TABLE rule (
     tag_type TEXT
 );
 
+DROP TABLE IF EXISTS change_counter;
+CREATE TABLE change_counter (
+    tag TEXT PRIMARY KEY,
+    value INTEGER
+);
+
+-- record schema version, see upgrade_schema_*.sql
+PRAGMA user_version = 5;
+
 -- load default data
 INSERT INTO rule (tag, tag_value, tag_type)
 VALUES
     ('login_fail_threshold_count', '3', 'int'),
-    ('login_fail_lock_minutes', '15', 'int');
+    ('login_fail_lock_minutes', '15', 'int'),
+    ('login_throttle_ip_attempts', '20', 'int'),
+    ('login_throttle_username_attempts', '10', 'int'),
+    ('login_throttle_window_seconds', '60', 'int');
+
+INSERT INTO change_counter (tag, value)
+VALUES
+    ('rule', 0),
+    ('post', 0);
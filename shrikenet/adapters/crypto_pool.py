@@ -0,0 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from shrikenet.entities.crypto_provider import CryptoProvider
+from shrikenet.entities.exceptions import CryptoProviderBusy
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_hashing_pool(size, queue_size, timeout_seconds):
+    """Return the process-wide hashing pool, creating it if needed."""
+    key = os.getpid()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = HashingPool(size, queue_size, timeout_seconds)
+            _pools[key] = pool
+        return pool
+
+
+def get_hashing_pool_stats():
+    with _pools_lock:
+        pool = _pools.get(os.getpid())
+    return None if pool is None else pool.get_stats()
+
+
+def shutdown_hashing_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown_hashing_pools)
+
+
+class HashingPool:
+    """Runs hash calls on worker processes, at most size at a time with
+    up to queue_size more waiting; anything beyond that is rejected at
+    once with CryptoProviderBusy rather than queued.
+    """
+
+    def __init__(self, size, queue_size, timeout_seconds, executor=None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        self.executor = executor
+        self._slots = threading.BoundedSemaphore(size + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "peak_in_flight": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+        }
+
+    def run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            logger.warning(
+                "Hash request rejected since the hashing pool is full "
+                "(size=%d, queue_size=%d).",
+                self.size,
+                self.queue_size,
+            )
+            raise CryptoProviderBusy("hashing pool is full")
+        with self._lock:
+            self._in_flight += 1
+            self._stats["peak_in_flight"] = max(
+                self._stats["peak_in_flight"], self._in_flight
+            )
+        start = time.perf_counter()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self._release_slot()
+            raise
+        # the slot is held until the work is done or cancelled, not just
+        # until the caller stops waiting, so a timed out hash still counts
+        future.add_done_callback(self._release_slot)
+        try:
+            result = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()  # only succeeds while still queued
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise CryptoProviderBusy("hash request timed out")
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["total_seconds"] += elapsed
+            self._stats["max_seconds"] = max(
+                self._stats["max_seconds"], elapsed
+            )
+        return result
+
+    def _release_slot(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["queue_size"] = self.queue_size
+            stats["in_flight"] = self._in_flight
+            stats["queue_depth"] = max(0, self._in_flight - self.size)
+        return stats
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PooledCryptoAdapter(CryptoProvider):
+    """Wraps a CryptoProvider so its hashing runs on a HashingPool."""
+
+    def __init__(self, crypto_provider, hashing_pool):
+        self.crypto_provider = crypto_provider
+        self.hashing_pool = hashing_pool
+
+    def generate_hash_from_string(self, string):
+        return self.hashing_pool.run(
+            self.crypto_provider.generate_hash_from_string, string
+        )
+
+    def hash_matches_string(self, hash_, string):
+        return self.hashing_pool.run(
+            self.crypto_provider.hash_matches_string, hash_, string
+        )
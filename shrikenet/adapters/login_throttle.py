@@ -0,0 +1,137 @@
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
+from shrikenet.entities.login_throttle import LoginThrottle, TokenBucket
+
+
+class MemoryLoginThrottle(LoginThrottle):
+    """Token buckets for the keys seen by this process.
+
+    Least recently used buckets are dropped beyond max_keys, so a spray
+    from many addresses can not grow memory without bound.
+    """
+
+    DEFAULT_MAX_KEYS = 100000
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS, clock=time.time):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> TokenBucket
+        self._lock = threading.Lock()
+
+    def acquire(self, key, capacity, window_seconds):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                bucket = TokenBucket(capacity, now)
+            decision = bucket.take(capacity, window_seconds, now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+    def close(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteLoginThrottle(LoginThrottle):
+    """Token buckets kept in a SQLite file shared by every worker.
+
+    Each acquire is one short write transaction on a connection per
+    thread. Buckets untouched for longer than prune_seconds are full
+    again, so they are deleted every PRUNE_INTERVAL acquires.
+    """
+
+    DEFAULT_PRUNE_SECONDS = 3600
+    PRUNE_INTERVAL = 1000
+
+    def __init__(
+        self,
+        db_file,
+        busy_timeout_ms=5000,
+        prune_seconds=DEFAULT_PRUNE_SECONDS,
+        clock=time.time,
+    ):
+        self.db_file = db_file
+        self.busy_timeout_ms = busy_timeout_ms
+        self.prune_seconds = prune_seconds
+        self.clock = clock
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._acquire_count = 0
+        self._get_connection().execute("""
+            CREATE TABLE IF NOT EXISTS login_throttle (
+                key TEXT PRIMARY KEY,
+                tokens REAL,
+                updated_time REAL,
+                rejected_count INTEGER
+            )
+            """)
+
+    def _get_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.db_file,
+                timeout=self.busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def acquire(self, key, capacity, window_seconds):
+        connection = self._get_connection()
+        now = self.clock()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_time, rejected_count "
+                "FROM login_throttle WHERE key = ?",
+                [key],
+            ).fetchone()
+            if row is None:
+                bucket = TokenBucket(capacity, now)
+            else:
+                bucket = TokenBucket(*row)
+            decision = bucket.take(capacity, window_seconds, now)
+            connection.execute(
+                "INSERT OR REPLACE INTO login_throttle "
+                "(key, tokens, updated_time, rejected_count) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    key,
+                    bucket.tokens,
+                    bucket.updated_time,
+                    bucket.rejected_count,
+                ],
+            )
+            self._acquire_count += 1
+            if self._acquire_count % self.PRUNE_INTERVAL == 0:
+                connection.execute(
+                    "DELETE FROM login_throttle WHERE updated_time < ?",
+                    [now - self.prune_seconds],
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return decision
+
+    def close(self):
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -1,5 +1,8 @@
+import bisect
 import copy
+import functools
 from operator import attrgetter
+import re
 
 from shrikenet.entities.exceptions import (
     DatastoreClosed,
@@ -8,14 +11,53 @@ from shrikenet.entities.exceptions import (
     DatastoreKeyError,
 )
 from shrikenet.entities.post import DeepPost
+from shrikenet.entities.post_search import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
+    PostSearchResult,
+    get_search_terms,
+)
 from shrikenet.entities.rules import Rules
 from shrikenet.entities.storage_provider import StorageProvider
 
+_MISSING = object()  # undo log marker for a row that did not exist
+
+_WORD_PATTERN = re.compile(r"\w+")
+SNIPPET_WORD_COUNT = 24
+TITLE_WEIGHT = 10  # as the bm25 weights of the SQLite full-text index
+
+
+def _require_open(method):
+    @functools.wraps(method)
+    def guarded_method(self, *args, **kwargs):
+        if not self.is_open:
+            error = (
+                "{} is not available since the connection is closed".format(
+                    method.__name__
+                )
+            )
+            raise DatastoreClosed(error)
+        return method(self, *args, **kwargs)
+
+    return guarded_method
+
 
+def _guard_public_methods(cls):
+    """Wrap every public method but open() so it raises DatastoreClosed
+    while the store is closed. The check runs once per call, and reads
+    of attributes inside the methods stay plain attribute lookups."""
+    for name, value in list(vars(cls).items()):
+        if callable(value) and not name.startswith("_") and name != "open":
+            setattr(cls, name, _require_open(value))
+    return cls
+
+
+@_guard_public_methods
 class Memory(StorageProvider):
 
     VERSION_PREFIX = "MemoryStore"
     VERSION_NUMBER = "1.0"
+    SCHEMA_VERSION = 5
 
     def __init__(self, db_config=None):
         self._build_schema()
@@ -23,66 +65,94 @@ class Memory(StorageProvider):
 
     def _build_schema(self):
         self.app_user = {}
+        self.app_user_oid_by_username = {}
         self.app_user_next_oid = 1
         self.log_entry = {}
         self.log_entry_next_oid = 1
         self.post = {}
+        self.post_index = []  # (created_time, oid) of each post, sorted
+        self.post_terms = {}  # search term -> oids of posts holding it
         self.post_next_oid = 1
         self.rules = Rules()
-
-    def save_tables(self):
-        self.saved_app_user = {}
-        self.saved_post = {}
-        for key, value in self.app_user.items():
-            self.saved_app_user[key] = copy.copy(value)
-        for key, value in self.post.items():
-            self.saved_post[key] = copy.copy(value)
-        self.saved_rules = copy.copy(self.rules)
-
-    def restore_tables(self):
-        self.app_user = {}
-        self.post = {}
-        for key, value in self.saved_app_user.items():
-            self.app_user[key] = copy.copy(value)
-        for key, value in self.saved_post.items():
-            self.post[key] = copy.copy(value)
-        self.rules = copy.copy(self.saved_rules)
-
-    # restrict access to attributes when closed
-    def __getattribute__(self, name):
-        if (
-            name not in ("open", "is_open", "_build_schema")
-            and not self.is_open
-        ):
-            error = (
-                "{} is not available since the connection is closed".format(
-                    name
-                )
+        self.change_counter = {"post": 0}
+
+    # Transactions keep an undo log instead of a copy of every table:
+    # the first write to a row records its prior value (or _MISSING),
+    # commit just drops the log and rollback puts those values back, so
+    # both cost O(rows changed) rather than O(rows stored). Stored rows
+    # are private copies that are replaced, never changed in place, and
+    # post_index follows the post rows it is derived from.
+    def _begin_transaction(self):
+        self._undo_log = []
+        self._touched = set()
+        self._saved_rules = _MISSING
+
+    def _set_row(self, table_name, key, row):
+        table = getattr(self, table_name)
+        self._record_undo(table_name, table, key)
+        table[key] = row
+
+    def _delete_row(self, table_name, key):
+        table = getattr(self, table_name)
+        self._record_undo(table_name, table, key)
+        del table[key]
+
+    def _record_undo(self, table_name, table, key):
+        touched_key = (table_name, key)
+        if touched_key not in self._touched:
+            self._touched.add(touched_key)
+            self._undo_log.append(
+                (table_name, table, key, table.get(key, _MISSING))
             )
-            raise DatastoreClosed(error)
-        return object.__getattribute__(self, name)
+
+    def _undo_changes(self):
+        for table_name, table, key, row in reversed(self._undo_log):
+            if table_name == "post" and key in table:
+                self._unindex_post(table[key])
+            if row is _MISSING:
+                table.pop(key, None)
+            else:
+                table[key] = row
+                if table_name == "post":
+                    self._index_post(row)
+        if self._saved_rules is not _MISSING:
+            self.rules = self._saved_rules
+        self._begin_transaction()
 
     def open(self):
         if self.is_open:
             raise DatastoreAlreadyOpen("connection already open")
         self.is_open = True
-        self.save_tables()
+        self._begin_transaction()
 
     def close(self):
-        self.restore_tables()
+        self._undo_changes()
         self.is_open = False
 
     def commit(self):
-        self.save_tables()
+        self._begin_transaction()
 
     def rollback(self):
-        self.restore_tables()
+        self._undo_changes()
 
+    # like the DDL scripts in SQLite, these take effect immediately
     def build_database_schema(self):
         self._build_schema()
+        self._begin_transaction()
 
     def reset_database_objects(self):
+        change_counter = self.change_counter
         self._build_schema()
+        self.change_counter = {
+            tag: value + 1 for tag, value in change_counter.items()
+        }
+        self._begin_transaction()
+
+    def get_schema_version(self):
+        return self.SCHEMA_VERSION
+
+    def upgrade_database_schema(self):
+        return self.SCHEMA_VERSION, self.SCHEMA_VERSION
 
     def get_version(self):
         return "{0} {1} - a lightweight in-memory database for unit testing".format(
@@ -104,6 +174,17 @@ class Memory(StorageProvider):
         self.post_next_oid += 1
         return next_oid
 
+    def _advance_next_oid(self, attribute_name, oid):
+        # a caller supplied oid, e.g. an imported one, is never handed out
+        # again; like a SQLite rowid this is not undone by rollback
+        if oid is None:
+            return
+        setattr(
+            self,
+            attribute_name,
+            max(getattr(self, attribute_name), oid + 1),
+        )
+
     def get_app_user_by_username(self, username):
         oid = self._get_app_user_oid_for_username(username)
         if oid is None:
@@ -114,6 +195,12 @@ class Memory(StorageProvider):
             raise DatastoreKeyError(message)
         return self.get_app_user_by_oid(oid)
 
+    def find_app_user_by_username(self, username):
+        oid = self._get_app_user_oid_for_username(username)
+        if oid is None:
+            return None
+        return self.get_app_user_by_oid(oid)
+
     def get_app_user_by_oid(self, oid):
         if oid not in self.app_user:
             message = (
@@ -125,10 +212,7 @@ class Memory(StorageProvider):
         return copy.copy(app_user)
 
     def _get_app_user_oid_for_username(self, username):
-        for oid, app_user in self.app_user.items():
-            if app_user.username == username:
-                return oid
-        return None
+        return self.app_user_oid_by_username.get(username)
 
     def add_app_user(self, app_user):
         error = (
@@ -142,10 +226,44 @@ class Memory(StorageProvider):
         if app_user.oid in self.app_user:
             reason = "record with this oid already exists"
             raise DatastoreError(error + reason)
-        self.app_user[app_user.oid] = copy.copy(app_user)
+        self._set_row("app_user", app_user.oid, copy.copy(app_user))
+        self._set_row(
+            "app_user_oid_by_username", app_user.username, app_user.oid
+        )
+        self._advance_next_oid("app_user_next_oid", app_user.oid)
+
+    def add_app_users(self, app_users):
+        for app_user in app_users:
+            if app_user.oid is None or app_user.oid < 1:
+                app_user = copy.copy(app_user)
+                app_user.oid = self.get_next_app_user_oid()
+            self.add_app_user(app_user)
+
+    def get_app_users_page(self, after_oid=None, limit=100):
+        oids = sorted(
+            oid
+            for oid in self.app_user
+            if after_oid is None or oid > after_oid
+        )
+        return [copy.copy(self.app_user[oid]) for oid in oids[:limit]]
 
     def update_app_user(self, app_user):
-        self.app_user[app_user.oid] = copy.copy(app_user)
+        owner_oid = self.app_user_oid_by_username.get(app_user.username)
+        if owner_oid is not None and owner_oid != app_user.oid:
+            error = "can not update app_user (oid={}), reason: ".format(
+                app_user.oid
+            )
+            reason = "record with this username already exists"
+            raise DatastoreError(error + reason)
+        old_app_user = self.app_user.get(app_user.oid)
+        if old_app_user is not None:
+            self._delete_row(
+                "app_user_oid_by_username", old_app_user.username
+            )
+        self._set_row("app_user", app_user.oid, copy.copy(app_user))
+        self._set_row(
+            "app_user_oid_by_username", app_user.username, app_user.oid
+        )
 
     def get_app_user_count(self):
         return len(self.app_user)
@@ -170,7 +288,65 @@ class Memory(StorageProvider):
         if log_entry.oid in self.log_entry:
             reason = "record with this oid already exists"
             raise DatastoreError(error + reason)
-        self.log_entry[log_entry.oid] = copy.copy(log_entry)
+        log_entry = copy.copy(log_entry)
+        if log_entry.oid is None or log_entry.oid < 1:
+            log_entry.oid = self.get_next_log_entry_oid()
+        self._set_row("log_entry", log_entry.oid, log_entry)
+        self._advance_next_oid("log_entry_next_oid", log_entry.oid)
+        return log_entry.oid
+
+    def add_log_entries(self, log_entries):
+        for log_entry in log_entries:
+            self.add_log_entry(log_entry)
+
+    def get_log_entries_for_user(
+        self,
+        app_user_oid,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        return self._get_log_entries_page(
+            lambda log_entry: log_entry.app_user_oid == app_user_oid,
+            since,
+            limit,
+            before_time,
+            before_oid,
+        )
+
+    def get_log_entries_by_tag(
+        self,
+        tag,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        return self._get_log_entries_page(
+            lambda log_entry: log_entry.tag == tag,
+            since,
+            limit,
+            before_time,
+            before_oid,
+        )
+
+    def _get_log_entries_page(
+        self, matches, since, limit, before_time, before_oid
+    ):
+        log_entries = [
+            copy.copy(log_entry)
+            for log_entry in self.log_entry.values()
+            if matches(log_entry)
+            and (since is None or log_entry.time >= since)
+            and (
+                before_time is None
+                or (log_entry.time, log_entry.oid)
+                < (before_time, before_oid)
+            )
+        ]
+        log_entries.sort(key=attrgetter("time", "oid"), reverse=True)
+        return log_entries[:limit]
 
     def get_last_log_entry(self):
         key_list = list(self.log_entry.keys())
@@ -195,31 +371,181 @@ class Memory(StorageProvider):
                 "this oid already exists".format(post.oid, post.title)
             )
             raise DatastoreError(message)
-        self.post[post.oid] = copy.copy(post)
+        post = copy.copy(post)
+        self._set_row("post", post.oid, post)
+        self._index_post(post)
+        self._increment_change_count("post")
+        self._advance_next_oid("post_next_oid", post.oid)
+
+    def add_posts(self, posts):
+        for post in posts:
+            if post.oid is None or post.oid < 1:
+                post = copy.copy(post)
+                post.oid = self.get_next_post_oid()
+            self.add_post(post)
 
     def update_post(self, post):
-        self.post[post.oid] = copy.copy(post)
+        if post.oid in self.post:
+            self._unindex_post(self.post[post.oid])
+        post = copy.copy(post)
+        self._set_row("post", post.oid, post)
+        self._index_post(post)
+        self._increment_change_count("post")
 
     def delete_post_by_oid(self, oid):
-        del self.post[oid]
+        if oid in self.post:
+            self._unindex_post(self.post[oid])
+        self._delete_row("post", oid)
+        self._increment_change_count("post")
+
+    def _increment_change_count(self, tag):
+        self._set_row("change_counter", tag, self.change_counter[tag] + 1)
+
+    def _index_post(self, post):
+        bisect.insort(self.post_index, (post.created_time, post.oid))
+        for term in self._get_post_terms(post):
+            self.post_terms.setdefault(term, set()).add(post.oid)
+
+    def _unindex_post(self, post):
+        key = (post.created_time, post.oid)
+        del self.post_index[bisect.bisect_left(self.post_index, key)]
+        for term in self._get_post_terms(post):
+            oids = self.post_terms[term]
+            oids.discard(post.oid)
+            if not oids:
+                del self.post_terms[term]
+
+    @staticmethod
+    def _get_post_terms(post):
+        return set(get_search_terms(post.title)) | set(
+            get_search_terms(post.body)
+        )
 
     def get_post_count(self):
         return len(self.post)
 
+    def get_posts_version(self):
+        # unlike SQLite there is no earlier store to collide with, so
+        # the change count alone identifies the posts
+        return str(self.change_counter["post"])
+
     def get_posts(self):
-        posts = []
-        for post in self.post.values():
-            author_username = (
-                self.app_user[post.author_oid].username
-                if post.author_oid in self.app_user
-                else None
+        return self._get_deep_posts(reversed(self.post_index))
+
+    def iter_posts(self, batch_size=100):
+        # page by keyset so posts added or deleted meanwhile are safe
+        before_created_time = None
+        before_oid = None
+        while True:
+            posts = self.get_posts_page(
+                before_created_time, before_oid, batch_size
             )
+            yield from posts
+            if len(posts) < batch_size:
+                return
+            before_created_time = posts[-1].created_time
+            before_oid = posts[-1].oid
+
+    def get_posts_page(
+        self,
+        before_created_time=None,
+        before_oid=None,
+        limit=20,
+        after_created_time=None,
+        after_oid=None,
+    ):
+        if limit < 1:
+            return []
+        if after_created_time is not None:
+            after_key = (after_created_time, after_oid)
+            start = bisect.bisect_right(self.post_index, after_key)
+            page_keys = self.post_index[start : start + limit]
+        else:
+            stop = len(self.post_index)
+            if before_created_time is not None:
+                before_key = (before_created_time, before_oid)
+                stop = bisect.bisect_left(self.post_index, before_key)
+            page_keys = self.post_index[max(0, stop - limit) : stop]
+        return self._get_deep_posts(reversed(page_keys))
+
+    def _get_deep_posts(self, post_keys):
+        posts = []
+        for _, oid in post_keys:
+            post = self.post[oid]
+            author = self.app_user.get(post.author_oid)
+            author_username = None if author is None else author.username
             posts.append(DeepPost(post, author_username))
-        posts.sort(key=attrgetter("created_time"), reverse=True)
         return posts
 
+    def search_posts(
+        self, query, limit=20, after_rank=None, after_oid=None
+    ):
+        terms = set(get_search_terms(query))
+        if not terms or limit < 1:
+            return []
+        oid_sets = [self.post_terms.get(term, set()) for term in terms]
+        keys = []
+        for oid in set.intersection(*oid_sets):
+            post = self.post[oid]
+            rank = -(
+                TITLE_WEIGHT * _count_terms(post.title, terms)
+                + _count_terms(post.body, terms)
+            )
+            if after_rank is None or (rank, oid) > (after_rank, after_oid):
+                keys.append((rank, oid))
+        keys.sort()
+        results = []
+        for rank, oid in keys[:limit]:
+            post = self._get_deep_posts([(None, oid)])[0]
+            results.append(
+                PostSearchResult(
+                    post,
+                    rank,
+                    _highlight(post.title, terms),
+                    _get_snippet(post.body, terms),
+                )
+            )
+        return results
+
     def get_rules(self):
         return copy.copy(self.rules)
 
     def save_rules(self, rules):
+        if self._saved_rules is _MISSING:
+            self._saved_rules = self.rules
         self.rules = None if rules is None else copy.copy(rules)
+
+
+def _count_terms(text, terms):
+    return sum(term in terms for term in get_search_terms(text))
+
+
+def _highlight(text, terms):
+    def mark(match):
+        word = match.group()
+        if word.lower() in terms:
+            return HIGHLIGHT_START + word + HIGHLIGHT_END
+        return word
+
+    return _WORD_PATTERN.sub(mark, text or "")
+
+
+def _get_snippet(text, terms):
+    text = text or ""
+    words = list(_WORD_PATTERN.finditer(text))
+    first_hit = next(
+        (
+            index
+            for index, word in enumerate(words)
+            if word.group().lower() in terms
+        ),
+        0,
+    )
+    start = max(0, min(first_hit - 4, len(words) - SNIPPET_WORD_COUNT))
+    stop = min(len(words), start + SNIPPET_WORD_COUNT)
+    snippet = text
+    if stop < len(words):
+        snippet = snippet[: words[stop - 1].end()] + "…"
+    if start > 0:
+        snippet = "…" + snippet[words[start].start() :]
+    return _highlight(snippet, terms)
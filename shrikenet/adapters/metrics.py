@@ -0,0 +1,177 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from shrikenet.entities.crypto_provider import CryptoProvider
+from shrikenet.entities.metrics import (
+    MetricSamples,
+    Metrics,
+    get_label_key,
+)
+from shrikenet.entities.text_transformer import TextTransformer
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryMetrics(Metrics):
+    """Counters and histograms for the threads of this process."""
+
+    def __init__(self):
+        self._samples = MetricSamples()
+        self._lock = threading.Lock()
+
+    def increment(self, name, labels=None, amount=1):
+        label_key = get_label_key(labels)
+        with self._lock:
+            self._samples.increment(name, label_key, amount)
+
+    def observe(self, name, value, labels=None):
+        label_key = get_label_key(labels)
+        with self._lock:
+            self._samples.observe(name, label_key, value)
+
+    def collect(self):
+        with self._lock:
+            return self._samples.copy()
+
+    def close(self):
+        pass
+
+
+class FileMetrics(MemoryMetrics):
+    """Metrics shared by worker processes through files in directory.
+
+    Each process counts in memory and writes its totals to its own file at
+    most every flush_seconds, and on collect or close. collect adds up the
+    files of every process, so files of exited workers keep counting;
+    empty the directory before the server starts.
+    """
+
+    FILE_PATTERN = "metrics_{}.json"
+    DEFAULT_FLUSH_SECONDS = 1.0
+
+    def __init__(
+        self,
+        directory,
+        flush_seconds=DEFAULT_FLUSH_SECONDS,
+        clock=time.monotonic,
+    ):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.clock = clock
+        self._pid = os.getpid()
+        self._flush_time = clock()
+        atexit.register(self.flush)
+
+    def increment(self, name, labels=None, amount=1):
+        self._check_pid()
+        super().increment(name, labels, amount)
+        self._flush_if_due()
+
+    def observe(self, name, value, labels=None):
+        self._check_pid()
+        super().observe(name, value, labels)
+        self._flush_if_due()
+
+    def _check_pid(self):
+        # a forked worker starts with its parent's counts, which the
+        # parent's own file already holds
+        if os.getpid() != self._pid:
+            with self._lock:
+                if os.getpid() != self._pid:
+                    self._samples = MetricSamples()
+                    self._pid = os.getpid()
+
+    def _flush_if_due(self):
+        if self.clock() - self._flush_time >= self.flush_seconds:
+            self.flush()
+
+    def get_file_path(self, pid):
+        return os.path.join(self.directory, self.FILE_PATTERN.format(pid))
+
+    def flush(self):
+        self._check_pid()
+        with self._lock:
+            self._flush_time = self.clock()
+            data = self._samples.to_dict()
+            file_path = self.get_file_path(self._pid)
+            temp_path = file_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, file_path)
+
+    def collect(self):
+        self.flush()
+        samples = MetricSamples()
+        pattern = os.path.join(
+            self.directory, self.FILE_PATTERN.format("*")
+        )
+        for file_path in glob.glob(pattern):
+            try:
+                with open(file_path) as f:
+                    samples.merge(MetricSamples.from_dict(json.load(f)))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(
+                    "Skipped metrics file %s, reason: %s", file_path, e
+                )
+        return samples
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+class TimedCryptoAdapter(CryptoProvider):
+    """Wraps a CryptoProvider to time its hashing in metrics."""
+
+    METRIC_NAME = "shrikenet_password_hash_seconds"
+
+    def __init__(self, crypto_provider, metrics):
+        self.crypto_provider = crypto_provider
+        self.metrics = metrics
+
+    def generate_hash_from_string(self, string):
+        start = time.perf_counter()
+        try:
+            return self.crypto_provider.generate_hash_from_string(string)
+        finally:
+            self._observe("generate", start)
+
+    def hash_matches_string(self, hash_, string):
+        start = time.perf_counter()
+        try:
+            return self.crypto_provider.hash_matches_string(hash_, string)
+        finally:
+            self._observe("check", start)
+
+    def _observe(self, operation, start):
+        self.metrics.observe(
+            self.METRIC_NAME,
+            time.perf_counter() - start,
+            {"operation": operation},
+        )
+
+
+class TimedTextTransformer(TextTransformer):
+    """Wraps a TextTransformer to time its rendering in metrics."""
+
+    METRIC_NAME = "shrikenet_markdown_render_seconds"
+
+    def __init__(self, text_transformer, metrics):
+        self.text_transformer = text_transformer
+        self.metrics = metrics
+
+    def transform_to_html(self, plain_text):
+        start = time.perf_counter()
+        try:
+            return self.text_transformer.transform_to_html(plain_text)
+        finally:
+            self.metrics.observe(
+                self.METRIC_NAME, time.perf_counter() - start
+            )
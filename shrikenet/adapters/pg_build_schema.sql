@@ -52,4 +52,7 @@ CREATE TABLE rule (
 INSERT INTO rule (tag, tag_value, tag_type)
 VALUES
     ('login_fail_threshold_count', '3', 'int'),
-    ('login_fail_lock_minutes', '15', 'int');
+    ('login_fail_lock_minutes', '15', 'int'),
+    ('login_throttle_ip_attempts', '20', 'int'),
+    ('login_throttle_username_attempts', '10', 'int'),
+    ('login_throttle_window_seconds', '60', 'int');
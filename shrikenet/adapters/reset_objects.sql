@@ -2,9 +2,14 @@
 DELETE FROM app_user;
 DELETE FROM log_entry;
 DELETE FROM post;
+UPDATE change_counter SET value = value + 1 WHERE tag = 'post';
 
 DELETE FROM rule;
 INSERT INTO rule (tag, tag_value, tag_type)
 VALUES
     ('login_fail_threshold_count', '3', 'int'),
-    ('login_fail_lock_minutes', '15', 'int');
+    ('login_fail_lock_minutes', '15', 'int'),
+    ('login_throttle_ip_attempts', '20', 'int'),
+    ('login_throttle_username_attempts', '10', 'int'),
+    ('login_throttle_window_seconds', '60', 'int');
+UPDATE change_counter SET value = value + 1 WHERE tag = 'rule';
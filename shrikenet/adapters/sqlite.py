@@ -1,8 +1,14 @@
 from datetime import datetime
+import functools
 import inspect
 import logging
 import os
 import sqlite3
+import threading
+import time
+
+from shrikenet.adapters import sqlite_pool
+from shrikenet.adapters.sqlite_stats import StatementStats
 from shrikenet.entities.exceptions import (
     DatastoreAlreadyOpen,
     DatastoreClosed,
@@ -12,46 +18,286 @@ from shrikenet.entities.exceptions import (
 from shrikenet.entities.app_user import AppUser
 from shrikenet.entities.log_entry import LogEntry
 from shrikenet.entities.post import Post, DeepPost
+from shrikenet.entities.post_search import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
+    PostSearchResult,
+    get_search_terms,
+)
 from shrikenet.entities.rules import Rules
+from shrikenet.entities.rules_cache import RulesCache
 from shrikenet.entities.storage_provider import StorageProvider
 
+DEFAULT_CACHED_STATEMENTS = 256  # sqlite3's own default is 128
+
+_rules_caches = {}
+_rules_caches_lock = threading.Lock()
+
+
+def get_rules_cache(db_file, ttl_seconds):
+    key = sqlite_pool.get_db_path(db_file)
+    with _rules_caches_lock:
+        rules_cache = _rules_caches.get(key)
+        if rules_cache is None:
+            rules_cache = RulesCache(ttl_seconds)
+            _rules_caches[key] = rules_cache
+        return rules_cache
+
+
+@functools.lru_cache(maxsize=512)
+def clean_sql(sql):
+    """Return sql dedented and stripped, computed once per statement.
+
+    The adapter's SQL is mostly string literals, so after the first call
+    this is a dict lookup and SQLite sees the same text each time.
+    """
+    return inspect.cleandoc(sql)
+
+
+def timed_statement(method):
+    """Record the time an _execute helper takes when self.stats is set.
+
+    The helpers all take (..., sql, parms, error); only the statement and
+    its parameter count are passed on, never the parameter values.
+    """
+
+    @functools.wraps(method)
+    def timed_method(self, *args):
+        if self.stats is None:
+            return method(self, *args)
+        start = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            self.stats.record(
+                clean_sql(args[-3]),
+                len(args[-2]),
+                time.perf_counter() - start,
+            )
+
+    return timed_method
+
+
+def connect(
+    db_file,
+    pragmas,
+    check_same_thread=True,
+    cached_statements=DEFAULT_CACHED_STATEMENTS,
+):
+    connection = sqlite3.connect(
+        db_file,
+        check_same_thread=check_same_thread,
+        cached_statements=cached_statements,
+    )
+    for name, value in pragmas:
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
 
 class SQLiteAdapter(StorageProvider):
 
     SCHEMA_FILENAME = "build_schema.sql"
     RESET_FILENAME = "reset_objects.sql"
+    UPGRADE_FILENAME = "upgrade_schema_{}.sql"
+    SCHEMA_VERSION = 5
+    IS_SHARED = True
+
+    DEFAULT_POOL_SIZE = 0  # no pooling, connect on each open
+    DEFAULT_POOL_MAX_IDLE_SECONDS = 300
+    DEFAULT_POOL_TIMEOUT_SECONDS = 10
+    DEFAULT_RULES_CACHE_SECONDS = 0  # no caching, read rules on each get
+    DEFAULT_CACHED_STATEMENTS = DEFAULT_CACHED_STATEMENTS
+
+    # (pragma, config key, allowed values or int), applied in this order;
+    # busy_timeout goes first so the others wait out a locked database
+    PRAGMA_SETTINGS = (
+        ("busy_timeout", "STORAGE_PROVIDER_BUSY_TIMEOUT_MS", int),
+        (
+            "journal_mode",
+            "STORAGE_PROVIDER_JOURNAL_MODE",
+            ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+        ),
+        (
+            "synchronous",
+            "STORAGE_PROVIDER_SYNCHRONOUS",
+            ("OFF", "NORMAL", "FULL", "EXTRA"),
+        ),
+        ("cache_size", "STORAGE_PROVIDER_CACHE_SIZE", int),
+        ("mmap_size", "STORAGE_PROVIDER_MMAP_SIZE", int),
+        (
+            "temp_store",
+            "STORAGE_PROVIDER_TEMP_STORE",
+            ("DEFAULT", "FILE", "MEMORY"),
+        ),
+    )
 
     def __init__(self, config):
         self.is_open = False
         self.connection = None
         self.logger = logging.getLogger(__name__)
         self.db_file = self.get_db_file(config)
+        self.pragmas = self.get_pragmas(config)
+        self.cached_statements = self.get_config_value(
+            config,
+            "STORAGE_PROVIDER_CACHED_STATEMENTS",
+            self.DEFAULT_CACHED_STATEMENTS,
+        )
+        self.pool = self.get_pool(config)
+        self.rules_cache = self.get_rules_cache(config)
+        self.has_unsaved_rules = False
+        self.statement_count = 0  # run while open, including BEGIN/COMMIT
+        self.stats = self.get_stats(config)
 
-    def get_db_file(self, config):
+    @classmethod
+    def get_db_file(cls, config):
         if isinstance(config, str):
             return config
         return config["STORAGE_PROVIDER_DB"]
 
+    @classmethod
+    def get_config_value(cls, config, key, default):
+        if isinstance(config, str):
+            return default
+        return config.get(key, default)
+
+    def get_pragmas(self, config):
+        pragmas = []
+        for name, key, allowed in self.PRAGMA_SETTINGS:
+            value = self.get_config_value(config, key, None)
+            if value is None:
+                continue
+            if allowed is int:
+                if isinstance(value, bool) or not isinstance(value, int):
+                    raise DatastoreError(
+                        f"can not configure storage provider, reason: "
+                        f"{key} must be an integer (value={value!r})"
+                    )
+            else:
+                value = str(value).upper()
+                if value not in allowed:
+                    raise DatastoreError(
+                        f"can not configure storage provider, reason: "
+                        f"{key} must be one of {', '.join(allowed)} "
+                        f"(value={value!r})"
+                    )
+            pragmas.append((name, value))
+        return pragmas
+
+    def get_pool(self, config):
+        pool_size = self.get_config_value(
+            config, "STORAGE_PROVIDER_POOL_SIZE", self.DEFAULT_POOL_SIZE
+        )
+        if pool_size < 1:
+            return None
+        max_idle_seconds = self.get_config_value(
+            config,
+            "STORAGE_PROVIDER_POOL_MAX_IDLE_SECONDS",
+            self.DEFAULT_POOL_MAX_IDLE_SECONDS,
+        )
+        timeout_seconds = self.get_config_value(
+            config,
+            "STORAGE_PROVIDER_POOL_TIMEOUT_SECONDS",
+            self.DEFAULT_POOL_TIMEOUT_SECONDS,
+        )
+        connect_function = functools.partial(
+            connect,
+            sqlite_pool.get_db_path(self.db_file),
+            self.pragmas,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        return sqlite_pool.get_pool(
+            self.db_file,
+            pool_size,
+            max_idle_seconds,
+            timeout_seconds,
+            connect_function,
+            (tuple(self.pragmas), self.cached_statements),
+        )
+
+    @classmethod
+    def get_rules_cache(cls, config):
+        """Return the process-wide RulesCache for config, if it caches.
+
+        A class method, so callers can read cached rules without opening
+        a connection.
+        """
+        ttl_seconds = cls.get_config_value(
+            config,
+            "STORAGE_PROVIDER_RULES_CACHE_SECONDS",
+            cls.DEFAULT_RULES_CACHE_SECONDS,
+        )
+        if ttl_seconds <= 0:
+            return None
+        return get_rules_cache(cls.get_db_file(config), ttl_seconds)
+
+    def get_stats(self, config):
+        if not self.get_config_value(
+            config, "STORAGE_PROVIDER_INSTRUMENT", False
+        ):
+            return None
+        slow_query_ms = self.get_config_value(
+            config, "STORAGE_PROVIDER_SLOW_QUERY_MS", None
+        )
+        if slow_query_ms is None:
+            return StatementStats()
+        return StatementStats(slow_query_ms / 1000)
+
+    def get_pool_stats(self):
+        if self.pool is None:
+            return None
+        return self.pool.get_stats()
+
     def open(self):
         if self.is_open:
             raise DatastoreAlreadyOpen("connection already open")
-        self.connection = sqlite3.connect(self.db_file)
+        if self.pool is None:
+            self.connection = connect(
+                self.db_file,
+                self.pragmas,
+                cached_statements=self.cached_statements,
+            )
+        else:
+            self.connection = self.pool.checkout()
+        self.connection.set_trace_callback(self._count_statement)
         self.is_open = True
 
+    def _count_statement(self, sql):
+        self.statement_count += 1
+
     def close(self):
         if not self.is_open:
             raise DatastoreClosed("connection already closed")
-        self.connection.close()  # not reset to None, let SQLite handle state
+        self.has_unsaved_rules = False
+        self.connection.set_trace_callback(None)
+        if self.pool is None:
+            self.connection.close()  # not reset to None, let SQLite handle state
+        else:
+            self.pool.checkin(self.connection)
+            self.connection = sqlite_pool.CLOSED_CONNECTION
         self.is_open = False
 
     def commit(self):
+        self._execute_commit("COMMIT", (), None)
+        if self.has_unsaved_rules:
+            self.has_unsaved_rules = False
+            self._invalidate_rules_cache()
+
+    @timed_statement
+    def _execute_commit(self, sql, parms, error):
         self.connection.commit()
 
     def rollback(self):
         self.connection.rollback()
+        self.has_unsaved_rules = False
+
+    def _invalidate_rules_cache(self):
+        if self.rules_cache is not None:
+            self.rules_cache.invalidate()
 
     def build_database_schema(self):
         self._execute_sql_file(self.SCHEMA_FILENAME)
+        self._invalidate_rules_cache()
 
     def _execute_sql_file(self, filename):
         file_path = self._get_sql_file_path(filename)
@@ -64,6 +310,44 @@ class SQLiteAdapter(StorageProvider):
 
     def reset_database_objects(self):
         self._execute_sql_file(self.RESET_FILENAME)
+        self._invalidate_rules_cache()
+
+    def get_schema_version(self):
+        sql = "PRAGMA user_version"
+        parms = []
+        error = "can not get schema version, reason: "
+        return self._execute_select_value(sql, parms, error)
+
+    def upgrade_database_schema(self):
+        from_version = self.get_schema_version()
+        for version in range(from_version + 1, self.SCHEMA_VERSION + 1):
+            filename = self.UPGRADE_FILENAME.format(version)
+            self.logger.info(
+                "Upgrading database schema to version %d (db=%s).",
+                version,
+                self.db_file,
+            )
+            self._execute_upgrade_file(filename, version)
+        return from_version, self.SCHEMA_VERSION
+
+    def _execute_upgrade_file(self, filename, version):
+        # executescript commits as it goes, so wrap the step, which ends
+        # by setting user_version, in a transaction of its own; a failed
+        # step leaves the schema and its version as they were
+        file_path = self._get_sql_file_path(filename)
+        with open(file_path) as sql_file:
+            script = sql_file.read()
+        try:
+            self.connection.executescript(
+                f"BEGIN;\n{script}\nCOMMIT;"
+            )
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            raise DatastoreError(
+                f"can not upgrade database schema (version={version}), "
+                f"reason: {e}"
+            )
 
     def get_version(self):
         sql = "SELECT sqlite_version()"
@@ -73,15 +357,15 @@ class SQLiteAdapter(StorageProvider):
         return f"SQLite version {version_num}"
 
     def _execute_select_value(self, sql, parms, error):
-        return self._execute_select("_select_value", sql, parms, error)
+        return self._execute_select(self._select_value, sql, parms, error)
 
-    def _execute_select(self, function_name, sql, parms, error):
-        clean_sql = inspect.cleandoc(sql)
-        func = getattr(self, function_name)
+    @timed_statement
+    def _execute_select(self, select_function, sql, parms, error):
+        sql = clean_sql(sql)
         try:
-            return func(clean_sql, parms)
+            return select_function(sql, parms)
         except Exception as e:
-            self._process_exception(e, error, clean_sql)
+            self._process_exception(e, error, sql)
 
     def _process_exception(self, exception, error, sql):
         reason = str(exception)
@@ -109,8 +393,27 @@ class SQLiteAdapter(StorageProvider):
         app_user = self._create_app_user_from_row(row)
         return app_user
 
+    def find_app_user_by_username(self, username):
+        sql = "SELECT * FROM app_user WHERE username = ?"
+        parms = [
+            username,
+        ]
+        error = f"can not find app_user (username={username}), reason: "
+        row = self._execute_select_optional_row(sql, parms, error)
+        if row is None:
+            return None
+        return self._create_app_user_from_row(row)
+
+    def _execute_select_optional_row(self, sql, parms, error):
+        return self._execute_select(
+            self._select_optional_row, sql, parms, error
+        )
+
+    def _select_optional_row(self, sql, parms):
+        return self.connection.execute(sql, parms).fetchone()
+
     def _execute_select_row(self, sql, parms, error):
-        return self._execute_select("_select_row", sql, parms, error)
+        return self._execute_select(self._select_row, sql, parms, error)
 
     def _select_row(self, sql, parms):
         cursor = self.connection.execute(sql, parms)
@@ -188,14 +491,59 @@ class SQLiteAdapter(StorageProvider):
             return None
         return py_datetime.isoformat(timespec="microseconds")
 
+    @timed_statement
     def _execute_insert_and_get_oid(self, sql, parms, error):
-        clean_sql = inspect.cleandoc(sql)
+        sql = clean_sql(sql)
         try:
-            cursor = self.connection.execute(clean_sql, parms)
+            cursor = self.connection.execute(sql, parms)
             oid = cursor.lastrowid
             return oid
         except Exception as e:
-            self._process_exception(e, error, clean_sql)
+            self._process_exception(e, error, sql)
+
+    def add_app_users(self, app_users):
+        sql = """
+            INSERT INTO app_user (oid, username, name, password_hash,
+                needs_password_change, is_locked, is_dormant,
+                ongoing_password_failure_count,
+                last_password_failure_time)
+            VALUES
+                (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        parms_list = [
+            [
+                self._get_import_oid(app_user.oid),
+                app_user.username,
+                app_user.name,
+                app_user.password_hash,
+                self.bool_to_sql(app_user.needs_password_change),
+                self.bool_to_sql(app_user.is_locked),
+                self.bool_to_sql(app_user.is_dormant),
+                app_user.ongoing_password_failure_count,
+                self.datetime_to_sql(app_user.last_password_failure_time),
+            ]
+            for app_user in app_users
+        ]
+        error = f"can not add {len(parms_list)} app_users, reason: "
+        self._execute_many(sql, parms_list, error)
+
+    def _get_import_oid(self, oid):
+        # NULL lets SQLite assign the next oid, as add_* does
+        if oid is None or oid < 1:
+            return None
+        return oid
+
+    def get_app_users_page(self, after_oid=None, limit=100):
+        sql = "SELECT * FROM app_user"
+        parms = []
+        if after_oid is not None:
+            sql += " WHERE oid > ?"
+            parms.append(after_oid)
+        sql += " ORDER BY oid LIMIT ?"
+        parms.append(limit)
+        error = "can not get page of app_users, reason: "
+        rows = self._execute_select_all_rows(sql, parms, error)
+        return [self._create_app_user_from_row(row) for row in rows]
 
     def update_app_user(self, app_user):
         sql = """
@@ -224,16 +572,17 @@ class SQLiteAdapter(StorageProvider):
         error = f"can not update app_user (oid={app_user.oid}), reason: "
         self._execute_update_row(sql, parms, error)
 
+    @timed_statement
     def _execute_update_row(self, sql, parms, error):
-        clean_sql = inspect.cleandoc(sql)
+        sql = clean_sql(sql)
         try:
-            cursor = self.connection.execute(clean_sql, parms)
+            cursor = self.connection.execute(sql, parms)
             if cursor.rowcount == 0:
                 raise KeyError("record does not exist")
             if cursor.rowcount > 1:
                 raise Exception("sql affected more than one record")
         except Exception as e:
-            self._process_exception(e, error, clean_sql)
+            self._process_exception(e, error, sql)
 
     def get_app_user_count(self):
         sql = "SELECT count(*) FROM app_user"
@@ -256,7 +605,8 @@ class SQLiteAdapter(StorageProvider):
                 p.body,
                 p.author_oid,
                 p.created_time,
-                u.username AS author_username
+                u.username AS author_username,
+                p.body_html
             FROM post p
             LEFT OUTER JOIN app_user u
             ON p.author_oid = u.oid
@@ -277,32 +627,58 @@ class SQLiteAdapter(StorageProvider):
             body=row[2],
             author_oid=row[3],
             created_time=self.sql_to_datetime(row[4]),
+            body_html=row[6],
         )
         author_username = row[5]
         return DeepPost(post, author_username)
 
     def add_post(self, post):
         sql = """
-            INSERT INTO post (title, body, author_oid, created_time)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO post (title, body, author_oid, created_time,
+                body_html)
+            VALUES (?, ?, ?, ?, ?)
         """
         parms = [
             post.title,
             post.body,
             post.author_oid,
             self.datetime_to_sql(post.created_time),
+            post.body_html,
         ]
         error = f"can not add post (title={post.title}), reason: "
         oid = self._execute_insert_and_get_oid(sql, parms, error)
+        self._increment_change_count("post")
         return oid
 
+    def add_posts(self, posts):
+        sql = """
+            INSERT INTO post (oid, title, body, author_oid, created_time,
+                body_html)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        parms_list = [
+            [
+                self._get_import_oid(post.oid),
+                post.title,
+                post.body,
+                post.author_oid,
+                self.datetime_to_sql(post.created_time),
+                post.body_html,
+            ]
+            for post in posts
+        ]
+        error = f"can not add {len(parms_list)} posts, reason: "
+        self._execute_many(sql, parms_list, error)
+        self._increment_change_count("post")
+
     def update_post(self, post):
         sql = """
             UPDATE post
             SET title = ?,
                 body = ?,
                 author_oid = ?,
-                created_time = ?
+                created_time = ?,
+                body_html = ?
             WHERE oid = ?
         """
         parms = [
@@ -310,10 +686,12 @@ class SQLiteAdapter(StorageProvider):
             post.body,
             post.author_oid,
             self.datetime_to_sql(post.created_time),
+            post.body_html,
             post.oid,
         ]
         error = "can not update post (oid={}), reason: ".format(post.oid)
         self._execute_update_row(sql, parms, error)
+        self._increment_change_count("post")
 
     def delete_post_by_oid(self, oid):
         sql = "DELETE FROM post WHERE oid = ?"
@@ -322,6 +700,7 @@ class SQLiteAdapter(StorageProvider):
         ]
         error = "can not delete post (oid={}), reason: ".format(oid)
         self._execute_update_row(sql, parms, error)
+        self._increment_change_count("post")
 
     def get_post_count(self):
         sql = "SELECT count(*) FROM post"
@@ -329,6 +708,17 @@ class SQLiteAdapter(StorageProvider):
         error = "can not get count of post records, reason: "
         return self._execute_select_value(sql, parms, error)
 
+    def get_posts_version(self):
+        sql = """
+            SELECT (SELECT max(oid) FROM post), value
+            FROM change_counter
+            WHERE tag = 'post'
+        """
+        parms = []
+        error = "can not get posts version, reason: "
+        max_oid, change_count = self._execute_select_row(sql, parms, error)
+        return f"{max_oid or 0}.{change_count}"
+
     def get_posts(self):
         sql = """
             SELECT p.oid,
@@ -336,10 +726,11 @@ class SQLiteAdapter(StorageProvider):
                 p.body,
                 p.author_oid,
                 p.created_time,
-                u.username AS author_username
+                u.username AS author_username,
+                p.body_html
             FROM post p
             LEFT OUTER JOIN app_user u ON p.author_oid = u.oid
-            ORDER BY p.created_time DESC
+            ORDER BY p.created_time DESC, p.oid DESC
         """
         parms = []
         error = "can not get posts, reason: "
@@ -349,14 +740,178 @@ class SQLiteAdapter(StorageProvider):
             posts.append(self._create_deep_post_from_row(row))
         return posts
 
+    def iter_posts(self, batch_size=100):
+        sql = """
+            SELECT p.oid,
+                p.title,
+                p.body,
+                p.author_oid,
+                p.created_time,
+                u.username AS author_username,
+                p.body_html
+            FROM post p
+            LEFT OUTER JOIN app_user u ON p.author_oid = u.oid
+            ORDER BY p.created_time DESC, p.oid DESC
+        """
+        parms = []
+        error = "can not get posts, reason: "
+        sql = clean_sql(sql)
+        try:
+            cursor = self.connection.execute(sql, parms)
+        except Exception as e:
+            self._process_exception(e, error, sql)
+        while True:
+            try:
+                rows = cursor.fetchmany(batch_size)
+            except Exception as e:
+                self._process_exception(e, error, sql)
+            if not rows:
+                return
+            for row in rows:
+                yield self._create_deep_post_from_row(row)
+
+    def get_posts_page(
+        self,
+        before_created_time=None,
+        before_oid=None,
+        limit=20,
+        after_created_time=None,
+        after_oid=None,
+    ):
+        sql = """
+            SELECT p.oid,
+                p.title,
+                p.body,
+                p.author_oid,
+                p.created_time,
+                u.username AS author_username,
+                p.body_html
+            FROM post p
+            LEFT OUTER JOIN app_user u ON p.author_oid = u.oid
+        """
+        if after_created_time is not None:
+            sql += """
+                WHERE (p.created_time, p.oid) > (?, ?)
+                ORDER BY p.created_time, p.oid
+                LIMIT ?
+            """
+            parms = [
+                self.datetime_to_sql(after_created_time),
+                after_oid,
+                limit,
+            ]
+        elif before_created_time is not None:
+            sql += """
+                WHERE (p.created_time, p.oid) < (?, ?)
+                ORDER BY p.created_time DESC, p.oid DESC
+                LIMIT ?
+            """
+            parms = [
+                self.datetime_to_sql(before_created_time),
+                before_oid,
+                limit,
+            ]
+        else:
+            sql += """
+                ORDER BY p.created_time DESC, p.oid DESC
+                LIMIT ?
+            """
+            parms = [
+                limit,
+            ]
+        error = "can not get page of posts, reason: "
+        rows = self._execute_select_all_rows(sql, parms, error)
+        posts = []
+        for row in rows:
+            posts.append(self._create_deep_post_from_row(row))
+        if after_created_time is not None:
+            posts.reverse()
+        return posts
+
+    def search_posts(
+        self, query, limit=20, after_rank=None, after_oid=None
+    ):
+        terms = get_search_terms(query)
+        if not terms or limit < 1:
+            return []
+        # quoted terms are matched literally, never as FTS5 syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        sql = """
+            SELECT p.oid,
+                p.title,
+                p.body,
+                p.author_oid,
+                p.created_time,
+                u.username AS author_username,
+                p.body_html,
+                f.rank,
+                highlight(post_fts, 0, ?, ?),
+                snippet(post_fts, 1, ?, ?, '…', 24)
+            FROM post_fts f
+            JOIN post p ON p.oid = f.rowid
+            LEFT OUTER JOIN app_user u ON p.author_oid = u.oid
+            WHERE post_fts MATCH ?
+        """
+        parms = [
+            HIGHLIGHT_START,
+            HIGHLIGHT_END,
+            HIGHLIGHT_START,
+            HIGHLIGHT_END,
+            match,
+        ]
+        if after_rank is not None:
+            sql += " AND (f.rank, p.oid) > (?, ?)"
+            parms += [after_rank, after_oid]
+        sql += " ORDER BY f.rank, p.oid LIMIT ?"
+        parms.append(limit)
+        error = f"can not search posts (query={query}), reason: "
+        rows = self._execute_select_all_rows(sql, parms, error)
+        return [
+            PostSearchResult(
+                self._create_deep_post_from_row(row), row[7], row[8], row[9]
+            )
+            for row in rows
+        ]
+
     def _execute_select_all_rows(self, sql, parms, error):
-        return self._execute_select("_select_all_rows", sql, parms, error)
+        return self._execute_select(
+            self._select_all_rows, sql, parms, error
+        )
 
     def _select_all_rows(self, sql, parms):
         cursor = self.connection.execute(sql, parms)
         return cursor.fetchall()
 
     def get_rules(self):
+        if self.rules_cache is None or self.has_unsaved_rules:
+            return self._select_rules()
+        rules = self.rules_cache.get_fresh()
+        if rules is not None:
+            return rules
+        version = self.get_change_count("rule")
+        rules = self.rules_cache.get_for_version(version)
+        if rules is None:
+            rules = self._select_rules()
+            self.rules_cache.put(version, rules)
+        return rules
+
+    def get_change_count(self, tag):
+        sql = "SELECT value FROM change_counter WHERE tag = ?"
+        parms = [
+            tag,
+        ]
+        error = f"can not get change count (tag={tag}), reason: "
+        return self._execute_select_value(sql, parms, error)
+
+    def _increment_change_count(self, tag):
+        sql = "UPDATE change_counter SET value = value + 1 WHERE tag = ?"
+        parms = [
+            tag,
+        ]
+        error = f"can not increment change count (tag={tag}), reason: "
+        self._execute_update_row(sql, parms, error)
+
+    def _select_rules(self):
         sql = "SELECT tag, tag_value, tag_type FROM rule"
         parms = []
         error = "can not get rules, reason: "
@@ -378,6 +933,9 @@ class SQLiteAdapter(StorageProvider):
         attribute = {
             "login_fail_threshold_count": "int",
             "login_fail_lock_minutes": "int",
+            "login_throttle_ip_attempts": "int",
+            "login_throttle_username_attempts": "int",
+            "login_throttle_window_seconds": "int",
         }
         for key, value in attribute.items():
             sql = """
@@ -390,12 +948,16 @@ class SQLiteAdapter(StorageProvider):
             parms = (tag, tag_value, tag_type)
             self._execute_sql(sql, parms, error)
 
+        self._increment_change_count("rule")
+        self.has_unsaved_rules = True
+
+    @timed_statement
     def _execute_sql(self, sql, parms, error):
-        clean_sql = inspect.cleandoc(sql)
+        sql = clean_sql(sql)
         try:
-            self.connection.execute(clean_sql, parms)
+            self.connection.execute(sql, parms)
         except Exception as e:
-            self._process_exception(e, error, clean_sql)
+            self._process_exception(e, error, sql)
 
     def get_log_entry_by_oid(self, oid):
         sql = """
@@ -446,6 +1008,99 @@ class SQLiteAdapter(StorageProvider):
         oid = self._execute_insert_and_get_oid(sql, parms, error)
         return oid
 
+    def add_log_entries(self, log_entries):
+        sql = """
+            INSERT INTO log_entry (time, app_user_oid, tag, text, usecase_tag)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        parms_list = [
+            [
+                self.datetime_to_sql(log_entry.time),
+                log_entry.app_user_oid,
+                log_entry.tag,
+                log_entry.text,
+                log_entry.usecase_tag,
+            ]
+            for log_entry in log_entries
+        ]
+        error = f"can not add {len(parms_list)} log entries, reason: "
+        self._execute_many(sql, parms_list, error)
+
+    @timed_statement
+    def _execute_many(self, sql, parms_list, error):
+        sql = clean_sql(sql)
+        try:
+            self.connection.executemany(sql, parms_list)
+        except Exception as e:
+            self._process_exception(e, error, sql)
+
+    def get_log_entries_for_user(
+        self,
+        app_user_oid,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        error = (
+            f"can not get log entries (app_user_oid={app_user_oid}), "
+            "reason: "
+        )
+        return self._get_log_entries_page(
+            "e.app_user_oid = ?",
+            app_user_oid,
+            since,
+            limit,
+            before_time,
+            before_oid,
+            error,
+        )
+
+    def get_log_entries_by_tag(
+        self,
+        tag,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        error = f"can not get log entries (tag={tag}), reason: "
+        return self._get_log_entries_page(
+            "e.tag = ?", tag, since, limit, before_time, before_oid, error
+        )
+
+    def _get_log_entries_page(
+        self, condition, value, since, limit, before_time, before_oid, error
+    ):
+        sql = """
+            SELECT e.oid,
+                e.time,
+                e.app_user_oid,
+                e.tag,
+                e.text,
+                e.usecase_tag,
+                u.name AS app_user_name
+            FROM log_entry e
+            LEFT OUTER JOIN app_user u
+            ON e.app_user_oid = u.oid
+        """
+        conditions = [condition]
+        parms = [value]
+        if since is not None:
+            conditions.append("e.time >= ?")
+            parms.append(self.datetime_to_sql(since))
+        if before_time is not None:
+            conditions.append("(e.time, e.oid) < (?, ?)")
+            parms.extend([self.datetime_to_sql(before_time), before_oid])
+        sql += f"""
+            WHERE {" AND ".join(conditions)}
+            ORDER BY e.time DESC, e.oid DESC
+            LIMIT ?
+        """
+        parms.append(limit)
+        rows = self._execute_select_all_rows(sql, parms, error)
+        return [self._create_log_entry_from_row(row) for row in rows]
+
     def get_last_log_entry(self):
         sql = "SELECT max(oid) FROM log_entry"
         parms = []
@@ -0,0 +1,230 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from shrikenet.entities.exceptions import DatastoreError
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    db_file,
+    size,
+    max_idle_seconds,
+    timeout_seconds,
+    connect_function=None,
+    connect_settings=(),
+):
+    """Return the process-wide pool for db_file, creating it if needed.
+
+    Pools are keyed by absolute database path, so a later change of the
+    working directory can't hand out connections to a different file,
+    and by process id, so a pool inherited through fork (e.g. gunicorn
+    with a preloaded app) is never shared between worker processes.
+    The pool settings and connect_settings, a hashable summary of what
+    connect_function applies such as pragmas, are part of the key too, so
+    a differently configured caller never gets connections set up for
+    another.
+    """
+    path = get_db_path(db_file)
+    pid = os.getpid()
+    key = (
+        path,
+        pid,
+        size,
+        max_idle_seconds,
+        timeout_seconds,
+        connect_settings,
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if any(k[:2] == (path, pid) for k in _pools):
+                logger.warning(
+                    "Opened another connection pool with different "
+                    "settings (db=%s), each has connections of its own.",
+                    path,
+                )
+            pool = SQLiteConnectionPool(
+                db_file,
+                size,
+                max_idle_seconds,
+                timeout_seconds,
+                connect_function,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def get_db_path(db_file):
+    if db_file == ":memory:" or db_file.startswith("file:"):
+        return db_file
+    return os.path.abspath(db_file)
+
+
+def get_pool_stats():
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if key[1] == pid]
+    return [pool.get_stats() for pool in pools]
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class SQLiteConnectionPool:
+
+    def __init__(
+        self,
+        db_file,
+        size,
+        max_idle_seconds,
+        timeout_seconds,
+        connect_function=None,
+    ):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.db_file = db_file
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout_seconds = timeout_seconds
+        self.connect_function = connect_function
+        self._idle = []  # (connection, time returned), most recent last
+        self._checked_out = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded_idle": 0,
+            "discarded_unhealthy": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+    def checkout(self):
+        deadline = time.monotonic() + self.timeout_seconds
+        with self._condition:
+            while True:
+                connection = self._take_idle_connection()
+                if connection is not None:
+                    self._checked_out += 1
+                    self._stats["reused"] += 1
+                    return connection
+                if self._checked_out < self.size:
+                    self._checked_out += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise DatastoreError(
+                        f"can not open connection (db={self.db_file}), "
+                        f"reason: pool exhausted (size={self.size})"
+                    )
+                self._stats["waits"] += 1
+                self._condition.wait(remaining)
+
+        # connect outside the lock, the slot is already reserved
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._checked_out -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats["created"] += 1
+        return connection
+
+    def _take_idle_connection(self):
+        now = time.monotonic()
+        while self._idle:
+            connection, returned_time = self._idle.pop()
+            if now - returned_time > self.max_idle_seconds:
+                self._stats["discarded_idle"] += 1
+                self._discard(connection)
+                continue
+            if not self._is_healthy(connection):
+                self._stats["discarded_unhealthy"] += 1
+                self._discard(connection)
+                continue
+            return connection
+        return None
+
+    def _is_healthy(self, connection):
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.debug(
+                "Discarding unhealthy pooled connection (db=%s). "
+                "Reason: %s",
+                self.db_file,
+                str(e),
+            )
+            return False
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def _connect(self):
+        if self.connect_function is not None:
+            return self.connect_function()
+        return sqlite3.connect(
+            get_db_path(self.db_file), check_same_thread=False
+        )
+
+    def checkin(self, connection):
+        try:
+            connection.rollback()  # discard uncommitted work, like close
+            is_reusable = True
+        except sqlite3.Error:
+            is_reusable = False
+        with self._condition:
+            self._checked_out -= 1
+            if is_reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._stats["discarded_unhealthy"] += 1
+                self._discard(connection)
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def get_stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats["db_file"] = self.db_file
+            stats["size"] = self.size
+            stats["checked_out"] = self._checked_out
+            stats["idle"] = len(self._idle)
+        return stats
+
+
+class ClosedConnection:
+    """Stand-in for a connection that was returned to the pool."""
+
+    def __getattr__(self, name):
+        raise sqlite3.ProgrammingError(
+            "Cannot operate on a closed database."
+        )
+
+
+CLOSED_CONNECTION = ClosedConnection()
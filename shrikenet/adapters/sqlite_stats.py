@@ -0,0 +1,45 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StatementStats:
+    """Count and time of the statements one SQLiteAdapter has run.
+
+    Only the SQL text, which holds placeholders, is kept or logged; the
+    parameters may be passwords or personal data so are never recorded.
+    A statement taking slow_seconds or more is logged as a warning.
+    """
+
+    def __init__(self, slow_seconds=None):
+        self.slow_seconds = slow_seconds
+        self.count = 0
+        self.total_seconds = 0.0
+        self.peak_seconds = 0.0
+        self.slowest_sql = None
+        self.slow_count = 0
+
+    def record(self, sql, parameter_count, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.peak_seconds or self.slowest_sql is None:
+            self.peak_seconds = seconds
+            self.slowest_sql = sql
+        if self.slow_seconds is not None and seconds >= self.slow_seconds:
+            self.slow_count += 1
+            logger.warning(
+                "Slow SQL statement took %.1f ms (%d parameters redacted): "
+                "%s",
+                seconds * 1000,
+                parameter_count,
+                sql,
+            )
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_seconds * 1000,
+            "peak_ms": self.peak_seconds * 1000,
+            "slowest_sql": self.slowest_sql,
+            "slow_count": self.slow_count,
+        }
@@ -0,0 +1,6 @@
+-- upgrade schema version 0 to 1
+ALTER TABLE post ADD COLUMN body_html TEXT;
+CREATE INDEX IF NOT EXISTS post_created_time_oid_idx
+    ON post (created_time DESC, oid DESC);
+
+PRAGMA user_version = 1;
@@ -0,0 +1,10 @@
+-- upgrade schema version 1 to 2
+CREATE TABLE IF NOT EXISTS change_counter (
+    tag TEXT PRIMARY KEY,
+    value INTEGER
+);
+INSERT OR IGNORE INTO change_counter (tag, value)
+VALUES
+    ('rule', 0);
+
+PRAGMA user_version = 2;
@@ -0,0 +1,9 @@
+-- upgrade schema version 2 to 3
+CREATE INDEX IF NOT EXISTS log_entry_app_user_time_idx
+ON log_entry (app_user_oid, time DESC, oid DESC);
+CREATE INDEX IF NOT EXISTS log_entry_tag_time_idx
+ON log_entry (tag, time DESC, oid DESC);
+CREATE INDEX IF NOT EXISTS log_entry_time_idx
+ON log_entry (time DESC, oid DESC);
+
+PRAGMA user_version = 3;
@@ -0,0 +1,6 @@
+-- upgrade schema version 3 to 4
+INSERT OR IGNORE INTO change_counter (tag, value)
+VALUES
+    ('post', 0);
+
+PRAGMA user_version = 4;
@@ -0,0 +1,26 @@
+-- upgrade schema version 4 to 5
+CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+    title,
+    body,
+    content='post',
+    content_rowid='oid'
+);
+INSERT INTO post_fts (post_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN
+    INSERT INTO post_fts (rowid, title, body)
+    VALUES (new.oid, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN
+    INSERT INTO post_fts (post_fts, rowid, title, body)
+    VALUES ('delete', old.oid, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS post_fts_update
+AFTER UPDATE OF title, body ON post BEGIN
+    INSERT INTO post_fts (post_fts, rowid, title, body)
+    VALUES ('delete', old.oid, old.title, old.body);
+    INSERT INTO post_fts (rowid, title, body)
+    VALUES (new.oid, new.title, new.body);
+END;
+INSERT INTO post_fts (post_fts) VALUES ('rebuild');
+
+PRAGMA user_version = 5;
@@ -5,7 +5,9 @@ import logging
 from flask import Blueprint, current_app, g, request
 import jwt
 
-from shrikenet.db import get_services
+from shrikenet.api.token_cache import TokenCache
+from shrikenet.db import get_metrics, get_services
+from shrikenet.entities.exceptions import CryptoProviderBusy
 from shrikenet.usecases.login_to_system import LoginToSystem
 
 logger = logging.getLogger(__name__)
@@ -19,7 +21,22 @@ def get_token():
     password = json_data["password"]
     ip_address = request.remote_addr
     login_to_system = LoginToSystem(get_services())
-    login_result = login_to_system.run(username, password, ip_address)
+    try:
+        login_result = login_to_system.run(username, password, ip_address)
+        # a login may lock the user or change the password
+        get_token_cache().invalidate_username(username)
+    except CryptoProviderBusy:
+        error_code = 6
+        logger.info(
+            "Token request from %s refused since the server is busy "
+            "(error_code=%d).",
+            ip_address,
+            error_code,
+        )
+        return {
+            "error_code": error_code,
+            "message": "The server is busy. Please try again shortly.",
+        }, 503
     if login_result.has_failed:
         return {
             "error_code": 2,
@@ -59,17 +76,22 @@ def token_required(api):
                     error_code,
                     api.__name__,
                 )
+                count_token_verification(error_code)
                 return {
                     "error_code": error_code,
                     "message": message,
                 }
 
             secret_key = current_app.config["SECRET_KEY"]
+            token_cache = get_token_cache()
             try:
-                payload = decode_token(token, secret_key)
-                user_oid = payload["user_oid"]
-                db = get_services().storage_provider
-                g.user = db.get_app_user_by_oid(user_oid)
+                g.user = token_cache.get(token)
+                if g.user is None:
+                    payload = decode_token(token, secret_key)
+                    user_oid = payload["user_oid"]
+                    db = get_services().storage_provider
+                    g.user = db.get_app_user_by_oid(user_oid)
+                    token_cache.put(token, g.user, payload["exp"])
             except jwt.ExpiredSignatureError:
                 error_code = 4
                 message = "The authorization token has expired."
@@ -83,6 +105,7 @@ def token_required(api):
                     api.__name__,
                     str(expire_time),
                 )
+                count_token_verification(error_code)
                 return {
                     "error_code": error_code,
                     "message": message,
@@ -98,11 +121,13 @@ def token_required(api):
                     api.__name__,
                     str(error),
                 )
+                count_token_verification(error_code)
                 return {
                     "error_code": error_code,
                     "message": message,
                 }
 
+            count_token_verification(0)
             return api(**kwargs)
 
         except Exception as error:
@@ -120,6 +145,7 @@ def token_required(api):
                 api.__name__,
                 str(error),
             )
+            count_token_verification(error_code)
             return {
                 "error_code": error_code,
                 "message": message,
@@ -128,6 +154,26 @@ def token_required(api):
     return wrapped_api
 
 
+def count_token_verification(error_code):
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.increment(
+            "shrikenet_token_verifications_total",
+            {"error_code": error_code},
+        )
+
+
+def get_token_cache():
+    token_cache = current_app.extensions.get("token_cache")
+    if token_cache is None:
+        token_cache = TokenCache(
+            current_app.config["TOKEN_CACHE_SIZE"],
+            current_app.config["TOKEN_CACHE_SECONDS"],
+        )
+        current_app.extensions["token_cache"] = token_cache
+    return token_cache
+
+
 def decode_token(token, secret_key):
     payload = jwt.decode(
         token,
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+import copy
+import hmac
+import threading
+import time
+
+
+class TokenCache:
+    """LRU of verified tokens, keyed by signature, to the AppUser they
+    resolved to.
+
+    An entry is served until the token's exp or max_age_seconds after it
+    was cached, whichever comes first; the age limit bounds how stale a
+    snapshot can get when the user changes in another process.
+    """
+
+    def __init__(self, max_entries, max_age_seconds):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries = OrderedDict()  # signature -> _Entry
+        self._signatures_by_username = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_signature(token):
+        return token.rpartition(".")[2]
+
+    def get(self, token):
+        signature = self.get_signature(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None or not hmac.compare_digest(entry.token, token):
+                self.misses += 1
+                return None
+            if now >= entry.expire_time or now >= entry.stale_time:
+                self._remove(signature)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(signature)
+            self.hits += 1
+            return copy.copy(entry.app_user)
+
+    def put(self, token, app_user, expire_time):
+        if self.max_entries < 1:
+            return
+        signature = self.get_signature(token)
+        stale_time = time.time() + self.max_age_seconds
+        entry = _Entry(token, copy.copy(app_user), expire_time, stale_time)
+        with self._lock:
+            self._remove(signature)
+            self._entries[signature] = entry
+            self._signatures_by_username.setdefault(
+                app_user.username, set()
+            ).add(signature)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_username(self, username):
+        with self._lock:
+            signatures = self._signatures_by_username.pop(username, set())
+            for signature in signatures:
+                self._entries.pop(signature, None)
+
+    def _remove(self, signature):
+        entry = self._entries.pop(signature, None)
+        if entry is None:
+            return
+        signatures = self._signatures_by_username.get(
+            entry.app_user.username
+        )
+        if signatures is not None:
+            signatures.discard(signature)
+            if not signatures:
+                del self._signatures_by_username[entry.app_user.username]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._signatures_by_username.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Entry:
+
+    __slots__ = ("token", "app_user", "expire_time", "stale_time")
+
+    def __init__(self, token, app_user, expire_time, stale_time):
+        self.token = token
+        self.app_user = app_user
+        self.expire_time = expire_time
+        self.stale_time = stale_time
@@ -11,12 +11,16 @@ from flask import (
     url_for,
 )
 
+from shrikenet.api.token_authority import get_token_cache
 from shrikenet.db import get_services
 from shrikenet.entities.app_user import AppUser
+from shrikenet.entities.exceptions import CryptoProviderBusy
 from shrikenet.usecases.login_to_system import LoginToSystem
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+BUSY_MESSAGE = "The system is busy. Please try again shortly."
+
 
 @bp.route("/register", methods=("GET", "POST"))
 def register():
@@ -35,13 +39,18 @@ def register():
             error = "User {} is already registered.".format(username)
 
         if error is None:
+            try:
+                password_hash = crypto_provider.generate_hash_from_string(
+                    password
+                )
+            except CryptoProviderBusy:
+                flash(BUSY_MESSAGE)
+                return render_template("auth/register.html"), 503
             new_user = AppUser(
                 oid=-1,
                 username=username,
                 name=None,
-                password_hash=crypto_provider.generate_hash_from_string(
-                    password
-                ),
+                password_hash=password_hash,
             )
             storage_provider.add_app_user(new_user)
             storage_provider.commit()
@@ -58,9 +67,15 @@ def login():
         username = request.form["username"]
         password = request.form["password"]
         login_to_system = LoginToSystem(get_services())
-        login_result = login_to_system.run(
-            username, password, request.remote_addr
-        )
+        try:
+            login_result = login_to_system.run(
+                username, password, request.remote_addr
+            )
+            # a login may lock the user or change the password
+            get_token_cache().invalidate_username(username)
+        except CryptoProviderBusy:
+            flash(BUSY_MESSAGE)
+            return render_template("auth/login.html"), 503
 
         if login_result.has_failed:
             flash(login_result.message)
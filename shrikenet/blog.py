@@ -1,19 +1,26 @@
-from datetime import date, datetime
+from datetime import date, datetime, timezone
+import hashlib
 
 from flask import (
     Blueprint,
+    current_app,
     flash,
     g,
     redirect,
     render_template,
     request,
+    session,
     url_for,
 )
+from markupsafe import Markup, escape
 from werkzeug.exceptions import abort
+from werkzeug.http import is_resource_modified
 
 from shrikenet.auth import login_required
 from shrikenet.db import get_services
 from shrikenet.entities.post import Post
+from shrikenet.entities.post_html_cache import PostHtmlCache
+from shrikenet.entities.post_search import HIGHLIGHT_END, HIGHLIGHT_START
 
 bp = Blueprint("blog", __name__)
 
@@ -21,9 +28,220 @@ bp = Blueprint("blog", __name__)
 @bp.route("/")
 def index():
     storage_provider = get_services().storage_provider
-    posts = storage_provider.get_posts()
+    etag = get_index_etag(storage_provider)
+    if etag is not None and not is_resource_modified(
+        request.environ, etag=etag
+    ):
+        return get_not_modified_response(etag)
+    response = current_app.make_response(render_index(storage_provider))
+    if etag is not None:
+        set_shared_cache_headers(response, etag)
+    return response
+
+
+def get_index_etag(storage_provider):
+    """Return the ETag of an anonymous index page, or None when the page
+    is personal (a logged in user or pending flash messages)."""
+    if g.user is not None or "_flashes" in session:
+        return None
+    return get_posts_etag(
+        storage_provider,
+        request.query_string.decode("latin-1"),
+        date.today().isoformat(),
+        current_app.config["POSTS_PER_PAGE"],
+    )
+
+
+def get_posts_etag(storage_provider, *parts):
+    key = "/".join(
+        str(part) for part in (storage_provider.get_posts_version(), *parts)
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def get_not_modified_response(etag):
+    response = current_app.response_class(status=304)
+    set_shared_cache_headers(response, etag)
+    return response
+
+
+def set_shared_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config[
+        "BLOG_CACHE_MAX_AGE"
+    ]
+
+
+def render_index(storage_provider):
+    page_size = current_app.config["POSTS_PER_PAGE"]
+    before_time, before_oid = get_page_cursor("before")
+    after_time, after_oid = get_page_cursor("after")
+    posts = storage_provider.get_posts_page(
+        before_created_time=before_time,
+        before_oid=before_oid,
+        limit=page_size + 1,
+        after_created_time=after_time,
+        after_oid=after_oid,
+    )
+    has_more = len(posts) > page_size
+    if after_time is not None:
+        posts = posts[-page_size:]
+        has_newer, has_older = has_more, True
+    else:
+        posts = posts[:page_size]
+        has_newer, has_older = before_time is not None, has_more
+    for post in posts:
+        post.body_html = get_post_html(post)
+    newer_url = None
+    older_url = None
+    if has_newer and posts:
+        newer_url = get_page_url("after", posts[0])
+    if has_older and posts:
+        older_url = get_page_url("before", posts[-1])
     today = date.today()
-    return render_template("blog/index.html", posts=posts, today=today)
+    return render_template(
+        "blog/index.html",
+        posts=posts,
+        today=today,
+        newer_url=newer_url,
+        older_url=older_url,
+    )
+
+
+@bp.route("/feed.atom")
+def feed():
+    # no Last-Modified: post edits and deletes leave the newest created
+    # time as it was, so only the ETag, which follows every post change,
+    # can tell when the feed is current
+    storage_provider = get_services().storage_provider
+    feed_post_count = current_app.config["FEED_POST_COUNT"]
+    etag = get_posts_etag(storage_provider, "feed", feed_post_count)
+    if not is_resource_modified(request.environ, etag=etag):
+        return get_not_modified_response(etag)
+    posts = storage_provider.get_posts_page(limit=feed_post_count)
+    for post in posts:
+        post.body_html = get_post_html(post)
+    response = current_app.response_class(
+        render_template(
+            "blog/feed.xml",
+            posts=posts,
+            index_url=url_for("blog.index", _external=True),
+            updated=get_feed_updated(posts).isoformat(timespec="seconds"),
+        ),
+        mimetype="application/atom+xml",
+    )
+    set_shared_cache_headers(response, etag)
+    return response
+
+
+def get_feed_updated(posts):
+    if not posts:
+        return datetime.now(timezone.utc)
+    created_time = posts[0].created_time.astimezone(timezone.utc)
+    return created_time.replace(microsecond=0)
+
+
+@bp.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    after_rank, after_oid = get_search_cursor()
+    page_size = current_app.config["POSTS_PER_PAGE"]
+    results = []
+    more_url = None
+    if query:
+        results = get_services().storage_provider.search_posts(
+            query,
+            limit=page_size + 1,
+            after_rank=after_rank,
+            after_oid=after_oid,
+        )
+        if len(results) > page_size:
+            results = results[:page_size]
+            more_url = url_for(
+                "blog.search",
+                q=query,
+                after_rank=repr(results[-1].rank),
+                after_oid=results[-1].oid,
+            )
+    return render_template(
+        "blog/search.html", query=query, results=results, more_url=more_url
+    )
+
+
+def get_search_cursor():
+    rank_arg = request.args.get("after_rank")
+    oid_arg = request.args.get("after_oid")
+    if rank_arg is None and oid_arg is None:
+        return None, None
+    try:
+        return float(rank_arg), int(oid_arg)
+    except (TypeError, ValueError):
+        abort(400, "Invalid search page cursor.")
+
+
+@bp.app_template_filter("highlight")
+def highlight_to_html(text):
+    html = str(escape(text or ""))
+    html = html.replace(HIGHLIGHT_START, "<mark>")
+    return Markup(html.replace(HIGHLIGHT_END, "</mark>"))
+
+
+@bp.app_template_global()
+def get_post_url(post):
+    """Link to the index page that starts with post."""
+    return url_for(
+        "blog.index",
+        before_time=post.created_time.isoformat(timespec="microseconds"),
+        before_oid=post.oid + 1,
+        _anchor=f"post-{post.oid}",
+    )
+
+
+def get_post_html_cache():
+    cache = current_app.extensions.get("post_html_cache")
+    if cache is None:
+        max_entries = current_app.config["POST_HTML_CACHE_SIZE"]
+        cache = PostHtmlCache(max_entries)
+        current_app.extensions["post_html_cache"] = cache
+    return cache
+
+
+def get_post_html(post):
+    text_transformer = get_services().text_transformer
+    return get_post_html_cache().get_html(post, text_transformer)
+
+
+def render_post_body(post):
+    html = get_services().text_transformer.transform_to_html(post.body)
+    if current_app.config["POST_BODY_HTML_PERSIST"]:
+        post.body_html = html
+    else:
+        post.body_html = None
+    return html
+
+
+def get_page_cursor(direction):
+    time_arg = request.args.get(f"{direction}_time")
+    oid_arg = request.args.get(f"{direction}_oid")
+    if time_arg is None and oid_arg is None:
+        return None, None
+    try:
+        return datetime.fromisoformat(time_arg), int(oid_arg)
+    except (TypeError, ValueError):
+        abort(400, f"Invalid {direction} page cursor.")
+
+
+def get_page_url(direction, post):
+    return url_for(
+        "blog.index",
+        **{
+            f"{direction}_time": post.created_time.isoformat(
+                timespec="microseconds"
+            ),
+            f"{direction}_oid": post.oid,
+        },
+    )
 
 
 @bp.route("/create", methods=("GET", "POST"))
@@ -48,8 +266,10 @@ def create():
                 author_oid=g.user.oid,
                 created_time=datetime.now().astimezone(),
             )
+            html = render_post_body(post)
             post.oid = storage_provider.add_post(post)
             storage_provider.commit()
+            get_post_html_cache().store(post, html)
             return redirect(url_for("blog.index"))
 
     return render_template("blog/create.html")
@@ -87,8 +307,10 @@ def update(id):
             storage_provider = get_services().storage_provider
             post.title = title
             post.body = body
+            html = render_post_body(post)
             storage_provider.update_post(post)
             storage_provider.commit()
+            get_post_html_cache().store(post, html)
             return redirect(url_for("blog.index"))
 
     return render_template("blog/update.html", post=post)
@@ -101,4 +323,5 @@ def delete(id):
     storage_provider = get_services().storage_provider
     storage_provider.delete_post_by_oid(id)
     storage_provider.commit()
+    get_post_html_cache().invalidate(id)
     return redirect(url_for("blog.index"))
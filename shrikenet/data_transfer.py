@@ -0,0 +1,156 @@
+"""Export and import app users and posts as JSON lines.
+
+Each line holds one record, tagged with its type:
+
+    {"type": "app_user", "oid": 1, "username": "fmulder", ...}
+    {"type": "post", "oid": 7, "title": "...", "author_oid": 1, ...}
+
+Records keep their oids so posts still point at their authors after an
+import into a freshly built database. Rendered post HTML is derived from
+the body and so is not exported.
+"""
+
+from dataclasses import asdict
+from datetime import datetime
+import json
+
+from shrikenet.entities.app_user import AppUser
+from shrikenet.entities.post import Post
+
+DEFAULT_BATCH_SIZE = 1000
+
+APP_USER_DATETIME_FIELDS = ("last_password_failure_time",)
+POST_FIELDS = ("oid", "title", "body", "author_oid", "created_time")
+
+
+def export_data(
+    storage_provider,
+    output_file,
+    batch_size=DEFAULT_BATCH_SIZE,
+    progress=None,
+):
+    """Write every app user, then every post, to output_file.
+
+    Records are read a batch at a time, so memory use does not grow with
+    the size of the database. progress, if given, is called with the
+    running record count after each batch. Returns the count per type.
+    """
+    counts = {"app_user": 0, "post": 0}
+    for app_user in _iter_app_users(storage_provider, batch_size):
+        _write_record(output_file, app_user_to_record(app_user))
+        counts["app_user"] += 1
+        _report_progress(progress, counts, batch_size)
+    for post in storage_provider.iter_posts(batch_size):
+        _write_record(output_file, post_to_record(post))
+        counts["post"] += 1
+        _report_progress(progress, counts, batch_size)
+    return counts
+
+
+def _iter_app_users(storage_provider, batch_size):
+    after_oid = None
+    while True:
+        app_users = storage_provider.get_app_users_page(
+            after_oid=after_oid, limit=batch_size
+        )
+        yield from app_users
+        if len(app_users) < batch_size:
+            return
+        after_oid = app_users[-1].oid
+
+
+def _write_record(output_file, record):
+    output_file.write(json.dumps(record) + "\n")
+
+
+def _report_progress(progress, counts, batch_size):
+    total = counts["app_user"] + counts["post"]
+    if progress is not None and total % batch_size == 0:
+        progress(total)
+
+
+def import_data(
+    storage_provider,
+    input_file,
+    batch_size=DEFAULT_BATCH_SIZE,
+    progress=None,
+):
+    """Add the records in input_file in a single transaction.
+
+    Records are buffered per type and stored with add_app_users and
+    add_posts a batch at a time. Nothing is committed unless every line
+    imports; otherwise the transaction is rolled back and the error
+    raised. progress, if given, is called with the running record count
+    after each batch. Returns the count per type.
+    """
+    counts = {"app_user": 0, "post": 0}
+    batches = {"app_user": [], "post": []}
+    add_functions = {
+        "app_user": storage_provider.add_app_users,
+        "post": storage_provider.add_posts,
+    }
+    try:
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+            record_type, entity = record_to_entity(line, line_number)
+            batches[record_type].append(entity)
+            counts[record_type] += 1
+            if len(batches[record_type]) >= batch_size:
+                add_functions[record_type](batches[record_type])
+                batches[record_type] = []
+                if progress is not None:
+                    progress(counts["app_user"] + counts["post"])
+        for record_type, batch in batches.items():
+            if batch:
+                add_functions[record_type](batch)
+        storage_provider.commit()
+    except Exception:
+        storage_provider.rollback()
+        raise
+    return counts
+
+
+def app_user_to_record(app_user):
+    record = {"type": "app_user"}
+    record.update(asdict(app_user))
+    for field in APP_USER_DATETIME_FIELDS:
+        record[field] = _datetime_to_text(record[field])
+    return record
+
+
+def post_to_record(post):
+    record = {"type": "post"}
+    for field in POST_FIELDS:
+        record[field] = getattr(post, field)
+    record["created_time"] = _datetime_to_text(post.created_time)
+    return record
+
+
+def record_to_entity(line, line_number):
+    error = f"can not import line {line_number}, reason: "
+    try:
+        record = json.loads(line)
+        record_type = record.pop("type")
+        if record_type == "app_user":
+            for field in APP_USER_DATETIME_FIELDS:
+                record[field] = _text_to_datetime(record.get(field))
+            return record_type, AppUser(**record)
+        if record_type == "post":
+            record["created_time"] = _text_to_datetime(
+                record.get("created_time")
+            )
+            return record_type, Post(**record)
+    except Exception as e:
+        raise ValueError(error + str(e)) from e
+    raise ValueError(error + f"unknown record type {record_type!r}")
+
+
+def _datetime_to_text(value):
+    return (
+        None if value is None else value.isoformat(timespec="microseconds")
+    )
+
+
+def _text_to_datetime(value):
+    return None if value is None else datetime.fromisoformat(value)
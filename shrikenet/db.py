@@ -1,10 +1,31 @@
+import functools
 import importlib
+import logging
 
 import click
 from flask import current_app, g
 from flask.cli import with_appcontext
 
-from shrikenet.entities.services import Services
+from shrikenet.adapters.buffered_log import BufferedLogEntryWriter
+from shrikenet.adapters.crypto_pool import (
+    PooledCryptoAdapter,
+    get_hashing_pool,
+)
+from shrikenet.adapters.login_throttle import (
+    MemoryLoginThrottle,
+    SQLiteLoginThrottle,
+)
+from shrikenet.adapters.metrics import (
+    FileMetrics,
+    MemoryMetrics,
+    TimedCryptoAdapter,
+    TimedTextTransformer,
+)
+from shrikenet import data_transfer
+from shrikenet.entities.exceptions import DatastoreError
+from shrikenet.entities.services import LazyServices
+
+logger = logging.getLogger(__name__)
 
 
 def get_services():
@@ -15,27 +36,95 @@ def get_services():
 
 
 def initialize_services():
-    services = Services()
-    services.storage_provider = get_storage_provider()
-    services.text_transformer = get_text_transformer()
-    services.crypto_provider = get_crypto_provider()
-    services.password_checker = get_password_checker()
-    return services
+    # each service is built when a request first uses it
+    return LazyServices(
+        {
+            "storage_provider": get_storage_provider,
+            "text_transformer": get_text_transformer,
+            "crypto_provider": get_crypto_provider,
+            "password_checker": get_password_checker,
+            "log_entry_writer": get_log_entry_writer,
+            "login_throttle": get_login_throttle,
+            "metrics": get_metrics,
+            "rules_cache": get_rules_cache,
+        }
+    )
 
 
 def get_storage_provider():
+    storage_provider = open_storage_provider()
+    try:
+        check_schema_version(storage_provider)
+    except DatastoreError:
+        storage_provider.close()
+        raise
+    return storage_provider
+
+
+def open_storage_provider():
     storage_class = get_class_from_app_config(
         "STORAGE_PROVIDER_MODULE", "STORAGE_PROVIDER_CLASS"
     )
     storage_provider = storage_class(current_app.config)
     storage_provider.open()
+    g.db_stats = getattr(storage_provider, "stats", None)
     return storage_provider
 
 
+def check_schema_version(storage_provider):
+    # an out of date schema fails part way through the first write, so
+    # refuse it up front; the schema only changes through init-db and
+    # upgrade-db, so once per app is enough
+    if current_app.extensions.get("schema_version_checked"):
+        return
+    version = storage_provider.get_schema_version()
+    if version < storage_provider.SCHEMA_VERSION:
+        raise DatastoreError(
+            f"can not use database (schema version={version}, "
+            f"expected={storage_provider.SCHEMA_VERSION}), reason: schema "
+            f"is out of date, run `flask upgrade-db` (or `flask init-db` "
+            f"for a new database)"
+        )
+    current_app.extensions["schema_version_checked"] = True
+
+
+def get_unchecked_storage_provider(services):
+    # for the commands that bring the schema up to date
+    if not services.is_created("storage_provider"):
+        services.storage_provider = open_storage_provider()
+    return services.storage_provider
+
+
+def get_rules_cache():
+    # the storage provider's process-wide copy of the rules, which can be
+    # read without opening a connection
+    storage_class = get_class_from_app_config(
+        "STORAGE_PROVIDER_MODULE", "STORAGE_PROVIDER_CLASS"
+    )
+    if not hasattr(storage_class, "get_rules_cache"):
+        return None
+    return storage_class.get_rules_cache(current_app.config)
+
+
+# (module config key, class config key) of each configured provider
+PROVIDER_CLASS_KEYS = (
+    ("STORAGE_PROVIDER_MODULE", "STORAGE_PROVIDER_CLASS"),
+    ("TEXT_TRANSFORMER_MODULE", "TEXT_TRANSFORMER_CLASS"),
+    ("CRYPTO_PROVIDER_MODULE", "CRYPTO_PROVIDER_CLASS"),
+    ("PASSWORD_CHECKER_MODULE", "PASSWORD_CHECKER_CLASS"),
+)
+
+
 def get_class_from_app_config(module_name, class_name):
-    module = importlib.import_module(current_app.config[module_name])
-    class_ = getattr(module, current_app.config[class_name])
-    return class_
+    return load_class(
+        current_app.config[module_name], current_app.config[class_name]
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def load_class(module_name, class_name):
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
 
 
 def get_text_transformer():
@@ -43,6 +132,9 @@ def get_text_transformer():
         "TEXT_TRANSFORMER_MODULE", "TEXT_TRANSFORMER_CLASS"
     )
     text_transformer = transformer_class()
+    metrics = get_metrics()
+    if metrics is not None:
+        text_transformer = TimedTextTransformer(text_transformer, metrics)
     return text_transformer
 
 
@@ -51,6 +143,17 @@ def get_crypto_provider():
         "CRYPTO_PROVIDER_MODULE", "CRYPTO_PROVIDER_CLASS"
     )
     crypto_provider = crypto_class()
+    pool_size = current_app.config["CRYPTO_PROVIDER_POOL_SIZE"]
+    if pool_size > 0:
+        hashing_pool = get_hashing_pool(
+            pool_size,
+            current_app.config["CRYPTO_PROVIDER_QUEUE_SIZE"],
+            current_app.config["CRYPTO_PROVIDER_TIMEOUT_SECONDS"],
+        )
+        crypto_provider = PooledCryptoAdapter(crypto_provider, hashing_pool)
+    metrics = get_metrics()
+    if metrics is not None:
+        crypto_provider = TimedCryptoAdapter(crypto_provider, metrics)
     return crypto_provider
 
 
@@ -63,17 +166,86 @@ def get_password_checker():
     return password_checker
 
 
+def get_log_entry_writer():
+    max_entries = current_app.config["LOG_ENTRY_BUFFER_SIZE"]
+    if max_entries < 1:
+        return None
+    storage_class = get_class_from_app_config(
+        "STORAGE_PROVIDER_MODULE", "STORAGE_PROVIDER_CLASS"
+    )
+    # the writer stores through instances of its own, which would lose
+    # the entries of a provider whose instances each hold their own data
+    if not getattr(storage_class, "IS_SHARED", False):
+        return None
+    log_entry_writer = current_app.extensions.get("log_entry_writer")
+    if log_entry_writer is None:
+        log_entry_writer = BufferedLogEntryWriter(
+            functools.partial(storage_class, dict(current_app.config)),
+            max_entries,
+            current_app.config["LOG_ENTRY_FLUSH_SECONDS"],
+            synchronous=current_app.config["LOG_ENTRY_SYNCHRONOUS"],
+            max_buffered=current_app.config["LOG_ENTRY_BUFFER_LIMIT"],
+        )
+        current_app.extensions["log_entry_writer"] = log_entry_writer
+    return log_entry_writer
+
+
+def get_login_throttle():
+    login_throttle = current_app.extensions.get("login_throttle")
+    if login_throttle is None:
+        db_file = current_app.config["LOGIN_THROTTLE_DB"]
+        if db_file is None:
+            login_throttle = MemoryLoginThrottle(
+                current_app.config["LOGIN_THROTTLE_MAX_KEYS"]
+            )
+        else:
+            login_throttle = SQLiteLoginThrottle(
+                db_file,
+                current_app.config["STORAGE_PROVIDER_BUSY_TIMEOUT_MS"],
+            )
+        current_app.extensions["login_throttle"] = login_throttle
+    return login_throttle
+
+
+def get_metrics():
+    if not current_app.config["METRICS_ENABLED"]:
+        return None
+    metrics = current_app.extensions.get("metrics")
+    if metrics is None:
+        directory = current_app.config["METRICS_DIR"]
+        if directory is None:
+            metrics = MemoryMetrics()
+        else:
+            metrics = FileMetrics(
+                directory, current_app.config["METRICS_FLUSH_SECONDS"]
+            )
+        current_app.extensions["metrics"] = metrics
+    return metrics
+
+
 def close_services(e=None):
     services = g.pop("services", None)
 
-    if services is not None:
+    if services is not None and services.is_created("storage_provider"):
         services.storage_provider.close()
 
 
+def add_db_timing_headers(response):
+    """In debug mode, report the time the request spent running SQL."""
+    db_stats = g.get("db_stats")
+    if current_app.debug and db_stats is not None:
+        total_ms = db_stats.total_seconds * 1000
+        response.headers["X-DB-Time"] = f"{total_ms:.3f}"
+        response.headers["Server-Timing"] = (
+            f'db;dur={total_ms:.3f};desc="{db_stats.count} statements"'
+        )
+    return response
+
+
 def init_db():
-    services = get_services()
-    services.storage_provider.build_database_schema()
-    services.storage_provider.commit()
+    storage_provider = get_unchecked_storage_provider(get_services())
+    storage_provider.build_database_schema()
+    storage_provider.commit()
 
 
 @click.command("init-db")
@@ -84,6 +256,93 @@ def init_db_command():
     click.echo("Initialized the database.")
 
 
+def upgrade_db():
+    storage_provider = get_unchecked_storage_provider(get_services())
+    versions = storage_provider.upgrade_database_schema()
+    storage_provider.commit()
+    return versions
+
+
+@click.command("upgrade-db")
+@with_appcontext
+def upgrade_db_command():
+    """Upgrade the existing tables to the current schema."""
+    from_version, to_version = upgrade_db()
+    if from_version == to_version:
+        click.echo(f"Database schema is current (version {to_version}).")
+    else:
+        click.echo(
+            f"Upgraded the database schema from version {from_version} "
+            f"to {to_version}."
+        )
+
+
+def echo_progress(count):
+    click.echo(f"... {count} records", err=True)
+
+
+def format_counts(counts):
+    return f"{counts['app_user']} app users and {counts['post']} posts"
+
+
+@click.command("export-data")
+@click.argument("file", type=click.File("w"))
+@click.option(
+    "--batch-size",
+    default=data_transfer.DEFAULT_BATCH_SIZE,
+    show_default=True,
+    help="Records read per query.",
+)
+@with_appcontext
+def export_data_command(file, batch_size):
+    """Write all app users and posts to FILE as JSON lines."""
+    storage_provider = get_services().storage_provider
+    counts = data_transfer.export_data(
+        storage_provider, file, batch_size, echo_progress
+    )
+    click.echo(f"Exported {format_counts(counts)}.", err=True)
+
+
+@click.command("import-data")
+@click.argument("file", type=click.File("r"))
+@click.option(
+    "--batch-size",
+    default=data_transfer.DEFAULT_BATCH_SIZE,
+    show_default=True,
+    help="Records stored per statement.",
+)
+@with_appcontext
+def import_data_command(file, batch_size):
+    """Add the app users and posts in FILE, written by export-data."""
+    storage_provider = get_services().storage_provider
+    try:
+        counts = data_transfer.import_data(
+            storage_provider, file, batch_size, echo_progress
+        )
+    except Exception as e:
+        raise click.ClickException(f"Import failed, nothing stored. {e}")
+    click.echo(f"Imported {format_counts(counts)}.")
+
+
 def init_app(app):
+    # look up the provider classes once, rather than on each request; a
+    # class that can not be loaded fails when its service is first used,
+    # so commands such as init-db still run
+    for module_name, class_name in PROVIDER_CLASS_KEYS:
+        try:
+            load_class(app.config[module_name], app.config[class_name])
+        except (ImportError, AttributeError) as e:
+            logger.warning(
+                "can not load provider class (%s=%s, %s=%s), reason: %s",
+                module_name,
+                app.config[module_name],
+                class_name,
+                app.config[class_name],
+                e,
+            )
     app.teardown_appcontext(close_services)
+    app.after_request(add_db_timing_headers)
     app.cli.add_command(init_db_command)
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(export_data_command)
+    app.cli.add_command(import_data_command)
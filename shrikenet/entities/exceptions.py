@@ -20,3 +20,7 @@ class DatastoreError(ShrikeException):
 
 class DatastoreKeyError(ShrikeException, KeyError):
     pass
+
+
+class CryptoProviderBusy(ShrikeException):
+    pass
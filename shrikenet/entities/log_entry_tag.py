@@ -3,6 +3,7 @@ class LogEntryTag:
 
     dormant_user = "dormant_user"
     locked_user = "locked_user"
+    login_throttled = "login_throttled"
     must_change_password = "must_change_password"
     unknown_user = "unknown_user"
     user_login = "user_login"
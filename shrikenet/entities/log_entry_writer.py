@@ -0,0 +1,13 @@
+class LogEntryWriter:
+
+    def __init__(self):
+        raise NotImplementedError
+
+    def write(self, log_entry):
+        raise NotImplementedError
+
+    def flush(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+
+class LoginThrottle:
+
+    def __init__(self):
+        raise NotImplementedError
+
+    def acquire(self, key, capacity, window_seconds):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+@dataclass
+class ThrottleDecision:
+    is_allowed: bool
+    # allowed: attempts rejected since the key was last allowed, rejected:
+    # attempts rejected so far including this one, so 1 starts a run
+    rejected_count: int
+
+
+@dataclass
+class TokenBucket:
+    """Holds up to capacity attempts, refilled evenly over window_seconds.
+
+    Each attempt takes one token; an attempt finding the bucket empty is
+    rejected and counted, so rejections can be logged as one summary.
+    """
+
+    tokens: float
+    updated_time: float
+    rejected_count: int = 0
+
+    def take(self, capacity, window_seconds, now):
+        elapsed = max(0.0, now - self.updated_time)
+        self.tokens = min(
+            capacity, self.tokens + elapsed * capacity / window_seconds
+        )
+        self.updated_time = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            rejected_count = self.rejected_count
+            self.rejected_count = 0
+            return ThrottleDecision(True, rejected_count)
+        self.rejected_count += 1
+        return ThrottleDecision(False, self.rejected_count)
+
+
+@dataclass
+class ThrottleLimits:
+    ip_attempts: int
+    username_attempts: int
+    window_seconds: int
+
+    @classmethod
+    def from_rules(cls, rules):
+        return cls(
+            rules.login_throttle_ip_attempts,
+            rules.login_throttle_username_attempts,
+            rules.login_throttle_window_seconds,
+        )
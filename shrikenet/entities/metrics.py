@@ -0,0 +1,201 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+# upper bounds in seconds, each observation also counts toward +Inf
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# name -> (type, help text), in the order metrics are exposed
+METRIC_DEFINITIONS = {
+    "shrikenet_request_seconds": (
+        "histogram",
+        "Time to handle a request, by endpoint.",
+    ),
+    "shrikenet_logins_total": (
+        "counter",
+        "Login attempts, by the log entry tag of their outcome.",
+    ),
+    "shrikenet_token_verifications_total": (
+        "counter",
+        "API token checks, by error_code (0 is a valid token).",
+    ),
+    "shrikenet_password_hash_seconds": (
+        "histogram",
+        "Time to generate or check a password hash, by operation.",
+    ),
+    "shrikenet_markdown_render_seconds": (
+        "histogram",
+        "Time to render a post body to HTML.",
+    ),
+    "shrikenet_sql_request_seconds": (
+        "histogram",
+        "Time a request spent running SQL statements.",
+    ),
+    "shrikenet_sql_statements_total": (
+        "counter",
+        "SQL statements run, by whether they were slow.",
+    ),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+
+    def __init__(self):
+        raise NotImplementedError
+
+    def increment(self, name, labels=None, amount=1):
+        raise NotImplementedError
+
+    def observe(self, name, value, labels=None):
+        raise NotImplementedError
+
+    def collect(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+def get_label_key(labels):
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+@dataclass
+class MetricSamples:
+    """Counter values and histogram bucket counts keyed by (name, labels).
+
+    Histogram values are [counts per bucket with +Inf last, sum, count];
+    the counts are not cumulative until formatted.
+    """
+
+    counters: dict = field(default_factory=dict)
+    histograms: dict = field(default_factory=dict)
+    buckets: tuple = DEFAULT_BUCKETS
+
+    def increment(self, name, label_key, amount):
+        key = (name, label_key)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, label_key, value):
+        key = (name, label_key)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self.histograms[key] = histogram
+        histogram[0][bisect_left(self.buckets, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def merge(self, other):
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, (counts, sum_, count) in other.histograms.items():
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                self.histograms[key] = [list(counts), sum_, count]
+                continue
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += sum_
+            histogram[2] += count
+
+    def copy(self):
+        samples = MetricSamples(buckets=self.buckets)
+        samples.merge(self)
+        return samples
+
+    def to_dict(self):
+        return {
+            "counters": [
+                [name, label_key, value]
+                for (name, label_key), value in self.counters.items()
+            ],
+            "histograms": [
+                [name, label_key, counts, sum_, count]
+                for (name, label_key), (
+                    counts,
+                    sum_,
+                    count,
+                ) in self.histograms.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, buckets=DEFAULT_BUCKETS):
+        samples = cls(buckets=buckets)
+        for name, label_key, value in data["counters"]:
+            key = (name, tuple(tuple(pair) for pair in label_key))
+            samples.counters[key] = value
+        for name, label_key, counts, sum_, count in data["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in label_key))
+            samples.histograms[key] = [counts, sum_, count]
+        return samples
+
+
+def format_metrics(samples):
+    """Return samples in the Prometheus text exposition format."""
+    families = {}
+    for (name, label_key), value in sorted(samples.counters.items()):
+        families.setdefault(name, []).append(
+            f"{name}{_format_labels(label_key)} {_format_value(value)}"
+        )
+    for (name, label_key), (counts, sum_, count) in sorted(
+        samples.histograms.items()
+    ):
+        lines = families.setdefault(name, [])
+        cumulative = 0
+        bounds = [_format_value(b) for b in samples.buckets] + ["+Inf"]
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels(label_key + (("le", bound),))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        labels = _format_labels(label_key)
+        lines.append(f"{name}_sum{labels} {_format_value(sum_)}")
+        lines.append(f"{name}_count{labels} {count}")
+    output = []
+    names = list(METRIC_DEFINITIONS)
+    names += sorted(name for name in families if name not in names)
+    for name in names:
+        if name not in families:
+            continue
+        type_, help_text = METRIC_DEFINITIONS.get(name, ("untyped", ""))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {type_}")
+        output.extend(families[name])
+    return "\n".join(output) + "\n" if output else ""
+
+
+def _format_labels(label_key):
+    if not label_key:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in label_key
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label_value(value):
+    return (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _format_value(value):
+    return repr(float(value))
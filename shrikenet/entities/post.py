@@ -1,13 +1,20 @@
 class Post:
 
     def __init__(
-        self, title, body, oid=None, author_oid=None, created_time=None
+        self,
+        title,
+        body,
+        oid=None,
+        author_oid=None,
+        created_time=None,
+        body_html=None,
     ):
         self.oid = oid
         self.title = title
         self.body = body
         self.author_oid = author_oid
         self.created_time = created_time
+        self.body_html = body_html  # rendered body, derived so not compared
 
     def __eq__(self, other):
         return (
@@ -29,5 +36,6 @@ class DeepPost(Post):
             post.oid,
             post.author_oid,
             post.created_time,
+            post.body_html,
         )
         self.author_username = author_username
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+class PostHtmlCache:
+    """LRU cache of rendered post bodies keyed by post oid and body hash.
+
+    A post whose body_html is already set (persisted with the post) is
+    returned as is, so it costs no rendering or cache space.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1000
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # oid -> (body digest, html)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_digest(body):
+        return hashlib.sha1((body or "").encode("utf-8")).digest()
+
+    def get_html(self, post, text_transformer):
+        if post.body_html is not None:
+            return post.body_html
+        digest = self.get_digest(post.body)
+        with self._lock:
+            entry = self._entries.get(post.oid)
+            if entry is not None and entry[0] == digest:
+                self._entries.move_to_end(post.oid)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        html = text_transformer.transform_to_html(post.body)
+        self._put(post.oid, digest, html)
+        return html
+
+    def store(self, post, html):
+        self._put(post.oid, self.get_digest(post.body), html)
+
+    def _put(self, oid, digest, html):
+        if self.max_entries < 1:
+            return
+        with self._lock:
+            self._entries[oid] = (digest, html)
+            self._entries.move_to_end(oid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, oid):
+        with self._lock:
+            self._entries.pop(oid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,28 @@
+import re
+
+from shrikenet.entities.post import DeepPost
+
+# storage providers wrap matched terms in these control characters,
+# which survive HTML escaping so views can swap them for tags afterwards
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def get_search_terms(text):
+    """Split text into the lower case words a search matches on.
+
+    Punctuation and search operators are dropped, so any user input is a
+    valid query: every remaining term must match.
+    """
+    return [term.lower() for term in _TERM_PATTERN.findall(text or "")]
+
+
+class PostSearchResult(DeepPost):
+
+    def __init__(self, post, rank, title_highlight, body_snippet):
+        super().__init__(post, post.author_username)
+        self.rank = rank  # lower ranks first
+        self.title_highlight = title_highlight
+        self.body_snippet = body_snippet
@@ -2,12 +2,26 @@ class Rules:
 
     DEFAULT_LOGIN_FAIL_THRESHOLD_COUNT = 3
     DEFAULT_LOGIN_FAIL_LOCK_MINUTES = 15
+    DEFAULT_LOGIN_THROTTLE_IP_ATTEMPTS = 20
+    DEFAULT_LOGIN_THROTTLE_USERNAME_ATTEMPTS = 10
+    DEFAULT_LOGIN_THROTTLE_WINDOW_SECONDS = 60
 
     def __init__(self):
         self.login_fail_threshold_count = (
             self.DEFAULT_LOGIN_FAIL_THRESHOLD_COUNT
         )
         self.login_fail_lock_minutes = self.DEFAULT_LOGIN_FAIL_LOCK_MINUTES
+        # login attempts allowed per window from one IP address and for
+        # one username, refilled evenly over the window
+        self.login_throttle_ip_attempts = (
+            self.DEFAULT_LOGIN_THROTTLE_IP_ATTEMPTS
+        )
+        self.login_throttle_username_attempts = (
+            self.DEFAULT_LOGIN_THROTTLE_USERNAME_ATTEMPTS
+        )
+        self.login_throttle_window_seconds = (
+            self.DEFAULT_LOGIN_THROTTLE_WINDOW_SECONDS
+        )
 
     def __eq__(self, other):
         return (
@@ -16,4 +30,10 @@ class Rules:
             == other.login_fail_threshold_count
             and self.login_fail_lock_minutes
             == other.login_fail_lock_minutes
+            and self.login_throttle_ip_attempts
+            == other.login_throttle_ip_attempts
+            and self.login_throttle_username_attempts
+            == other.login_throttle_username_attempts
+            and self.login_throttle_window_seconds
+            == other.login_throttle_window_seconds
         )
@@ -0,0 +1,53 @@
+import copy
+import threading
+import time
+
+
+class RulesCache:
+    """Process-wide copy of the Rules tagged with the change count read
+    alongside them.
+
+    Within ttl_seconds of the last check the cached rules are served
+    without touching storage. After that the caller compares the stored
+    change count (a single-row read) and only reloads when it moved.
+    """
+
+    def __init__(self, ttl_seconds, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._rules = None
+        self._version = None
+        self._checked_time = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+
+    def get_fresh(self):
+        with self._lock:
+            if self._rules is None:
+                return None
+            if self.clock() - self._checked_time > self.ttl_seconds:
+                return None
+            self.hits += 1
+            return copy.copy(self._rules)
+
+    def get_for_version(self, version):
+        with self._lock:
+            if self._rules is None or self._version != version:
+                return None
+            self._checked_time = self.clock()
+            self.hits += 1
+            return copy.copy(self._rules)
+
+    def put(self, version, rules):
+        with self._lock:
+            self._rules = copy.copy(rules)
+            self._version = version
+            self._checked_time = self.clock()
+            self.reloads += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._rules = None
+            self._version = None
+            self._checked_time = None
@@ -15,6 +15,18 @@ class RulesValidator(RecordValidator):
         FieldValidator.validate_int(
             rules.login_fail_lock_minutes, field_name, lower_limit
         )
+        field_name = "login_throttle_ip_attempts"
+        FieldValidator.validate_int(
+            rules.login_throttle_ip_attempts, field_name, lower_limit
+        )
+        field_name = "login_throttle_username_attempts"
+        FieldValidator.validate_int(
+            rules.login_throttle_username_attempts, field_name, lower_limit
+        )
+        field_name = "login_throttle_window_seconds"
+        FieldValidator.validate_int(
+            rules.login_throttle_window_seconds, field_name, lower_limit
+        )
 
     @staticmethod
     def validate_references(app_user, storage_provider):
@@ -6,8 +6,39 @@ class Services:
         text_transformer=None,
         crypto_provider=None,
         password_checker=None,
+        log_entry_writer=None,
+        login_throttle=None,
+        metrics=None,
+        rules_cache=None,
     ):
         self.storage_provider = storage_provider
         self.text_transformer = text_transformer
         self.crypto_provider = crypto_provider
         self.password_checker = password_checker
+        self.log_entry_writer = log_entry_writer
+        self.login_throttle = login_throttle
+        self.metrics = metrics
+        self.rules_cache = rules_cache
+
+
+class LazyServices(Services):
+    """Services built on first use by the factory of the same name.
+
+    A service never used in a request is never built, so is_created tells
+    which ones need closing.
+    """
+
+    def __init__(self, factories):
+        self._factories = dict(factories)
+
+    def __getattr__(self, name):
+        # only called for services not built yet
+        factory = self.__dict__.get("_factories", {}).get(name)
+        if factory is None:
+            raise AttributeError(name)
+        service = factory()
+        setattr(self, name, service)
+        return service
+
+    def is_created(self, name):
+        return name in self.__dict__
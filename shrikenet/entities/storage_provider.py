@@ -1,5 +1,9 @@
 class StorageProvider:
 
+    # True when instances opened with the same config see each other's
+    # committed changes, so work can be handed to an instance of its own
+    IS_SHARED = False
+
     def __init__(self, db_config):
         raise NotImplementedError
 
@@ -21,6 +25,12 @@ class StorageProvider:
     def reset_database_objects(self):
         raise NotImplementedError
 
+    def upgrade_database_schema(self):
+        raise NotImplementedError
+
+    def get_schema_version(self):
+        raise NotImplementedError
+
     def get_version(self):
         raise NotImplementedError
 
@@ -36,12 +46,21 @@ class StorageProvider:
     def get_app_user_by_username(self, username):
         raise NotImplementedError
 
+    def find_app_user_by_username(self, username):
+        raise NotImplementedError
+
     def get_app_user_by_oid(self, oid):
         raise NotImplementedError
 
     def add_app_user(self, app_user):
         raise NotImplementedError
 
+    def add_app_users(self, app_users):
+        raise NotImplementedError
+
+    def get_app_users_page(self, after_oid=None, limit=100):
+        raise NotImplementedError
+
     def update_app_user(self, app_user):
         raise NotImplementedError
 
@@ -57,6 +76,29 @@ class StorageProvider:
     def add_log_entry(self, log_entry):
         raise NotImplementedError
 
+    def add_log_entries(self, log_entries):
+        raise NotImplementedError
+
+    def get_log_entries_for_user(
+        self,
+        app_user_oid,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        raise NotImplementedError
+
+    def get_log_entries_by_tag(
+        self,
+        tag,
+        since=None,
+        limit=100,
+        before_time=None,
+        before_oid=None,
+    ):
+        raise NotImplementedError
+
     def get_last_log_entry(self):
         raise NotImplementedError
 
@@ -66,6 +108,9 @@ class StorageProvider:
     def add_post(self, post):
         raise NotImplementedError
 
+    def add_posts(self, posts):
+        raise NotImplementedError
+
     def update_post(self, post):
         raise NotImplementedError
 
@@ -75,9 +120,30 @@ class StorageProvider:
     def get_post_count(self):
         raise NotImplementedError
 
+    def get_posts_version(self):
+        raise NotImplementedError
+
     def get_posts(self):
         raise NotImplementedError
 
+    def iter_posts(self, batch_size=100):
+        raise NotImplementedError
+
+    def get_posts_page(
+        self,
+        before_created_time=None,
+        before_oid=None,
+        limit=20,
+        after_created_time=None,
+        after_oid=None,
+    ):
+        raise NotImplementedError
+
+    def search_posts(
+        self, query, limit=20, after_rank=None, after_oid=None
+    ):
+        raise NotImplementedError
+
     def get_rules(self):
         raise NotImplementedError
 
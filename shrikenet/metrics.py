@@ -0,0 +1,58 @@
+import time
+
+from flask import Blueprint, Response, abort, g, request
+
+from shrikenet.db import get_metrics
+from shrikenet.entities.metrics import CONTENT_TYPE, format_metrics
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+def expose_metrics():
+    metrics = get_metrics()
+    if metrics is None:
+        abort(404)
+    text = format_metrics(metrics.collect())
+    return Response(text, content_type=CONTENT_TYPE)
+
+
+def start_request_timer():
+    if get_metrics() is not None:
+        g.request_start_time = time.perf_counter()
+
+
+def record_request_metrics(response):
+    metrics = get_metrics()
+    start_time = g.get("request_start_time")
+    if metrics is None or start_time is None:
+        return response
+    endpoint = request.endpoint or "unmatched"
+    metrics.observe(
+        "shrikenet_request_seconds",
+        time.perf_counter() - start_time,
+        {"endpoint": endpoint},
+    )
+    db_stats = g.get("db_stats")
+    if db_stats is not None and db_stats.count > 0:
+        metrics.observe(
+            "shrikenet_sql_request_seconds", db_stats.total_seconds
+        )
+        metrics.increment(
+            "shrikenet_sql_statements_total",
+            {"slow": "false"},
+            db_stats.count - db_stats.slow_count,
+        )
+        if db_stats.slow_count > 0:
+            metrics.increment(
+                "shrikenet_sql_statements_total",
+                {"slow": "true"},
+                db_stats.slow_count,
+            )
+    return response
+
+
+def init_app(app):
+    app.before_request(start_request_timer)
+    app.after_request(record_request_metrics)
+    app.register_blueprint(bp)
@@ -3,6 +3,7 @@ import logging
 
 from shrikenet.entities.log_entry import LogEntry
 from shrikenet.entities.log_entry_tag import LogEntryTag
+from shrikenet.entities.login_throttle import ThrottleLimits
 from shrikenet.usecases.login_to_system_result import LoginToSystemResult
 
 
@@ -11,15 +12,34 @@ class LoginToSystem:
     USECASE_TAG = "login_to_system"
 
     def __init__(self, services):
-        self.db = services.storage_provider
-        self.crypto = services.crypto_provider
+        # storage, crypto and the password checker are only looked up when
+        # used, so a throttled attempt never opens a connection
+        self.services = services
+        self._db = None
         self.logger = logging.getLogger(__name__)
-        self.pw_checker = services.password_checker
+        self.log_writer = getattr(services, "log_entry_writer", None)
+        self.login_throttle = getattr(services, "login_throttle", None)
+        self.metrics = getattr(services, "metrics", None)
+        self.rules_cache = getattr(services, "rules_cache", None)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self.services.storage_provider
+        return self._db
+
+    @property
+    def crypto(self):
+        return self.services.crypto_provider
+
+    @property
+    def pw_checker(self):
+        return self.services.password_checker
 
     def run(self, username, password, ip_address, new_password=None):
         try:
-            self._verify_user_exists(username, ip_address)
-            user = self.db.get_app_user_by_username(username)
+            self._verify_attempt_not_throttled(username, ip_address)
+            user = self._get_existing_user(username, ip_address)
             self._verify_user_active(user, ip_address)
             self._verify_user_unlocked(user, ip_address)
             self._verify_user_password_correct(user, password, ip_address)
@@ -56,9 +76,16 @@ class LoginToSystem:
             message += suffix
             log_entry_text += suffix
 
-        user.is_locked = False
-        user.ongoing_password_failure_count = 0
-        self.db.update_app_user(user)
+        # a clean login of an unlocked user with no failures to clear
+        # changes nothing, so it skips the update
+        if (
+            new_password is not None
+            or user.is_locked
+            or user.ongoing_password_failure_count != 0
+        ):
+            user.is_locked = False
+            user.ongoing_password_failure_count = 0
+            self.db.update_app_user(user)
         log_entry_tag = LogEntryTag.user_login
         self._record_log_entry(user.oid, log_entry_tag, log_entry_text)
         return LoginToSystemResult(
@@ -68,8 +95,62 @@ class LoginToSystem:
             user_oid=user.oid,
         )
 
-    def _verify_user_exists(self, username, ip_address):
-        if self.db.exists_app_username(username) is False:
+    def _verify_attempt_not_throttled(self, username, ip_address):
+        # checked before any lookup or hashing, and rejections are logged
+        # once per run of them rather than once per attempt
+        if self.login_throttle is None:
+            return
+        throttle_limits = self._get_throttle_limits()
+        window_seconds = throttle_limits.window_seconds
+        limits = (
+            (f"ip_address={ip_address}", throttle_limits.ip_attempts),
+            (f"username={username}", throttle_limits.username_attempts),
+        )
+        for key, capacity in limits:
+            decision = self.login_throttle.acquire(
+                key, capacity, window_seconds
+            )
+            if decision.is_allowed:
+                if decision.rejected_count > 0:
+                    log_entry_text = (
+                        f"Login attempts ({key}) are no longer throttled, "
+                        f"{decision.rejected_count} were rejected."
+                    )
+                    self._record_log_entry(
+                        None,
+                        LogEntryTag.login_throttled,
+                        log_entry_text,
+                        is_outcome=False,
+                    )
+                continue
+            if decision.rejected_count == 1:
+                log_entry_text = (
+                    f"Login attempts ({key}) from {ip_address} exceeded "
+                    f"{capacity} per {window_seconds} seconds and are "
+                    f"throttled."
+                )
+                self._record_log_entry(
+                    None, LogEntryTag.login_throttled, log_entry_text
+                )
+            else:
+                self._count_outcome(LogEntryTag.login_throttled)
+            raise LoginToSystemError(
+                "Login attempt failed. Too many attempts, try again later."
+            )
+
+    def _get_throttle_limits(self):
+        # rules cached by the storage provider are read without opening a
+        # connection; once stale, get_rules rechecks them
+        rules = None
+        if self.rules_cache is not None:
+            rules = self.rules_cache.get_fresh()
+        if rules is None:
+            rules = self.db.get_rules()
+        return ThrottleLimits.from_rules(rules)
+
+    def _get_existing_user(self, username, ip_address):
+        user = self.db.find_app_user_by_username(username)
+        if user is None:
             log_entry_tag = LogEntryTag.unknown_user
             log_entry_text = (
                 f"Unknown app user (username={username}) "
@@ -77,12 +158,25 @@ class LoginToSystem:
             )
             self._record_log_entry(None, log_entry_tag, log_entry_text)
             raise LoginToSystemError("Login attempt failed.")
+        return user
 
-    def _record_log_entry(self, app_user_oid, tag, text):
+    def _record_log_entry(self, app_user_oid, tag, text, is_outcome=True):
+        if is_outcome:
+            self._count_outcome(tag)
         log_entry = self._create_login_log_entry(app_user_oid, tag, text)
-        log_entry.oid = self.db.add_log_entry(log_entry)
+        if self.log_writer is None:
+            log_entry.oid = self.db.add_log_entry(log_entry)
+        if self._db is not None:
+            self._db.commit()  # also commits any app_user update
+        if self.log_writer is not None:
+            # once committed, so the writer's own connection is not left
+            # waiting on this one's write lock
+            self.log_writer.write(log_entry)
         self.logger.info(text)
-        self.db.commit()
+
+    def _count_outcome(self, tag):
+        if self.metrics is not None:
+            self.metrics.increment("shrikenet_logins_total", {"tag": tag})
 
     def _create_login_log_entry(self, app_user_oid, log_entry_tag, text):
         return LogEntry(
@@ -53,6 +53,25 @@ def test_get_app_user_by_username_gets_record(db):
     assert stored_user == original_user
 
 
+def test_find_app_user_by_username_gets_record(db):
+    original_user = create_and_add_user(db)
+    found_user = db.find_app_user_by_username(original_user.username)
+    assert found_user == original_user
+
+
+def test_find_app_user_by_username_none_for_unknown(db, caplog):
+    assert db.find_app_user_by_username("xyz") is None
+    assert caplog.records == []
+
+
+def test_find_app_user_by_username_is_one_statement(db):
+    create_and_add_user(db)
+    db.commit()
+    count = db.statement_count
+    db.find_app_user_by_username("mawesome")
+    assert db.statement_count == count + 1
+
+
 def test_get_app_user_by_oid_unknown_raises(db):
     regex = "can not get app_user .oid=12345., reason: "
     with pytest.raises(DatastoreKeyError, match=regex):
@@ -134,3 +153,53 @@ def test_add_app_user_record_gone_after_rollback(db):
     app_user = create_and_add_user(db)
     db.rollback()
     assert not db.exists_app_username(app_user.username)
+
+
+def create_users(count):
+    app_users = []
+    for index in range(count):
+        app_user = create_user()
+        app_user.username = f"user{index}"
+        app_users.append(app_user)
+    return app_users
+
+
+def test_add_app_users_adds_records(db):
+    app_users = create_users(3)
+    db.add_app_users(app_users)
+    assert db.get_app_user_count() == 3
+    stored_user = db.get_app_user_by_username("user1")
+    app_users[1].oid = stored_user.oid
+    assert stored_user == app_users[1]
+
+
+def test_add_app_users_keeps_given_oids(db):
+    app_users = create_users(2)
+    app_users[0].oid = 40
+    app_users[1].oid = 42
+    db.add_app_users(app_users)
+    assert db.get_app_user_by_oid(42).username == "user1"
+
+
+def test_add_app_users_is_undone_by_rollback(db):
+    db.add_app_users(create_users(3))
+    db.rollback()
+    assert db.get_app_user_count() == 0
+
+
+def test_add_app_users_with_duplicate_username_raises(db):
+    app_users = create_users(2)
+    app_users[1].username = app_users[0].username
+    regex = "can not add 2 app_users, reason: UNIQUE constraint failed"
+    with pytest.raises(DatastoreError, match=regex):
+        db.add_app_users(app_users)
+
+
+def test_get_app_users_page_walks_users_by_oid(db):
+    db.add_app_users(create_users(5))
+    first_page = db.get_app_users_page(limit=3)
+    second_page = db.get_app_users_page(
+        after_oid=first_page[-1].oid, limit=3
+    )
+    usernames = [app_user.username for app_user in first_page + second_page]
+    assert usernames == [f"user{index}" for index in range(5)]
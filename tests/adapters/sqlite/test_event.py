@@ -70,3 +70,118 @@ def test_get_last_log_entry_when_none_raises(db):
     regex = "there are no log entry records"
     with pytest.raises(DatastoreKeyError, match=regex):
         db.get_last_log_entry()
+
+
+def test_add_log_entries_adds_records(db, existing_log_entry):
+    new_entries = []
+    for i in range(3):
+        log_entry = copy.copy(existing_log_entry)
+        log_entry.oid = None
+        log_entry.text = f"entry {i}"
+        new_entries.append(log_entry)
+    db.add_log_entries(new_entries)
+    for i in range(3):
+        stored_log_entry = db.get_log_entry_by_oid(
+            existing_log_entry.oid + 1 + i
+        )
+        assert stored_log_entry.text == f"entry {i}"
+    assert db.get_last_log_entry().text == "entry 2"
+
+
+def test_add_log_entries_allows_empty_list(db, existing_log_entry):
+    db.add_log_entries([])
+    assert db.get_last_log_entry() == existing_log_entry
+
+
+@pytest.fixture
+def log_entry_history(db, existing_log_entry):
+    other_user = AppUser(
+        oid=-1,
+        username="dscully",
+        name="Dana Scully",
+        password_hash=None,
+    )
+    other_user.oid = db.add_app_user(other_user)
+    log_entries = [existing_log_entry]
+    for day in range(26, 31):
+        log_entry = copy.copy(existing_log_entry)
+        log_entry.time = datetime(2018, 12, day, 0, 0)
+        log_entry.tag = "login_succeeded" if day % 2 else "password_failure"
+        if day == 30:
+            log_entry.app_user_oid = other_user.oid
+            log_entry.app_user_name = other_user.name
+        log_entry.oid = db.add_log_entry(log_entry)
+        log_entries.append(log_entry)
+    return log_entries
+
+
+def test_get_log_entries_for_user_newest_first(db, log_entry_history):
+    app_user_oid = log_entry_history[0].app_user_oid
+    log_entries = db.get_log_entries_for_user(app_user_oid)
+    assert log_entries == list(reversed(log_entry_history[:5]))
+
+
+def test_get_log_entries_for_user_since(db, log_entry_history):
+    app_user_oid = log_entry_history[0].app_user_oid
+    log_entries = db.get_log_entries_for_user(
+        app_user_oid, since=datetime(2018, 12, 27, 0, 0)
+    )
+    assert log_entries == [
+        log_entry_history[4],
+        log_entry_history[3],
+        log_entry_history[2],
+    ]
+
+
+def test_get_log_entries_for_user_pages_by_keyset(db, log_entry_history):
+    app_user_oid = log_entry_history[0].app_user_oid
+    first_page = db.get_log_entries_for_user(app_user_oid, limit=2)
+    last = first_page[-1]
+    second_page = db.get_log_entries_for_user(
+        app_user_oid, limit=2, before_time=last.time, before_oid=last.oid
+    )
+    assert first_page == [log_entry_history[4], log_entry_history[3]]
+    assert second_page == [log_entry_history[2], log_entry_history[1]]
+
+
+def test_get_log_entries_for_unknown_user_is_empty(db, log_entry_history):
+    assert db.get_log_entries_for_user(12345) == []
+
+
+def test_get_log_entries_by_tag(db, log_entry_history):
+    log_entries = db.get_log_entries_by_tag("login_succeeded")
+    assert log_entries == [log_entry_history[4], log_entry_history[2]]
+
+
+def test_get_log_entries_by_tag_since_and_before(db, log_entry_history):
+    log_entries = db.get_log_entries_by_tag(
+        "password_failure",
+        since=datetime(2018, 12, 26, 0, 0),
+        before_time=log_entry_history[5].time,
+        before_oid=log_entry_history[5].oid,
+    )
+    assert log_entries == [log_entry_history[3], log_entry_history[1]]
+
+
+@pytest.mark.parametrize(
+    "sql, index",
+    [
+        (
+            "SELECT oid FROM log_entry WHERE app_user_oid = ? "
+            "ORDER BY time DESC, oid DESC LIMIT 10",
+            "log_entry_app_user_time_idx",
+        ),
+        (
+            "SELECT oid FROM log_entry WHERE tag = ? "
+            "ORDER BY time DESC, oid DESC LIMIT 10",
+            "log_entry_tag_time_idx",
+        ),
+    ],
+)
+def test_log_entry_lookups_use_index(db, sql, index):
+    plan = db.connection.execute(
+        "EXPLAIN QUERY PLAN " + sql, [1]
+    ).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert f"INDEX {index}" in details
+    assert "TEMP B-TREE" not in details
@@ -2,7 +2,8 @@ from datetime import datetime
 
 import pytest
 
-from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.adapters import sqlite
+from shrikenet.adapters.sqlite import SQLiteAdapter, clean_sql
 from shrikenet.entities.exceptions import (
     DatastoreAlreadyOpen,
     DatastoreError,
@@ -70,3 +71,55 @@ def test_sql_to_datetime_converts_to_expected_time(db):
     )
     sql_boxing = "2023-12-26T14:01:02.334455"
     assert db.sql_to_datetime(sql_boxing) == boxing_2023
+
+
+def test_clean_sql_dedents_once_per_statement():
+    sql = """
+        SELECT oid
+        FROM post
+    """
+    assert clean_sql(sql) == "SELECT oid\nFROM post"
+    hits = clean_sql.cache_info().hits
+    assert clean_sql(sql) is clean_sql(sql)
+    assert clean_sql.cache_info().hits == hits + 2
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    (
+        ({}, SQLiteAdapter.DEFAULT_CACHED_STATEMENTS),
+        ({"STORAGE_PROVIDER_CACHED_STATEMENTS": 512}, 512),
+    ),
+)
+def test_connection_caches_statements(
+    db_config, monkeypatch, config, expected
+):
+    connect_kwargs = []
+    real_connect = sqlite.sqlite3.connect
+
+    def spy_connect(*args, **kwargs):
+        connect_kwargs.append(kwargs)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite.sqlite3, "connect", spy_connect)
+    db = SQLiteAdapter({**db_config, **config})
+    db.open()
+    db.close()
+    assert connect_kwargs[0]["cached_statements"] == expected
+
+
+def test_statement_count_counts_while_open(db_config):
+    db = SQLiteAdapter(db_config)
+    db.open()
+    db.build_database_schema()
+    db.commit()
+    count = db.statement_count
+    db.get_app_user_count()
+    assert db.statement_count == count + 1
+    db.close()
+    other_db = SQLiteAdapter(db_config)  # may reuse the connection
+    other_db.open()
+    other_db.get_app_user_count()
+    other_db.close()
+    assert db.statement_count == count + 1
+    assert other_db.statement_count == 1
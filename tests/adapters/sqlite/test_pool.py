@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from shrikenet.adapters import sqlite_pool
+from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.adapters.sqlite_pool import SQLiteConnectionPool
+from shrikenet.entities.exceptions import DatastoreError
+
+
+@pytest.fixture
+def pool_db_file(tmp_path):
+    return str(tmp_path / "pool.db")
+
+
+@pytest.fixture
+def pool_config(pool_db_file):
+    sqlite_pool.close_all_pools()
+    yield {
+        "STORAGE_PROVIDER_DB": pool_db_file,
+        "STORAGE_PROVIDER_POOL_SIZE": 2,
+        "STORAGE_PROVIDER_POOL_MAX_IDLE_SECONDS": 300,
+        "STORAGE_PROVIDER_POOL_TIMEOUT_SECONDS": 0.1,
+    }
+    sqlite_pool.close_all_pools()
+
+
+def test_pool_not_used_by_default(db):
+    assert db.pool is None
+    assert db.get_pool_stats() is None
+
+
+def test_adapters_share_process_wide_pool(pool_config):
+    db_a = SQLiteAdapter(pool_config)
+    db_b = SQLiteAdapter(pool_config)
+    assert db_a.pool is db_b.pool
+
+
+def test_differently_configured_adapters_get_own_pools(pool_config, caplog):
+    db_a = SQLiteAdapter(pool_config)
+    db_b = SQLiteAdapter(
+        {**pool_config, "STORAGE_PROVIDER_JOURNAL_MODE": "WAL"}
+    )
+    db_c = SQLiteAdapter({**pool_config, "STORAGE_PROVIDER_POOL_SIZE": 4})
+    assert db_a.pool is not db_b.pool
+    assert db_a.pool is not db_c.pool
+    assert db_c.pool.size == 4
+    assert "another connection pool" in caplog.text
+
+
+def test_close_returns_connection_for_reuse(pool_config):
+    db = SQLiteAdapter(pool_config)
+    db.open()
+    connection = db.connection
+    db.close()
+    db.open()
+    assert db.connection is connection
+    db.close()
+    stats = db.get_pool_stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+
+
+def test_raises_on_access_after_closed_when_pooled(pool_config):
+    db = SQLiteAdapter(pool_config)
+    db.open()
+    db.close()
+    with pytest.raises(DatastoreError) as excinfo:
+        db.get_version()
+    assert "closed database" in str(excinfo.value)
+
+
+def test_uncommitted_work_discarded_on_close(pool_config):
+    db = SQLiteAdapter(pool_config)
+    db.open()
+    db.build_database_schema()
+    db.commit()
+    db._execute_sql("DELETE FROM rule", [], "")
+    db.close()
+    db.open()
+    assert db._select_value("SELECT count(*) FROM rule", []) == 5
+    db.close()
+
+
+def test_checkout_raises_when_exhausted(pool_config):
+    db_a = SQLiteAdapter(pool_config)
+    db_b = SQLiteAdapter(pool_config)
+    db_c = SQLiteAdapter(pool_config)
+    db_a.open()
+    db_b.open()
+    with pytest.raises(DatastoreError, match="pool exhausted .size=2."):
+        db_c.open()
+    assert not db_c.is_open
+    assert db_c.get_pool_stats()["timeouts"] == 1
+    db_a.close()
+    db_b.close()
+
+
+@pytest.fixture
+def create_pool(pool_db_file):
+    pools = []
+
+    def create(max_idle_seconds):
+        pool = SQLiteConnectionPool(pool_db_file, 1, max_idle_seconds, 5)
+        pools.append(pool)
+        return pool
+
+    yield create
+    for pool in pools:
+        pool.close()
+
+
+def test_checkout_waits_for_checkin(create_pool):
+    pool = create_pool(300)
+    connection = pool.checkout()
+    timer = threading.Timer(0.05, pool.checkin, args=(connection,))
+    timer.start()
+    assert pool.checkout() is connection
+    stats = pool.get_stats()
+    assert stats["waits"] >= 1
+    assert stats["timeouts"] == 0
+    pool.checkin(connection)
+
+
+def test_idle_connection_discarded_after_max_idle(create_pool):
+    pool = create_pool(0)
+    connection = pool.checkout()
+    pool.checkin(connection)
+    assert pool.checkout() is not connection
+    assert pool.get_stats()["discarded_idle"] == 1
+
+
+def test_unhealthy_connection_discarded_on_checkout(create_pool):
+    pool = create_pool(300)
+    connection = pool.checkout()
+    pool.checkin(connection)
+    connection.close()
+    assert pool.checkout() is not connection
+    assert pool.get_stats()["discarded_unhealthy"] == 1
+
+
+def test_pool_stats_report_all_pools(pool_config, pool_db_file):
+    SQLiteAdapter(pool_config)
+    db_files = [stats["db_file"] for stats in sqlite_pool.get_pool_stats()]
+    assert db_files == [pool_db_file]
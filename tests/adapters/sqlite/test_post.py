@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+import inspect
 from operator import attrgetter
 
 import pytest
@@ -8,6 +9,7 @@ from shrikenet.entities.exceptions import (
     DatastoreKeyError,
 )
 from shrikenet.entities.post import Post, DeepPost
+from shrikenet.entities.post_search import HIGHLIGHT_END, HIGHLIGHT_START
 
 
 @pytest.fixture
@@ -124,3 +126,219 @@ def test_get_posts_gets_deep_versions(posts, db):
 def test_get_posts_returns_empty_list_when_empty(db):
     posts = db.get_posts()
     assert len(posts) == 0
+
+
+@pytest.fixture
+def dated_posts(app_user, db):
+    my_posts = []
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(1, 8):
+        post = Post("Post Title #{}".format(i), "body #{}".format(i))
+        post.author_oid = app_user.oid
+        # pairs of posts share a created_time to exercise the oid tie-break
+        post.created_time = base_time + timedelta(minutes=i // 2)
+        post.oid = db.add_post(post)
+        my_posts.append(post)
+    return sorted(
+        my_posts, key=attrgetter("created_time", "oid"), reverse=True
+    )
+
+
+def test_get_posts_page_gets_newest_first(dated_posts, db):
+    page = db.get_posts_page(limit=3)
+    assert page == dated_posts[:3]
+
+
+def test_get_posts_page_gets_deep_versions(dated_posts, db):
+    page = db.get_posts_page(limit=3)
+    for post in page:
+        assert isinstance(post, DeepPost)
+        assert post.author_username == "dstrange"
+
+
+def test_get_posts_page_before_key_gets_older(dated_posts, db):
+    last = dated_posts[2]
+    page = db.get_posts_page(last.created_time, last.oid, limit=3)
+    assert page == dated_posts[3:6]
+
+
+def test_get_posts_page_walks_all_posts(dated_posts, db):
+    walked = []
+    page = db.get_posts_page(limit=2)
+    while page:
+        walked.extend(page)
+        last = page[-1]
+        page = db.get_posts_page(last.created_time, last.oid, limit=2)
+    assert walked == dated_posts
+
+
+def test_get_posts_page_after_key_gets_newer(dated_posts, db):
+    first = dated_posts[5]
+    page = db.get_posts_page(
+        limit=3,
+        after_created_time=first.created_time,
+        after_oid=first.oid,
+    )
+    assert page == dated_posts[2:5]
+
+
+def test_get_posts_page_returns_empty_list_when_empty(db):
+    assert db.get_posts_page(limit=5) == []
+
+
+def test_get_posts_page_uses_index(db):
+    sql = """
+        EXPLAIN QUERY PLAN
+        SELECT oid FROM post
+        WHERE (created_time, oid) < (?, ?)
+        ORDER BY created_time DESC, oid DESC
+        LIMIT 5
+    """
+    plan = db.connection.execute(sql, ["2024-01-01", 1]).fetchall()
+    assert "post_created_time_oid_idx" in str(plan)
+
+
+def test_add_post_stores_body_html(app_user, db):
+    post = Post("Title", "body", author_oid=app_user.oid)
+    post.created_time = datetime.now()
+    post.body_html = "<p>body</p>"
+    post.oid = db.add_post(post)
+    assert db.get_post_by_oid(post.oid).body_html == "<p>body</p>"
+
+
+def test_update_post_updates_body_html(post, db):
+    post.body_html = "<p>rendered</p>"
+    db.update_post(post)
+    assert db.get_post_by_oid(post.oid).body_html == "<p>rendered</p>"
+    assert db.get_posts()[0].body_html == "<p>rendered</p>"
+
+
+def test_add_posts_adds_records(app_user, db):
+    new_posts = []
+    for index in range(3):
+        new_post = Post(f"bulk #{index}", "body", author_oid=app_user.oid)
+        new_post.created_time = datetime(2024, 1, index + 1)
+        new_posts.append(new_post)
+    new_posts[2].oid = 77
+    db.add_posts(new_posts)
+    assert db.get_post_count() == 3
+    assert db.get_post_by_oid(77).title == "bulk #2"
+    assert [post.title for post in db.get_posts()] == [
+        "bulk #2",
+        "bulk #1",
+        "bulk #0",
+    ]
+
+
+def test_iter_posts_yields_same_as_get_posts(dated_posts, db):
+    assert list(db.iter_posts(batch_size=2)) == db.get_posts()
+
+
+def test_iter_posts_is_lazy(dated_posts, db):
+    posts = db.iter_posts(batch_size=2)
+    assert inspect.isgenerator(posts)
+    assert next(posts) == db.get_posts()[0]
+
+
+def test_iter_posts_yields_nothing_when_empty(db):
+    assert list(db.iter_posts()) == []
+
+
+def test_posts_version_changes_with_posts(post, app_user, db):
+    versions = [db.get_posts_version()]
+    post.title = "edited"
+    db.update_post(post)
+    versions.append(db.get_posts_version())
+    db.delete_post_by_oid(post.oid)
+    versions.append(db.get_posts_version())
+    db.add_posts([Post("bulk", "body", author_oid=app_user.oid)])
+    versions.append(db.get_posts_version())
+    assert len(set(versions)) == 4
+
+
+def test_posts_version_restored_by_rollback(post, db):
+    db.commit()
+    version = db.get_posts_version()
+    db.delete_post_by_oid(post.oid)
+    db.rollback()
+    assert db.get_posts_version() == version
+
+
+def test_posts_version_of_empty_database(db):
+    assert db.get_posts_version() == "0.0"
+
+
+@pytest.fixture
+def searchable_posts(app_user, db):
+    texts = [
+        ("Truth", "somewhere in a basement"),
+        ("Basement notes", "the truth is out there"),
+        ("Weather", "rain, then more rain"),
+        ("Basement", "the basement again"),
+    ]
+    my_posts = []
+    for title, body in texts:
+        post = Post(title, body, author_oid=app_user.oid)
+        post.created_time = datetime(2024, 1, 1)
+        post.oid = db.add_post(post)
+        my_posts.append(post)
+    return my_posts
+
+
+def test_search_posts_ranks_title_matches_first(searchable_posts, db):
+    results = db.search_posts("basement")
+    assert [result.title for result in results] == [
+        "Basement",
+        "Basement notes",
+        "Truth",
+    ]
+    assert results[0].author_username == "dstrange"
+    assert results[0].rank <= results[1].rank <= results[2].rank
+
+
+def test_search_posts_needs_every_term(searchable_posts, db):
+    results = db.search_posts("truth basement")
+    assert {result.title for result in results} == {
+        "Truth",
+        "Basement notes",
+    }
+
+
+def test_search_posts_highlights_terms(searchable_posts, db):
+    result = db.search_posts("TRUTH")[0]
+    assert (
+        result.title_highlight == f"{HIGHLIGHT_START}Truth{HIGHLIGHT_END}"
+    )
+    assert result.body_snippet == "somewhere in a basement"
+
+
+def test_search_posts_pages_by_rank(searchable_posts, db):
+    first_page = db.search_posts("basement", limit=2)
+    last = first_page[-1]
+    second_page = db.search_posts(
+        "basement", limit=2, after_rank=last.rank, after_oid=last.oid
+    )
+    assert first_page + second_page == db.search_posts("basement")
+    assert len(second_page) == 1
+
+
+@pytest.mark.parametrize(
+    "query", ('"', "rain AND", "NEAR(rain", "rain*)", "-", "")
+)
+def test_search_posts_treats_query_as_words(searchable_posts, db, query):
+    titles = {result.title for result in db.search_posts(query)}
+    assert titles <= {"Weather"}
+
+
+def test_search_posts_follows_update_and_delete(searchable_posts, db):
+    weather = searchable_posts[2]
+    weather.body = "sunny"
+    db.update_post(weather)
+    db.delete_post_by_oid(searchable_posts[3].oid)
+    assert db.search_posts("rain") == []
+    assert [result.oid for result in db.search_posts("sunny")] == [
+        weather.oid
+    ]
+    assert "Basement" not in [
+        result.title for result in db.search_posts("basement")
+    ]
@@ -0,0 +1,63 @@
+import pytest
+
+from shrikenet.adapters import sqlite_pool
+from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.entities.exceptions import DatastoreError
+
+
+@pytest.fixture
+def pragma_config(tmp_path):
+    sqlite_pool.close_all_pools()
+    yield {
+        "STORAGE_PROVIDER_DB": str(tmp_path / "pragma.db"),
+        "STORAGE_PROVIDER_BUSY_TIMEOUT_MS": 2500,
+        "STORAGE_PROVIDER_JOURNAL_MODE": "wal",
+        "STORAGE_PROVIDER_SYNCHRONOUS": "NORMAL",
+        "STORAGE_PROVIDER_CACHE_SIZE": -8000,
+        "STORAGE_PROVIDER_MMAP_SIZE": 1048576,
+        "STORAGE_PROVIDER_TEMP_STORE": "MEMORY",
+    }
+    sqlite_pool.close_all_pools()
+
+
+def select_pragma(db, name):
+    return db._select_value(f"PRAGMA {name}", [])
+
+
+def test_no_pragmas_applied_by_default(db):
+    assert db.pragmas == []
+
+
+def test_pragmas_applied_on_open(pragma_config):
+    db = SQLiteAdapter(pragma_config)
+    db.open()
+    assert select_pragma(db, "busy_timeout") == 2500
+    assert select_pragma(db, "journal_mode") == "wal"
+    assert select_pragma(db, "synchronous") == 1
+    assert select_pragma(db, "cache_size") == -8000
+    assert select_pragma(db, "mmap_size") == 1048576
+    assert select_pragma(db, "temp_store") == 2
+    db.close()
+
+
+def test_pragmas_applied_to_pooled_connections(pragma_config):
+    pragma_config["STORAGE_PROVIDER_POOL_SIZE"] = 1
+    db = SQLiteAdapter(pragma_config)
+    db.open()
+    assert select_pragma(db, "journal_mode") == "wal"
+    assert select_pragma(db, "busy_timeout") == 2500
+    db.close()
+
+
+def test_unknown_pragma_value_raises(pragma_config):
+    pragma_config["STORAGE_PROVIDER_JOURNAL_MODE"] = "WAL; DROP TABLE post"
+    regex = "STORAGE_PROVIDER_JOURNAL_MODE must be one of"
+    with pytest.raises(DatastoreError, match=regex):
+        SQLiteAdapter(pragma_config)
+
+
+def test_non_integer_pragma_value_raises(pragma_config):
+    pragma_config["STORAGE_PROVIDER_CACHE_SIZE"] = "2000"
+    regex = "STORAGE_PROVIDER_CACHE_SIZE must be an integer"
+    with pytest.raises(DatastoreError, match=regex):
+        SQLiteAdapter(pragma_config)
@@ -1,3 +1,6 @@
+import pytest
+
+from shrikenet.adapters.sqlite import SQLiteAdapter
 from shrikenet.entities.rules import Rules
 
 
@@ -27,6 +30,7 @@ def create_and_store_sample_rules(db):
 def create_sample_rules():
     rules = Rules()
     rules.login_fail_threshold_count = 42
+    rules.login_throttle_window_seconds = 120
     return rules
 
 
@@ -43,3 +47,90 @@ def test_rules_gone_after_rollback(db):
     db.save_rules(rules)
     db.rollback()
     assert create_sample_rules() == db.get_rules()
+
+
+@pytest.fixture
+def cached_db_config(tmp_path):
+    return {
+        "STORAGE_PROVIDER_DB": str(tmp_path / "rules_cache.db"),
+        "STORAGE_PROVIDER_RULES_CACHE_SECONDS": 60,
+    }
+
+
+@pytest.fixture
+def cached_db(cached_db_config):
+    database = SQLiteAdapter(cached_db_config)
+    database.open()
+    database.build_database_schema()
+    database.commit()
+    rules_cache = database.rules_cache
+    rules_cache.hits = rules_cache.reloads = 0
+    yield database
+    rules_cache.ttl_seconds = cached_db_config[
+        "STORAGE_PROVIDER_RULES_CACHE_SECONDS"
+    ]
+    database.close()
+
+
+def test_rules_cache_not_used_by_default(db):
+    assert db.rules_cache is None
+
+
+def test_save_rules_increments_change_count(db):
+    count = db.get_change_count("rule")
+    create_and_store_sample_rules(db)
+    assert db.get_change_count("rule") == count + 1
+
+
+def test_cached_rules_served_without_query(cached_db):
+    cached_db.get_rules()
+    change_rule_behind_cache(cached_db, 77)
+    assert cached_db.get_rules() == Rules()
+    assert cached_db.rules_cache.hits == 1
+
+
+def change_rule_behind_cache(db, threshold_count):
+    db.connection.execute(
+        "UPDATE rule SET tag_value = ? "
+        "WHERE tag = 'login_fail_threshold_count'",
+        [str(threshold_count)],
+    )
+    db.connection.execute(
+        "UPDATE change_counter SET value = value + 1 WHERE tag = 'rule'"
+    )
+    db.connection.commit()
+
+
+def test_cached_rules_reloaded_on_change_after_ttl(cached_db):
+    cached_db.get_rules()
+    change_rule_behind_cache(cached_db, 77)
+    cached_db.rules_cache.ttl_seconds = 0
+    assert cached_db.get_rules().login_fail_threshold_count == 77
+    assert cached_db.rules_cache.reloads == 2
+
+
+def test_cached_rules_kept_after_ttl_when_unchanged(cached_db):
+    cached_db.get_rules()
+    cached_db.rules_cache.ttl_seconds = 0
+    assert cached_db.get_rules() == Rules()
+    assert cached_db.rules_cache.reloads == 1
+
+
+def test_save_rules_commit_invalidates_shared_cache(
+    cached_db, cached_db_config
+):
+    cached_db.get_rules()
+    other_db = SQLiteAdapter(cached_db_config)
+    other_db.open()
+    rules = create_and_store_sample_rules(other_db)
+    other_db.commit()
+    other_db.close()
+    assert cached_db.get_rules() == rules
+
+
+def test_unsaved_rules_visible_then_gone_after_rollback(cached_db):
+    cached_db.get_rules()
+    rules = create_and_store_sample_rules(cached_db)
+    assert cached_db.get_rules() == rules
+    cached_db.rollback()
+    assert cached_db.get_rules() == Rules()
@@ -1,3 +1,8 @@
+import pytest
+
+from shrikenet.entities.exceptions import DatastoreError
+
+
 def test_schema_exists_after_build(db):
     db.build_database_schema()
     assert_database_in_initial_state(db)
@@ -11,7 +16,7 @@ def assert_database_in_initial_state(db):
     post_count = select_value(db, "SELECT count(*) FROM post")
     assert post_count == 0
     rule_count = select_value(db, "SELECT count(*) FROM rule")
-    assert rule_count == 2
+    assert rule_count == 5
 
 
 def select_value(db, sql):
@@ -23,3 +28,80 @@ def select_value(db, sql):
 def test_database_objects_reset_to_initial_state(db):
     db.reset_database_objects()
     assert_database_in_initial_state(db)
+
+
+def test_built_schema_is_current_version(db):
+    assert db.get_schema_version() == db.SCHEMA_VERSION
+
+
+def test_upgrade_is_noop_when_current(db):
+    versions = db.upgrade_database_schema()
+    assert versions == (db.SCHEMA_VERSION, db.SCHEMA_VERSION)
+
+
+def test_upgrade_from_original_schema(db):
+    db.connection.executescript("""
+        DROP TABLE change_counter;
+        DROP INDEX log_entry_app_user_time_idx;
+        DROP INDEX log_entry_tag_time_idx;
+        DROP INDEX log_entry_time_idx;
+        DROP TABLE post_fts;
+        DROP TABLE post;
+        CREATE TABLE post (
+            oid INTEGER PRIMARY KEY,
+            title TEXT,
+            body TEXT,
+            author_oid INTEGER,
+            created_time TEXT
+        );
+        PRAGMA user_version = 0;
+        """)
+    versions = db.upgrade_database_schema()
+    assert versions == (0, db.SCHEMA_VERSION)
+    assert db.get_schema_version() == db.SCHEMA_VERSION
+    columns = db.connection.execute("PRAGMA table_info(post)").fetchall()
+    assert "body_html" in [column[1] for column in columns]
+    indexes = db.connection.execute("PRAGMA index_list(post)").fetchall()
+    assert "post_created_time_oid_idx" in [index[1] for index in indexes]
+    assert db.get_change_count("rule") == 0
+    assert db.get_change_count("post") == 0
+    indexes = db.connection.execute(
+        "PRAGMA index_list(log_entry)"
+    ).fetchall()
+    assert {
+        "log_entry_app_user_time_idx",
+        "log_entry_tag_time_idx",
+        "log_entry_time_idx",
+    } <= {index[1] for index in indexes}
+
+
+def test_upgrade_indexes_existing_posts_for_search(db):
+    db.connection.executescript("""
+        DROP TABLE post_fts;
+        DROP TRIGGER post_fts_insert;
+        DROP TRIGGER post_fts_delete;
+        DROP TRIGGER post_fts_update;
+        INSERT INTO post (title, body, author_oid, created_time)
+        VALUES ('Old post', 'written before search', 1, '2020-01-01');
+        PRAGMA user_version = 4;
+        """)
+    db.upgrade_database_schema()
+    assert [post.title for post in db.search_posts("before")] == [
+        "Old post"
+    ]
+
+
+def test_failed_upgrade_step_is_rolled_back(db):
+    db.connection.executescript("""
+        DROP TABLE post_fts;
+        DROP TABLE post;
+        PRAGMA user_version = 4;
+        """)
+    with pytest.raises(DatastoreError) as excinfo:
+        db.upgrade_database_schema()
+    assert "version=5" in str(excinfo.value)
+    assert db.get_schema_version() == 4
+    tables = db.connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).fetchall()
+    assert "post_fts" not in [table[0] for table in tables]
@@ -0,0 +1,54 @@
+import logging
+
+import pytest
+
+from shrikenet.adapters.sqlite import SQLiteAdapter
+
+
+@pytest.fixture
+def instrumented_db():
+    database = SQLiteAdapter(
+        {
+            "STORAGE_PROVIDER_DB": "test.db",
+            "STORAGE_PROVIDER_INSTRUMENT": True,
+            "STORAGE_PROVIDER_SLOW_QUERY_MS": None,
+        }
+    )
+    database.open()
+    database.build_database_schema()
+    yield database
+    database.close()
+
+
+def test_no_stats_by_default(db):
+    assert db.stats is None
+
+
+def test_statements_recorded(instrumented_db, app_user_obj):
+    instrumented_db.add_app_user(app_user_obj)
+    instrumented_db.get_app_user_count()
+    instrumented_db.commit()
+    stats = instrumented_db.stats
+    assert stats.count == 3
+    assert stats.total_seconds >= stats.peak_seconds > 0
+    assert stats.slowest_sql is not None
+    assert stats.slow_count == 0
+    assert stats.as_dict()["count"] == 3
+
+
+def test_failed_statement_recorded(instrumented_db):
+    with pytest.raises(Exception):
+        instrumented_db.get_app_user_by_username("nobody")
+    assert instrumented_db.stats.count == 1
+
+
+def test_slow_statement_logged_without_parameters(
+    instrumented_db, app_user_obj, caplog
+):
+    instrumented_db.stats.slow_seconds = 0
+    with caplog.at_level(logging.WARNING):
+        instrumented_db.find_app_user_by_username("secret-username")
+    assert instrumented_db.stats.slow_count == 1
+    assert "SELECT * FROM app_user WHERE username = ?" in caplog.text
+    assert "1 parameters redacted" in caplog.text
+    assert "secret-username" not in caplog.text
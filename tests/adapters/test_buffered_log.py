@@ -0,0 +1,138 @@
+from datetime import datetime
+import threading
+
+import pytest
+
+from shrikenet.adapters.buffered_log import BufferedLogEntryWriter
+from shrikenet.adapters.memory import Memory
+from shrikenet.entities.exceptions import DatastoreError
+from shrikenet.entities.log_entry import LogEntry
+
+
+def create_log_entry(text):
+    return LogEntry(
+        oid=None,
+        time=datetime.now(),
+        app_user_oid=None,
+        tag="login_succeeded",
+        text=text,
+        usecase_tag="login_to_system",
+    )
+
+
+class StorageFactory:
+
+    def __init__(self):
+        self.db = Memory()
+        self.db.open()
+        self.opened = 0
+        self.fail = False
+        self.stored = threading.Event()
+
+    def __call__(self):
+        self.opened += 1
+        factory = self
+
+        class FakeStorage:
+            def open(self):
+                pass
+
+            def add_log_entries(self, log_entries):
+                if factory.fail:
+                    raise DatastoreError("disk full")
+                factory.db.add_log_entries(log_entries)
+
+            def commit(self):
+                factory.stored.set()
+
+            def close(self):
+                pass
+
+        return FakeStorage()
+
+    def get_texts(self):
+        return [entry.text for entry in self.db.log_entry.values()]
+
+
+@pytest.fixture
+def factory():
+    return StorageFactory()
+
+
+def test_synchronous_write_stores_at_once(factory):
+    writer = BufferedLogEntryWriter(factory, synchronous=True)
+    writer.write(create_log_entry("one"))
+    writer.write(create_log_entry("two"))
+    assert factory.get_texts() == ["one", "two"]
+    assert writer.flush_count == 2
+    assert writer.written_count == 2
+    assert writer.get_buffered_count() == 0
+
+
+def test_write_buffers_until_flushed(factory):
+    writer = BufferedLogEntryWriter(factory, max_seconds=60)
+    writer.write(create_log_entry("one"))
+    writer.write(create_log_entry("two"))
+    assert writer.get_buffered_count() == 2
+    assert writer.flush() == 2
+    assert factory.get_texts() == ["one", "two"]
+    assert factory.opened == 1
+    writer.close()
+
+
+def test_full_buffer_wakes_flush_thread(factory):
+    writer = BufferedLogEntryWriter(factory, max_entries=3, max_seconds=60)
+    for i in range(3):
+        writer.write(create_log_entry(f"entry {i}"))
+    assert factory.stored.wait(5)
+    assert factory.get_texts() == ["entry 0", "entry 1", "entry 2"]
+    assert writer.flush_count == 1
+    writer.close()
+
+
+def test_close_flushes_remaining_entries(factory):
+    writer = BufferedLogEntryWriter(factory, max_seconds=60)
+    writer.write(create_log_entry("last words"))
+    writer.close()
+    assert factory.get_texts() == ["last words"]
+
+
+def test_write_after_close_stores_at_once(factory):
+    writer = BufferedLogEntryWriter(factory, max_seconds=60)
+    writer.close()
+    writer.write(create_log_entry("late"))
+    assert factory.get_texts() == ["late"]
+
+
+def test_failed_flush_keeps_entries_for_retry(factory, caplog):
+    writer = BufferedLogEntryWriter(factory, max_seconds=60)
+    writer.write(create_log_entry("one"))
+    factory.fail = True
+    assert writer.flush() == 0
+    assert writer.get_buffered_count() == 1
+    assert "Could not store 1 buffered log entries" in caplog.text
+    factory.fail = False
+    writer.write(create_log_entry("two"))
+    assert writer.flush() == 2
+    assert factory.get_texts() == ["one", "two"]
+    writer.close()
+
+
+def test_failed_entries_beyond_limit_are_logged_and_dropped(
+    factory, caplog
+):
+    writer = BufferedLogEntryWriter(factory, max_seconds=60, max_buffered=3)
+    factory.fail = True
+    for text in ("one", "two", "three"):
+        writer.write(create_log_entry(text))
+    assert writer.flush() == 0
+    writer.write(create_log_entry("four"))
+    writer.write(create_log_entry("five"))
+    assert writer.get_buffered_count() == 3
+    assert writer.dropped_count == 2
+    assert "Dropped log entry since the buffer is full" in caplog.text
+    assert "one" in caplog.text
+    factory.fail = False
+    assert writer.flush() == 3
+    assert factory.get_texts() == ["three", "four", "five"]
+    writer.close()
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from shrikenet.adapters.crypto_pool import HashingPool, PooledCryptoAdapter
+from shrikenet.adapters.swapcase import SwapcaseAdapter
+from shrikenet.entities.crypto_provider import CryptoProvider
+from shrikenet.entities.exceptions import CryptoProviderBusy
+
+
+@pytest.fixture
+def thread_pool():
+    pool = HashingPool(1, 1, 5, executor=ThreadPoolExecutor(max_workers=1))
+    yield pool
+    pool.shutdown()
+
+
+def test_is_a_crypto_provider(thread_pool):
+    crypto = PooledCryptoAdapter(SwapcaseAdapter(), thread_pool)
+    assert isinstance(crypto, CryptoProvider)
+
+
+def test_delegates_to_wrapped_provider(thread_pool):
+    crypto = PooledCryptoAdapter(SwapcaseAdapter(), thread_pool)
+    assert crypto.generate_hash_from_string("Mulder") == "mULDER"
+    assert crypto.hash_matches_string("mULDER", "Mulder")
+    assert not crypto.hash_matches_string("mULDER", "Scully")
+
+
+def test_records_latency_stats(thread_pool):
+    crypto = PooledCryptoAdapter(SwapcaseAdapter(), thread_pool)
+    crypto.generate_hash_from_string("Mulder")
+    stats = thread_pool.get_stats()
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 1
+    assert stats["max_seconds"] > 0
+    assert stats["total_seconds"] >= stats["max_seconds"]
+
+
+def test_rejects_when_pool_and_queue_full(thread_pool):
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocked_hash():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    workers = [
+        threading.Thread(target=thread_pool.run, args=(blocked_hash,))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    started.wait(5)
+    assert thread_pool.get_stats()["queue_depth"] == 1
+    with pytest.raises(CryptoProviderBusy, match="hashing pool is full"):
+        thread_pool.run(blocked_hash)
+    release.set()
+    for worker in workers:
+        worker.join()
+    stats = thread_pool.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+
+
+def test_raises_busy_on_timeout():
+    pool = HashingPool(1, 0, 0.01, executor=ThreadPoolExecutor(1))
+    release = threading.Event()
+    with pytest.raises(CryptoProviderBusy, match="timed out"):
+        pool.run(release.wait, 5)
+    release.set()
+    assert pool.get_stats()["timed_out"] == 1
+    pool.shutdown()
+
+
+def test_timed_out_hash_keeps_slot_until_done():
+    pool = HashingPool(1, 0, 0.01, executor=ThreadPoolExecutor(1))
+    release = threading.Event()
+    with pytest.raises(CryptoProviderBusy, match="timed out"):
+        pool.run(release.wait, 5)
+    assert pool.get_stats()["in_flight"] == 1
+    with pytest.raises(CryptoProviderBusy, match="hashing pool is full"):
+        pool.run(str.upper, "mulder")
+    release.set()
+    pool.executor.submit(lambda: None).result(5)  # after the slow hash
+    assert pool.get_stats()["in_flight"] == 0
+    pool.timeout_seconds = 5
+    assert pool.run(str.upper, "mulder") == "MULDER"
+    pool.shutdown()
+
+
+def test_timed_out_queued_hash_is_cancelled():
+    pool = HashingPool(1, 1, 0.01, executor=ThreadPoolExecutor(1))
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def blocked_hash():
+        started.set()
+        release.wait(5)
+
+    with pytest.raises(CryptoProviderBusy, match="timed out"):
+        pool.run(blocked_hash)
+    started.wait(5)
+    with pytest.raises(CryptoProviderBusy, match="timed out"):
+        pool.run(ran.append, "queued")
+    assert pool.get_stats()["in_flight"] == 1  # the cancelled one freed
+    release.set()
+    pool.executor.submit(lambda: None).result(5)
+    assert ran == []
+    assert pool.get_stats()["in_flight"] == 0
+    pool.shutdown()
+
+
+def test_hashes_on_worker_processes():
+    pool = HashingPool(1, 0, 30)
+    crypto = PooledCryptoAdapter(SwapcaseAdapter(), pool)
+    assert crypto.generate_hash_from_string("Scully") == "sCULLY"
+    pool.shutdown()
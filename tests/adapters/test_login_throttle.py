@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from shrikenet.adapters.login_throttle import (
+    MemoryLoginThrottle,
+    SQLiteLoginThrottle,
+)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def login_throttle(request, clock, tmp_path):
+    if request.param == "memory":
+        login_throttle = MemoryLoginThrottle(clock=clock)
+    else:
+        db_file = str(tmp_path / "throttle.db")
+        login_throttle = SQLiteLoginThrottle(db_file, clock=clock)
+    yield login_throttle
+    login_throttle.close()
+
+
+def acquire_allowed(login_throttle, key, count, capacity=3):
+    return [
+        login_throttle.acquire(key, capacity, 60).is_allowed
+        for _ in range(count)
+    ]
+
+
+def test_rejects_attempts_over_capacity(login_throttle):
+    assert acquire_allowed(login_throttle, "ip=1", 4) == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_keys_are_limited_separately(login_throttle):
+    acquire_allowed(login_throttle, "ip=1", 3)
+    assert acquire_allowed(login_throttle, "ip=2", 1) == [True]
+    assert acquire_allowed(login_throttle, "ip=1", 1) == [False]
+
+
+def test_allows_again_after_refill(login_throttle, clock):
+    acquire_allowed(login_throttle, "ip=1", 5)
+    clock.now += 20
+    decision = login_throttle.acquire("ip=1", 3, 60)
+    assert decision.is_allowed
+    assert decision.rejected_count == 2
+
+
+def test_memory_forgets_least_recently_used_keys(clock):
+    login_throttle = MemoryLoginThrottle(max_keys=2, clock=clock)
+    acquire_allowed(login_throttle, "ip=1", 3)
+    acquire_allowed(login_throttle, "ip=2", 1)
+    acquire_allowed(login_throttle, "ip=3", 1)
+    assert len(login_throttle) == 2
+    assert acquire_allowed(login_throttle, "ip=1", 1) == [True]
+
+
+def test_sqlite_buckets_are_shared(clock, tmp_path):
+    db_file = str(tmp_path / "throttle.db")
+    worker_a = SQLiteLoginThrottle(db_file, clock=clock)
+    worker_b = SQLiteLoginThrottle(db_file, clock=clock)
+    acquire_allowed(worker_a, "ip=1", 2)
+    assert acquire_allowed(worker_b, "ip=1", 2) == [True, False]
+    worker_a.close()
+    worker_b.close()
+
+
+def test_sqlite_prunes_idle_buckets(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteLoginThrottle, "PRUNE_INTERVAL", 2)
+    login_throttle = SQLiteLoginThrottle(
+        str(tmp_path / "throttle.db"), prune_seconds=60, clock=clock
+    )
+    acquire_allowed(login_throttle, "ip=1", 1)
+    clock.now += 61
+    acquire_allowed(login_throttle, "ip=2", 1)
+    rows = login_throttle._get_connection().execute(
+        "SELECT key FROM login_throttle"
+    )
+    assert rows.fetchall() == [("ip=2",)]
+    login_throttle.close()
+
+
+def test_sqlite_acquire_from_many_threads(clock, tmp_path):
+    login_throttle = SQLiteLoginThrottle(
+        str(tmp_path / "throttle.db"), clock=clock
+    )
+    results = []
+
+    def acquire():
+        results.extend(acquire_allowed(login_throttle, "ip=1", 5, 10))
+
+    threads = [threading.Thread(target=acquire) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 10
+    login_throttle.close()
@@ -0,0 +1,398 @@
+from datetime import datetime
+
+import pytest
+
+from shrikenet.adapters.memory import Memory
+from shrikenet.entities.app_user import AppUser
+from shrikenet.entities.exceptions import (
+    DatastoreAlreadyOpen,
+    DatastoreClosed,
+    DatastoreError,
+    DatastoreKeyError,
+)
+from shrikenet.entities.log_entry import LogEntry
+from shrikenet.entities.post import Post
+from shrikenet.entities.post_search import HIGHLIGHT_END, HIGHLIGHT_START
+from shrikenet.entities.rules import Rules
+
+
+@pytest.fixture
+def db():
+    database = Memory()
+    database.open()
+    yield database
+    database.close()
+
+
+def add_app_user(db, username):
+    app_user = AppUser(username, f"mr {username}", "hash")
+    app_user.oid = db.get_next_app_user_oid()
+    db.add_app_user(app_user)
+    return app_user
+
+
+def test_get_app_user_by_username_uses_index(db):
+    for index in range(100):
+        add_app_user(db, f"user{index}")
+    app_user = db.get_app_user_by_username("user42")
+    assert app_user.username == "user42"
+    assert db.app_user_oid_by_username["user42"] == app_user.oid
+
+
+def test_add_app_user_rejects_duplicate_username(db):
+    app_user = add_app_user(db, "fmulder")
+    duplicate = AppUser("fmulder", "Fox", "hash", oid=app_user.oid + 1)
+    regex = "record with this username already exists"
+    with pytest.raises(DatastoreError, match=regex):
+        db.add_app_user(duplicate)
+
+
+def test_update_app_user_moves_username(db):
+    app_user = add_app_user(db, "fmulder")
+    app_user.username = "foxm"
+    db.update_app_user(app_user)
+    assert not db.exists_app_username("fmulder")
+    assert db.get_app_user_by_username("foxm").oid == app_user.oid
+    with pytest.raises(DatastoreKeyError):
+        db.get_app_user_by_username("fmulder")
+
+
+def test_update_app_user_rejects_taken_username(db):
+    add_app_user(db, "fmulder")
+    app_user = add_app_user(db, "dscully")
+    app_user.username = "fmulder"
+    regex = "can not update app_user .oid=2., reason: record with this"
+    with pytest.raises(DatastoreError, match=regex):
+        db.update_app_user(app_user)
+    assert db.get_app_user_by_username("dscully").oid == app_user.oid
+
+
+def test_rollback_restores_username_index(db):
+    app_user = add_app_user(db, "fmulder")
+    db.commit()
+    add_app_user(db, "dscully")
+    app_user.username = "foxm"
+    db.update_app_user(app_user)
+    db.rollback()
+    assert db.exists_app_username("fmulder")
+    assert not db.exists_app_username("foxm")
+    assert not db.exists_app_username("dscully")
+
+
+def test_reset_clears_username_index(db):
+    add_app_user(db, "fmulder")
+    db.reset_database_objects()
+    assert not db.exists_app_username("fmulder")
+
+
+def add_post(db, title):
+    post = Post(title, "body", oid=db.get_next_post_oid())
+    db.add_post(post)
+    return post
+
+
+def add_log_entry(db, text):
+    log_entry = LogEntry(-1, datetime.now(), None, "tag", text, "usecase")
+    return db.add_log_entry(log_entry)
+
+
+def test_commit_keeps_changes(db):
+    add_app_user(db, "fmulder")
+    post = add_post(db, "first")
+    oid = add_log_entry(db, "logged")
+    db.commit()
+    db.rollback()
+    assert db.exists_app_username("fmulder")
+    assert db.get_post_count() == 1
+    assert db.post[post.oid].title == "first"
+    assert db.get_log_entry_by_oid(oid).text == "logged"
+
+
+def test_rollback_undoes_post_changes(db):
+    kept = add_post(db, "kept")
+    changed = add_post(db, "changed")
+    deleted = add_post(db, "deleted")
+    db.commit()
+    changed.title = "changed twice"
+    db.update_post(changed)
+    changed.title = "changed three times"
+    db.update_post(changed)
+    db.delete_post_by_oid(deleted.oid)
+    add_post(db, "added")
+    db.rollback()
+    assert sorted(db.post) == [kept.oid, changed.oid, deleted.oid]
+    assert db.post[changed.oid].title == "changed"
+    assert db.post[deleted.oid].title == "deleted"
+
+
+def test_rollback_undoes_log_entries(db):
+    kept_oid = add_log_entry(db, "kept")
+    db.commit()
+    added_oid = add_log_entry(db, "added")
+    db.rollback()
+    assert db.get_last_log_entry().oid == kept_oid
+    with pytest.raises(DatastoreKeyError):
+        db.get_log_entry_by_oid(added_oid)
+
+
+def test_rollback_undoes_rules(db):
+    rules = db.get_rules()
+    rules.login_fail_threshold_count = 10
+    db.save_rules(rules)
+    rules.login_fail_threshold_count = 20
+    db.save_rules(rules)
+    db.rollback()
+    assert db.get_rules() == Rules()
+
+
+def test_close_undoes_uncommitted_changes(db):
+    add_app_user(db, "fmulder")
+    db.commit()
+    add_app_user(db, "dscully")
+    db.close()
+    db.open()
+    assert db.exists_app_username("fmulder")
+    assert not db.exists_app_username("dscully")
+
+
+def test_undo_log_only_holds_changed_rows(db):
+    for index in range(1000):
+        add_app_user(db, f"user{index}")
+    db.commit()
+    app_user = db.get_app_user_by_username("user1")
+    app_user.ongoing_password_failure_count = 1
+    db.update_app_user(app_user)
+    app_user.ongoing_password_failure_count = 2
+    db.update_app_user(app_user)
+    # the app_user row plus its username index entry
+    assert len(db._undo_log) == 2
+    db.commit()
+    assert db._undo_log == []
+
+
+@pytest.fixture
+def posts(db):
+    author = add_app_user(db, "fmulder")
+    posts = []
+    for day in (3, 1, 2, 2, 5, 4):
+        post = Post(
+            f"day {day}",
+            "body",
+            oid=db.get_next_post_oid(),
+            author_oid=author.oid,
+            created_time=datetime(2024, 1, day),
+        )
+        db.add_post(post)
+        posts.append(post)
+    db.commit()
+    return posts
+
+
+def get_titles_and_oids(posts):
+    return [(post.title, post.oid) for post in posts]
+
+
+def test_get_posts_newest_first(db, posts):
+    assert get_titles_and_oids(db.get_posts()) == [
+        ("day 5", 5),
+        ("day 4", 6),
+        ("day 3", 1),
+        ("day 2", 4),
+        ("day 2", 3),
+        ("day 1", 2),
+    ]
+    assert db.get_posts()[0].author_username == "fmulder"
+
+
+def test_get_posts_page_slices_by_keyset(db, posts):
+    first_page = db.get_posts_page(limit=2)
+    last = first_page[-1]
+    second_page = db.get_posts_page(
+        before_created_time=last.created_time, before_oid=last.oid, limit=3
+    )
+    first = second_page[0]
+    newer_page = db.get_posts_page(
+        after_created_time=first.created_time, after_oid=first.oid, limit=2
+    )
+    assert get_titles_and_oids(first_page) == [("day 5", 5), ("day 4", 6)]
+    assert get_titles_and_oids(second_page) == [
+        ("day 3", 1),
+        ("day 2", 4),
+        ("day 2", 3),
+    ]
+    assert get_titles_and_oids(newer_page) == [("day 5", 5), ("day 4", 6)]
+
+
+def test_post_index_follows_update_and_delete(db, posts):
+    moved = posts[1]
+    moved.created_time = datetime(2024, 1, 9)
+    db.update_post(moved)
+    db.delete_post_by_oid(posts[4].oid)
+    assert get_titles_and_oids(db.get_posts_page(limit=2)) == [
+        ("day 1", 2),
+        ("day 4", 6),
+    ]
+    assert len(db.post_index) == 5
+
+
+def test_rollback_restores_post_index(db, posts):
+    before = get_titles_and_oids(db.get_posts())
+    moved = posts[0]
+    moved.created_time = datetime(2024, 1, 9)
+    db.update_post(moved)
+    db.delete_post_by_oid(posts[2].oid)
+    new_post = Post("new", "body", oid=db.get_next_post_oid())
+    new_post.created_time = datetime(2024, 1, 3)
+    db.add_post(new_post)
+    db.rollback()
+    assert get_titles_and_oids(db.get_posts()) == before
+    assert db.post_index == sorted(db.post_index)
+
+
+@pytest.mark.parametrize(
+    ("method_name", "args"),
+    (
+        ("close", ()),
+        ("commit", ()),
+        ("rollback", ()),
+        ("get_version", ()),
+        ("get_app_user_by_username", ("fmulder",)),
+        ("exists_app_username", ("fmulder",)),
+        ("get_posts_page", ()),
+        ("get_rules", ()),
+    ),
+)
+def test_closed_store_raises(method_name, args):
+    db = Memory()
+    regex = f"{method_name} is not available since the connection is closed"
+    with pytest.raises(DatastoreClosed, match=regex):
+        getattr(db, method_name)(*args)
+
+
+def test_open_twice_raises(db):
+    with pytest.raises(DatastoreAlreadyOpen):
+        db.open()
+
+
+def test_reopened_store_is_usable(db):
+    db.close()
+    db.open()
+    assert not db.exists_app_username("fmulder")
+
+
+def test_iter_posts_yields_same_as_get_posts(db, posts):
+    assert list(db.iter_posts(batch_size=4)) == db.get_posts()
+    assert list(db.iter_posts(batch_size=3)) == db.get_posts()
+
+
+def test_iter_posts_survives_deletes(db, posts):
+    iterated = []
+    for post in db.iter_posts(batch_size=2):
+        iterated.append(post.oid)
+        if post.oid == 5:
+            db.delete_post_by_oid(3)  # in a later batch
+    assert iterated == [5, 6, 1, 4, 2]
+
+
+def test_posts_version_changes_with_posts(db, posts):
+    versions = {db.get_posts_version()}
+    posts[0].title = "edited"
+    db.update_post(posts[0])
+    versions.add(db.get_posts_version())
+    db.delete_post_by_oid(posts[1].oid)
+    versions.add(db.get_posts_version())
+    assert len(versions) == 3
+
+
+def test_rollback_restores_posts_version(db, posts):
+    version = db.get_posts_version()
+    db.delete_post_by_oid(posts[0].oid)
+    db.rollback()
+    assert db.get_posts_version() == version
+
+
+def test_reset_does_not_reuse_posts_version(db, posts):
+    version = db.get_posts_version()
+    db.reset_database_objects()
+    for post in posts:
+        db.add_post(post)
+    assert db.get_posts_version() != version
+
+
+def test_search_posts_ranks_title_matches_first(db):
+    author = add_app_user(db, "fmulder")
+    for title, body in (
+        ("Truth", "somewhere in a basement"),
+        ("Basement notes", "the truth is out there"),
+        ("Weather", "rain"),
+    ):
+        post = Post(title, body, oid=db.get_next_post_oid())
+        post.author_oid = author.oid
+        post.created_time = datetime(2024, 1, 1)
+        db.add_post(post)
+    results = db.search_posts("BASEMENT")
+    assert [result.title for result in results] == [
+        "Basement notes",
+        "Truth",
+    ]
+    assert results[0].title_highlight == (
+        f"{HIGHLIGHT_START}Basement{HIGHLIGHT_END} notes"
+    )
+    assert results[1].body_snippet == (
+        f"somewhere in a {HIGHLIGHT_START}basement{HIGHLIGHT_END}"
+    )
+    assert {post.title for post in db.search_posts("truth basement")} == {
+        "Truth",
+        "Basement notes",
+    }
+    after = db.search_posts(
+        "basement", after_rank=results[0].rank, after_oid=results[0].oid
+    )
+    assert after == results[1:]
+
+
+def test_search_posts_snippet_is_window_around_first_match(db):
+    body = " ".join(f"word{index}" for index in range(100))
+    post = Post("long", body, oid=db.get_next_post_oid(), author_oid=1)
+    post.created_time = datetime(2024, 1, 1)
+    db.add_post(post)
+    snippet = db.search_posts("word50")[0].body_snippet
+    assert snippet.startswith("…word46 ")
+    assert snippet.endswith(" word69…")
+    assert f"{HIGHLIGHT_START}word50{HIGHLIGHT_END}" in snippet
+
+
+def test_search_terms_follow_update_delete_and_rollback(db, posts):
+    posts[0].title = "renamed"
+    db.update_post(posts[0])
+    db.delete_post_by_oid(posts[1].oid)
+    assert [result.oid for result in db.search_posts("renamed")] == [
+        posts[0].oid
+    ]
+    assert posts[1].oid not in [
+        result.oid for result in db.search_posts("day")
+    ]
+    db.rollback()
+    assert db.search_posts("renamed") == []
+    assert len(db.search_posts("day")) == len(posts)
+    assert "renamed" not in db.post_terms
+
+
+def test_find_app_user_by_username(db):
+    app_user = add_app_user(db, "fmulder")
+    assert db.find_app_user_by_username("fmulder") == app_user
+    assert db.find_app_user_by_username("dscully") is None
+
+
+def test_imported_oids_are_not_handed_out_again(db):
+    db.add_app_users([AppUser("fmulder", "Fox", "hash", oid=7)])
+    app_user = add_app_user(db, "dscully")
+    assert app_user.oid == 8
+    db.add_posts([Post("imported", "body", oid=3, author_oid=7)])
+    post = Post("new", "body", oid=db.get_next_post_oid(), author_oid=8)
+    db.add_post(post)
+    assert post.oid == 4
+    log_entry = LogEntry(5, datetime.now(), 7, "tag", "text", "usecase")
+    db.add_log_entry(log_entry)
+    log_entry = LogEntry(None, datetime.now(), 7, "tag", "text", "usecase")
+    assert db.add_log_entry(log_entry) == 6
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+
+from shrikenet.adapters.metrics import (
+    FileMetrics,
+    MemoryMetrics,
+    TimedCryptoAdapter,
+    TimedTextTransformer,
+)
+from shrikenet.adapters.swapcase import SwapcaseAdapter
+from shrikenet.entities.crypto_provider import CryptoProvider
+from shrikenet.entities.metrics import MetricSamples
+from shrikenet.entities.text_transformer import TextTransformer
+
+
+class UpperTransformer(TextTransformer):
+    def __init__(self):
+        pass
+
+    def transform_to_html(self, plain_text):
+        return plain_text.upper()
+
+
+def test_memory_metrics_counts_across_threads():
+    metrics = MemoryMetrics()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(100):
+            executor.submit(metrics.increment, "c", {"tag": "x"})
+            executor.submit(metrics.observe, "h", 0.01)
+    samples = metrics.collect()
+    assert samples.counters[("c", (("tag", "x"),))] == 100
+    assert samples.histograms[("h", ())][2] == 100
+
+
+def test_memory_metrics_collect_is_a_copy():
+    metrics = MemoryMetrics()
+    metrics.increment("c")
+    samples = metrics.collect()
+    metrics.increment("c")
+    assert samples.counters[("c", ())] == 1
+
+
+def test_file_metrics_adds_up_every_process_file(tmp_path):
+    other_worker = MetricSamples()
+    other_worker.increment("c", (), 5)
+    other_worker.observe("h", (), 0.5)
+    with open(tmp_path / "metrics_1.json", "w") as f:
+        json.dump(other_worker.to_dict(), f)
+    metrics = FileMetrics(str(tmp_path))
+    metrics.increment("c")
+    metrics.observe("h", 0.25)
+    samples = metrics.collect()
+    metrics.close()
+    assert samples.counters[("c", ())] == 6
+    assert samples.histograms[("h", ())][2] == 2
+    assert os.path.exists(tmp_path / f"metrics_{os.getpid()}.json")
+
+
+def test_file_metrics_flushes_when_due(tmp_path):
+    now = [0.0]
+    metrics = FileMetrics(str(tmp_path), 1.0, clock=lambda: now[0])
+    file_path = metrics.get_file_path(os.getpid())
+    metrics.increment("c")
+    assert not os.path.exists(file_path)
+    now[0] = 1.0
+    metrics.increment("c")
+    with open(file_path) as f:
+        assert f.read().count('"c"') == 1
+    metrics.close()
+
+
+def test_file_metrics_skips_unreadable_file(tmp_path, caplog):
+    (tmp_path / "metrics_1.json").write_text("{not json")
+    metrics = FileMetrics(str(tmp_path))
+    metrics.increment("c")
+    samples = metrics.collect()
+    metrics.close()
+    assert samples.counters[("c", ())] == 1
+    assert "Skipped metrics file" in caplog.text
+
+
+def test_timed_crypto_adapter_delegates_and_observes():
+    metrics = MemoryMetrics()
+    crypto = TimedCryptoAdapter(SwapcaseAdapter(), metrics)
+    assert isinstance(crypto, CryptoProvider)
+    assert crypto.generate_hash_from_string("Mulder") == "mULDER"
+    assert crypto.hash_matches_string("mULDER", "Mulder")
+    histograms = metrics.collect().histograms
+    name = TimedCryptoAdapter.METRIC_NAME
+    assert histograms[(name, (("operation", "generate"),))][2] == 1
+    assert histograms[(name, (("operation", "check"),))][2] == 1
+
+
+def test_timed_text_transformer_delegates_and_observes():
+    metrics = MemoryMetrics()
+    transformer = TimedTextTransformer(UpperTransformer(), metrics)
+    assert transformer.transform_to_html("scully") == "SCULLY"
+    name = TimedTextTransformer.METRIC_NAME
+    assert metrics.collect().histograms[(name, ())][2] == 1
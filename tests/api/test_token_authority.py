@@ -3,7 +3,10 @@ import logging
 
 import jwt
 
+from shrikenet.adapters.sqlite import SQLiteAdapter
+from shrikenet.adapters.swapcase import SwapcaseAdapter
 from shrikenet.api import token_authority
+from shrikenet.entities.exceptions import CryptoProviderBusy
 
 
 logging.basicConfig(level=logging.INFO)
@@ -60,6 +63,18 @@ def test_get_token_fails_on_bad_credentials(client):
     verify_error(response, 2, "Login attempt failed.")
 
 
+def test_get_token_refused_when_crypto_busy(client, monkeypatch):
+    def raise_busy(*args):
+        raise CryptoProviderBusy("hashing pool is full")
+
+    monkeypatch.setattr(SwapcaseAdapter, "hash_matches_string", raise_busy)
+    response = do_get_token_with_bad_credentials(client)
+    assert response.status_code == 503
+    verify_error(
+        response, 6, "The server is busy. Please try again shortly."
+    )
+
+
 def do_get_token_with_bad_credentials(client):
     return client.post(
         "/api/get_token",
@@ -194,3 +209,35 @@ def test_token_required_logs_on_exception(app, client, caplog):
         "method=verify_token). Reason: ",
         prev_log_count=1,
     )
+
+
+def test_token_required_caches_verified_user(client, monkeypatch):
+    token = do_get_token_with_good_credentials(client)["token"]
+    response = do_verify_token(client, token)
+    assert response.get_json()["error_code"] == 0
+
+    def fail_lookup(self, oid):
+        raise AssertionError("storage provider should not be queried")
+
+    monkeypatch.setattr(SQLiteAdapter, "get_app_user_by_oid", fail_lookup)
+    response = do_verify_token(client, token)
+    verify_error(
+        response,
+        0,
+        f"valid token provided (user_oid={TEST_USER_OID}, "
+        f"username={TEST_USER_USERNAME})",
+    )
+
+
+def do_verify_token(client, token):
+    return client.post("/api/verify_token", headers={"TOKEN": token})
+
+
+def test_token_cache_invalidated_on_login(app, client):
+    token = do_get_token_with_good_credentials(client)["token"]
+    do_verify_token(client, token)
+    with app.app_context():
+        token_cache = token_authority.get_token_cache()
+        assert len(token_cache) == 1
+    do_get_token_with_bad_credentials(client)
+    assert len(token_cache) == 0
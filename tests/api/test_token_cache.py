@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from shrikenet.api.token_cache import TokenCache
+from shrikenet.entities.app_user import AppUser
+
+TOKEN_A = "header.payload-a.signature-a"
+TOKEN_B = "header.payload-b.signature-b"
+
+
+@pytest.fixture
+def cache():
+    return TokenCache(max_entries=2, max_age_seconds=60)
+
+
+def create_user(username="fmulder", oid=1):
+    return AppUser(username, "Fox Mulder", "SCULLY", oid=oid)
+
+
+def future_time(seconds=60):
+    return time.time() + seconds
+
+
+def test_get_unknown_token_returns_none(cache):
+    assert cache.get(TOKEN_A) is None
+    assert cache.misses == 1
+
+
+def test_get_returns_copy_of_cached_user(cache):
+    user = create_user()
+    cache.put(TOKEN_A, user, future_time())
+    cached_user = cache.get(TOKEN_A)
+    assert cached_user == user
+    assert cached_user is not user
+    cached_user.name = "changed"
+    assert cache.get(TOKEN_A).name == "Fox Mulder"
+    assert cache.hits == 2
+
+
+def test_token_must_match_not_just_signature(cache):
+    cache.put(TOKEN_A, create_user(), future_time())
+    forged = "header.payload-forged.signature-a"
+    assert cache.get(forged) is None
+
+
+def test_expired_token_evicted(cache):
+    cache.put(TOKEN_A, create_user(), time.time() - 1)
+    assert cache.get(TOKEN_A) is None
+    assert len(cache) == 0
+
+
+def test_stale_entry_evicted():
+    cache = TokenCache(max_entries=2, max_age_seconds=0)
+    cache.put(TOKEN_A, create_user(), future_time())
+    assert cache.get(TOKEN_A) is None
+
+
+def test_invalidate_username_removes_users_tokens(cache):
+    cache.put(TOKEN_A, create_user(), future_time())
+    cache.put(TOKEN_B, create_user("dscully", 2), future_time())
+    cache.invalidate_username("fmulder")
+    assert cache.get(TOKEN_A) is None
+    assert cache.get(TOKEN_B) is not None
+
+
+def test_least_recently_used_evicted(cache):
+    token_c = "header.payload-c.signature-c"
+    cache.put(TOKEN_A, create_user(), future_time())
+    cache.put(TOKEN_B, create_user(), future_time())
+    cache.get(TOKEN_A)
+    cache.put(token_c, create_user(), future_time())
+    assert len(cache) == 2
+    assert cache.get(TOKEN_B) is None
+    assert cache.get(TOKEN_A) is not None
+    cache.invalidate_username("fmulder")
+    assert len(cache) == 0
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = TokenCache(max_entries=0, max_age_seconds=60)
+    cache.put(TOKEN_A, create_user(), future_time())
+    assert len(cache) == 0
@@ -27,6 +27,7 @@ def app():
             "LOGGING_DATE_FORMAT": "%Y-%m-%d %H:%M:%S",
             "LOGGING_LEVEL": "DEBUG",
             "LOGGING_FILE": None,
+            "LOG_ENTRY_SYNCHRONOUS": True,
         }
     )
 
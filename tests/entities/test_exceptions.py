@@ -26,6 +26,7 @@ class TestShrikeException:
             ("DatastoreAlreadyOpen",),
             ("DatastoreError",),
             ("DatastoreKeyError",),
+            ("CryptoProviderBusy",),
         ),
     )
     def test_exception_is_shrike_exception(self, exception_name):
@@ -0,0 +1,30 @@
+import pytest
+
+from shrikenet.entities.log_entry_writer import LogEntryWriter
+
+
+class TestLogEntryWriter:
+
+    def test_interface_cant_be_instantiated(self):
+        with pytest.raises(NotImplementedError):
+            LogEntryWriter()
+
+    @pytest.fixture
+    def log_entry_writer(self):
+        class FakeWriter(LogEntryWriter):
+            def __init__(self):
+                pass
+
+        return FakeWriter()
+
+    def test_write_method_cant_be_called(self, log_entry_writer):
+        with pytest.raises(NotImplementedError):
+            log_entry_writer.write(None)
+
+    def test_flush_method_cant_be_called(self, log_entry_writer):
+        with pytest.raises(NotImplementedError):
+            log_entry_writer.flush()
+
+    def test_close_method_cant_be_called(self, log_entry_writer):
+        with pytest.raises(NotImplementedError):
+            log_entry_writer.close()
@@ -0,0 +1,74 @@
+import pytest
+
+from shrikenet.entities.login_throttle import (
+    LoginThrottle,
+    ThrottleDecision,
+    ThrottleLimits,
+    TokenBucket,
+)
+from shrikenet.entities.rules import Rules
+
+
+class TestLoginThrottle:
+
+    def test_interface_cant_be_instantiated(self):
+        with pytest.raises(NotImplementedError):
+            LoginThrottle()
+
+    @pytest.fixture
+    def login_throttle(self):
+        class FakeThrottle(LoginThrottle):
+            def __init__(self):
+                pass
+
+        return FakeThrottle()
+
+    def test_acquire_method_cant_be_called(self, login_throttle):
+        with pytest.raises(NotImplementedError):
+            login_throttle.acquire("key", 1, 1)
+
+    def test_close_method_cant_be_called(self, login_throttle):
+        with pytest.raises(NotImplementedError):
+            login_throttle.close()
+
+
+class TestTokenBucket:
+
+    def test_allows_a_burst_of_capacity(self):
+        bucket = TokenBucket(3, 100.0)
+        decisions = [bucket.take(3, 60, 100.0) for _ in range(4)]
+        assert [decision.is_allowed for decision in decisions] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+    def test_counts_rejections_until_allowed(self):
+        bucket = TokenBucket(1, 100.0)
+        bucket.take(1, 60, 100.0)
+        assert bucket.take(1, 60, 100.0) == ThrottleDecision(False, 1)
+        assert bucket.take(1, 60, 130.0) == ThrottleDecision(False, 2)
+        assert bucket.take(1, 60, 160.0) == ThrottleDecision(True, 2)
+        assert bucket.take(1, 60, 220.0) == ThrottleDecision(True, 0)
+
+    def test_refills_evenly_up_to_capacity(self):
+        bucket = TokenBucket(0, 100.0)
+        bucket.take(6, 60, 120.0)
+        assert bucket.tokens == pytest.approx(1)
+        bucket.take(6, 60, 1000.0)
+        assert bucket.tokens == pytest.approx(5)
+
+    def test_clock_going_back_adds_nothing(self):
+        bucket = TokenBucket(0, 100.0)
+        assert not bucket.take(6, 60, 50.0).is_allowed
+
+
+def test_limits_from_rules():
+    rules = Rules()
+    limits = ThrottleLimits.from_rules(rules)
+    assert limits.ip_attempts == rules.login_throttle_ip_attempts
+    assert (
+        limits.username_attempts == rules.login_throttle_username_attempts
+    )
+    assert limits.window_seconds == rules.login_throttle_window_seconds
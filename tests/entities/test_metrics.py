@@ -0,0 +1,114 @@
+import pytest
+
+from shrikenet.entities.metrics import (
+    DEFAULT_BUCKETS,
+    MetricSamples,
+    Metrics,
+    format_metrics,
+    get_label_key,
+)
+
+
+class TestMetrics:
+
+    def test_interface_cant_be_instantiated(self):
+        with pytest.raises(NotImplementedError):
+            Metrics()
+
+    @pytest.fixture
+    def metrics(self):
+        class FakeMetrics(Metrics):
+            def __init__(self):
+                pass
+
+        return FakeMetrics()
+
+    def test_increment_method_cant_be_called(self, metrics):
+        with pytest.raises(NotImplementedError):
+            metrics.increment("name")
+
+    def test_observe_method_cant_be_called(self, metrics):
+        with pytest.raises(NotImplementedError):
+            metrics.observe("name", 1.0)
+
+    def test_collect_method_cant_be_called(self, metrics):
+        with pytest.raises(NotImplementedError):
+            metrics.collect()
+
+    def test_close_method_cant_be_called(self, metrics):
+        with pytest.raises(NotImplementedError):
+            metrics.close()
+
+
+def test_label_key_is_sorted_text():
+    assert get_label_key(None) == ()
+    assert get_label_key({"b": 2, "a": "x"}) == (("a", "x"), ("b", "2"))
+
+
+def test_observe_counts_in_first_bucket_at_or_above_value():
+    samples = MetricSamples()
+    samples.observe("h", (), 0.001)
+    samples.observe("h", (), 0.003)
+    samples.observe("h", (), 100)
+    counts, sum_, count = samples.histograms[("h", ())]
+    assert counts[0] == 1
+    assert counts[DEFAULT_BUCKETS.index(0.005)] == 1
+    assert counts[-1] == 1
+    assert sum_ == pytest.approx(100.004)
+    assert count == 3
+
+
+def test_merge_adds_samples():
+    first = MetricSamples()
+    first.increment("c", (), 1)
+    first.observe("h", (), 0.5)
+    second = MetricSamples()
+    second.increment("c", (), 2)
+    second.increment("c", (("tag", "x"),), 1)
+    second.observe("h", (), 0.5)
+    first.merge(second)
+    assert first.counters[("c", ())] == 3
+    assert first.counters[("c", (("tag", "x"),))] == 1
+    assert first.histograms[("h", ())][2] == 2
+
+
+def test_dict_round_trip():
+    samples = MetricSamples()
+    samples.increment("c", (("tag", "x"),), 4)
+    samples.observe("h", (("operation", "check"),), 0.02)
+    copy = MetricSamples.from_dict(samples.to_dict())
+    assert copy.counters == samples.counters
+    assert copy.histograms == samples.histograms
+
+
+def test_format_counter():
+    samples = MetricSamples()
+    samples.increment("shrikenet_logins_total", (("tag", "user_login"),), 2)
+    text = format_metrics(samples)
+    assert "# TYPE shrikenet_logins_total counter\n" in text
+    assert 'shrikenet_logins_total{tag="user_login"} 2.0\n' in text
+
+
+def test_format_histogram_buckets_are_cumulative():
+    samples = MetricSamples()
+    samples.observe("shrikenet_markdown_render_seconds", (), 0.002)
+    samples.observe("shrikenet_markdown_render_seconds", (), 20)
+    lines = format_metrics(samples).splitlines()
+    name = "shrikenet_markdown_render_seconds"
+    assert lines[1] == f"# TYPE {name} histogram"
+    assert lines[2] == f'{name}_bucket{{le="0.001"}} 0'
+    assert lines[3] == f'{name}_bucket{{le="0.0025"}} 1'
+    assert f'{name}_bucket{{le="10.0"}} 1' in lines
+    assert f'{name}_bucket{{le="+Inf"}} 2' in lines
+    assert lines[-2] == f"{name}_sum 20.002"
+    assert lines[-1] == f"{name}_count 2"
+
+
+def test_format_escapes_label_values():
+    samples = MetricSamples()
+    samples.increment("c", (("path", 'a"b\\c\nd'),), 1)
+    assert 'c{path="a\\"b\\\\c\\nd"} 1.0' in format_metrics(samples)
+
+
+def test_format_nothing():
+    assert format_metrics(MetricSamples()) == ""
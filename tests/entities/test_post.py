@@ -32,6 +32,7 @@ class TestGeneralProperties:
         assert post.body == GOOD_BODY
         assert post.author_oid is None
         assert post.created_time is None
+        assert post.body_html is None
 
     def test_keyword_init(self):
         post = Post(
@@ -65,6 +66,12 @@ class TestEquals:
         post_two = FakePost(GOOD_TITLE, GOOD_BODY)
         assert post_one != post_two
 
+    def test_equal_when_only_body_html_different(self):
+        post_one = create_good_post()
+        post_two = create_good_post()
+        post_two.body_html = "<p>rendered</p>"
+        assert post_one == post_two
+
     @pytest.mark.parametrize(
         ("attr_name", "attr_value"),
         (
@@ -94,3 +101,9 @@ class TestDeepPost:
         author_username = "fmulder"
         deep_post = DeepPost(post, author_username)
         assert deep_post.author_username == author_username
+
+    def test_keeps_body_html(self):
+        post = create_good_post()
+        post.body_html = "<p>rendered</p>"
+        deep_post = DeepPost(post)
+        assert deep_post.body_html == post.body_html
@@ -0,0 +1,91 @@
+import pytest
+
+from shrikenet.entities.post import Post
+from shrikenet.entities.post_html_cache import PostHtmlCache
+
+
+class CountingTransformer:
+    def __init__(self):
+        self.calls = 0
+
+    def transform_to_html(self, plain_text):
+        self.calls += 1
+        return "<p>" + plain_text.swapcase() + "</p>"
+
+
+@pytest.fixture
+def transformer():
+    return CountingTransformer()
+
+
+@pytest.fixture
+def cache():
+    return PostHtmlCache(max_entries=2)
+
+
+def create_post(oid, body="Some Body"):
+    return Post("title", body, oid=oid)
+
+
+def test_renders_on_first_request(cache, transformer):
+    html = cache.get_html(create_post(1), transformer)
+    assert html == "<p>sOME bODY</p>"
+    assert transformer.calls == 1
+    assert cache.misses == 1
+
+
+def test_reuses_render_for_same_body(cache, transformer):
+    cache.get_html(create_post(1), transformer)
+    html = cache.get_html(create_post(1), transformer)
+    assert html == "<p>sOME bODY</p>"
+    assert transformer.calls == 1
+    assert cache.hits == 1
+
+
+def test_rerenders_when_body_changes(cache, transformer):
+    cache.get_html(create_post(1), transformer)
+    html = cache.get_html(create_post(1, "New Body"), transformer)
+    assert html == "<p>nEW bODY</p>"
+    assert transformer.calls == 2
+    assert len(cache) == 1
+
+
+def test_stored_html_used_without_render(cache, transformer):
+    post = create_post(1)
+    cache.store(post, "<p>stored</p>")
+    assert cache.get_html(post, transformer) == "<p>stored</p>"
+    assert transformer.calls == 0
+
+
+def test_invalidate_forces_render(cache, transformer):
+    cache.store(create_post(1), "<p>stored</p>")
+    cache.invalidate(1)
+    assert cache.get_html(create_post(1), transformer) == "<p>sOME bODY</p>"
+
+
+def test_persisted_body_html_used_as_is(cache, transformer):
+    post = create_post(1)
+    post.body_html = "<p>persisted</p>"
+    assert cache.get_html(post, transformer) == "<p>persisted</p>"
+    assert transformer.calls == 0
+    assert len(cache) == 0
+
+
+def test_least_recently_used_evicted(cache, transformer):
+    cache.get_html(create_post(1), transformer)
+    cache.get_html(create_post(2), transformer)
+    cache.get_html(create_post(1), transformer)
+    cache.get_html(create_post(3), transformer)
+    assert len(cache) == 2
+    cache.get_html(create_post(1), transformer)
+    assert transformer.calls == 3
+    cache.get_html(create_post(2), transformer)
+    assert transformer.calls == 4
+
+
+def test_zero_size_cache_stores_nothing(transformer):
+    cache = PostHtmlCache(max_entries=0)
+    cache.get_html(create_post(1), transformer)
+    cache.get_html(create_post(1), transformer)
+    assert transformer.calls == 2
+    assert len(cache) == 0
@@ -12,6 +12,9 @@ class TestRules:
         rules = Rules()
         assert rules.login_fail_threshold_count == 3
         assert rules.login_fail_lock_minutes == 15
+        assert rules.login_throttle_ip_attempts == 20
+        assert rules.login_throttle_username_attempts == 10
+        assert rules.login_throttle_window_seconds == 60
 
     def test_equals(self):
         rules_a = Rules()
@@ -23,6 +26,9 @@ class TestRules:
         (
             ("login_fail_threshold_count", -1),
             ("login_fail_lock_minutes", -1),
+            ("login_throttle_ip_attempts", -1),
+            ("login_throttle_username_attempts", -1),
+            ("login_throttle_window_seconds", -1),
         ),
     )
     def test_not_equals_when_attribute_differs(self, attr_name, attr_value):
@@ -53,6 +53,22 @@ class TestFieldValidation:
         rules.login_fail_lock_minutes = minutes
         self.verify_validation_raises(rules)
 
+    @pytest.mark.parametrize(
+        ("field_name", "value"),
+        (
+            ("login_throttle_ip_attempts", 0),
+            ("login_throttle_ip_attempts", "20"),
+            ("login_throttle_username_attempts", 0),
+            ("login_throttle_username_attempts", None),
+            ("login_throttle_window_seconds", 0),
+            ("login_throttle_window_seconds", 0.5),
+        ),
+    )
+    def test_login_throttle_fields_validated(self, field_name, value):
+        rules = Rules()
+        setattr(rules, field_name, value)
+        self.verify_validation_raises(rules)
+
 
 class TestReferenceValidation:
 
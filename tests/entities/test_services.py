@@ -0,0 +1,40 @@
+import pytest
+
+from shrikenet.entities.services import LazyServices, Services
+
+
+def test_services_hold_what_they_are_given():
+    services = Services(storage_provider="db")
+    assert services.storage_provider == "db"
+    assert services.crypto_provider is None
+
+
+def test_lazy_services_built_once_on_first_use():
+    calls = []
+
+    def build_storage_provider():
+        calls.append("storage_provider")
+        return object()
+
+    services = LazyServices({"storage_provider": build_storage_provider})
+    assert calls == []
+    assert not services.is_created("storage_provider")
+    storage_provider = services.storage_provider
+    assert services.storage_provider is storage_provider
+    assert calls == ["storage_provider"]
+    assert services.is_created("storage_provider")
+    assert isinstance(services, Services)
+
+
+def test_lazy_services_without_factory():
+    services = LazyServices({})
+    assert getattr(services, "metrics", None) is None
+    with pytest.raises(AttributeError):
+        services.storage_provider
+
+
+def test_lazy_services_can_be_replaced():
+    services = LazyServices({"text_transformer": lambda: "built"})
+    services.text_transformer = "given"
+    assert services.text_transformer == "given"
+    assert services.is_created("text_transformer")
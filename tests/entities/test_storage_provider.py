@@ -26,25 +26,38 @@ class TestStorageProvider:
             ("rollback", 0),
             ("build_database_schema", 0),
             ("reset_database_objects", 0),
+            ("upgrade_database_schema", 0),
+            ("get_schema_version", 0),
             ("get_version", 0),
             ("get_next_app_user_oid", 0),
             ("get_next_log_entry_oid", 0),
             ("get_next_post_oid", 0),
             ("get_app_user_by_username", 1),
+            ("find_app_user_by_username", 1),
             ("get_app_user_by_oid", 1),
             ("add_app_user", 1),
+            ("add_app_users", 1),
+            ("get_app_users_page", 0),
             ("update_app_user", 1),
             ("get_app_user_count", 0),
             ("exists_app_username", 1),
             ("get_log_entry_by_oid", 1),
             ("add_log_entry", 1),
+            ("add_log_entries", 1),
             ("get_last_log_entry", 0),
             ("get_post_by_oid", 1),
             ("add_post", 1),
+            ("add_posts", 1),
             ("update_post", 1),
             ("delete_post_by_oid", 1),
             ("get_post_count", 0),
+            ("get_posts_version", 0),
             ("get_posts", 0),
+            ("get_posts_page", 0),
+            ("iter_posts", 0),
+            ("search_posts", 1),
+            ("get_log_entries_for_user", 1),
+            ("get_log_entries_by_tag", 1),
             ("get_rules", 0),
             ("save_rules", 1),
         ),
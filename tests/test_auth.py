@@ -1,6 +1,10 @@
 import pytest
 from flask import g, session
+
+from shrikenet.adapters.crypto_pool import PooledCryptoAdapter
+from shrikenet.adapters.swapcase import SwapcaseAdapter
 from shrikenet.db import get_services
+from shrikenet.entities.exceptions import CryptoProviderBusy
 
 
 def test_register(client, app):
@@ -60,3 +64,35 @@ def test_logout(client, auth):
     with client:
         auth.logout()
         assert "user_id" not in session
+
+
+def raise_busy(*args, **kwargs):
+    raise CryptoProviderBusy("hashing pool is full")
+
+
+def test_login_refused_when_crypto_busy(auth, monkeypatch):
+    monkeypatch.setattr(SwapcaseAdapter, "hash_matches_string", raise_busy)
+    response = auth.login()
+    assert response.status_code == 503
+    assert b"The system is busy." in response.data
+
+
+def test_register_refused_when_crypto_busy(client, app, monkeypatch):
+    monkeypatch.setattr(
+        SwapcaseAdapter, "generate_hash_from_string", raise_busy
+    )
+    response = client.post(
+        "/auth/register", data={"username": "a", "password": "a"}
+    )
+    assert response.status_code == 503
+    with app.app_context():
+        storage_provider = get_services().storage_provider
+        assert not storage_provider.exists_app_username("a")
+
+
+def test_crypto_provider_pooled_when_configured(app):
+    app.config["CRYPTO_PROVIDER_POOL_SIZE"] = 1
+    with app.app_context():
+        crypto_provider = get_services().crypto_provider
+        assert isinstance(crypto_provider, PooledCryptoAdapter)
+        assert isinstance(crypto_provider.crypto_provider, SwapcaseAdapter)
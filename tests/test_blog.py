@@ -1,8 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import re
 
 import pytest
 
 from shrikenet.db import get_services
+from shrikenet.entities.post import Post
 
 
 def test_index(client, auth):
@@ -118,3 +120,258 @@ def test_delete(client, auth, app):
         storage_provider = get_services().storage_provider
         with pytest.raises(KeyError):
             storage_provider.get_post_by_oid(1)
+
+
+def add_posts(app, count):
+    with app.app_context():
+        storage_provider = get_services().storage_provider
+        for i in range(count):
+            post = Post(
+                oid=-1,
+                title=f"paged post #{i}",
+                body="",
+                author_oid=1,
+                created_time=datetime(2020, 1, 1, tzinfo=timezone.utc)
+                + timedelta(days=i),
+            )
+            storage_provider.add_post(post)
+        storage_provider.commit()
+
+
+def test_index_is_paginated(app, client):
+    app.config["POSTS_PER_PAGE"] = 2
+    add_posts(app, 3)
+    response = client.get("/")
+    assert b"paged post #2" in response.data
+    assert b"paged post #1" in response.data
+    assert b"paged post #0" not in response.data
+    assert b"Older" in response.data
+    assert b"Newer" not in response.data
+
+
+def test_index_older_and_newer_links_navigate(app, client):
+    app.config["POSTS_PER_PAGE"] = 2
+    add_posts(app, 3)
+    older_url = get_link(client.get("/").data, "older")
+    response = client.get(older_url)
+    assert b"paged post #0" in response.data
+    assert b"test title" in response.data
+    assert b"paged post #1" not in response.data
+    assert b"Older" not in response.data
+
+    newer_url = get_link(response.data, "newer")
+    response = client.get(newer_url)
+    assert b"paged post #2" in response.data
+    assert b"paged post #1" in response.data
+    assert b"Newer" not in response.data
+
+
+def get_link(html, css_class):
+    match = re.search(rf'class="{css_class}" href="([^"]+)"', html.decode())
+    return match.group(1).replace("&amp;", "&")
+
+
+def test_index_rejects_bad_page_cursor(client):
+    response = client.get("/?before_time=yesterday&before_oid=1")
+    assert response.status_code == 400
+
+
+def test_create_caches_rendered_body(client, auth, app):
+    auth.login()
+    client.post("/create", data={"title": "cached", "body": "*hi*"})
+    with app.app_context():
+        cache = app.extensions["post_html_cache"]
+        post = get_services().storage_provider.get_posts()[0]
+        assert post.body_html is None
+        assert cache.get_html(post, None) == "<p><em>hi</em></p>\n"
+
+
+def test_create_persists_rendered_body_when_enabled(client, auth, app):
+    app.config["POST_BODY_HTML_PERSIST"] = True
+    auth.login()
+    client.post("/create", data={"title": "persisted", "body": "*hi*"})
+    with app.app_context():
+        post = get_services().storage_provider.get_posts()[0]
+        assert post.body_html == "<p><em>hi</em></p>\n"
+
+
+def test_index_shows_updated_body(client, auth):
+    auth.login()
+    assert b"<p>test body</p>" in client.get("/").data
+    client.post("/1/update", data={"title": "updated", "body": "new body"})
+    assert b"<p>new body</p>" in client.get("/").data
+
+
+def test_delete_invalidates_rendered_body(client, auth, app):
+    auth.login()
+    client.get("/")
+    client.post("/1/delete")
+    with app.app_context():
+        assert len(app.extensions["post_html_cache"]) == 0
+
+
+def test_feed_lists_posts_as_atom(client):
+    response = client.get("/feed.atom")
+    assert response.status_code == 200
+    assert response.mimetype == "application/atom+xml"
+    assert b"<title>test title</title>" in response.data
+    assert b"<name>test</name>" in response.data
+    assert b"&lt;p&gt;test body&lt;/p&gt;" in response.data
+    assert response.headers["ETag"]
+    assert "Last-Modified" not in response.headers
+
+
+def test_feed_limited_to_feed_post_count(app, client):
+    app.config["FEED_POST_COUNT"] = 2
+    add_posts(app, 3)
+    response = client.get("/feed.atom")
+    assert response.data.count(b"<entry>") == 2
+    assert b"paged post #2" in response.data
+    assert b"paged post #0" not in response.data
+
+
+def test_feed_not_modified_skips_rendering(client, monkeypatch):
+    response = client.get("/feed.atom")
+    etag = response.headers["ETag"]
+
+    def fail_render(post):
+        raise AssertionError("feed rendered when not modified")
+
+    monkeypatch.setattr("shrikenet.blog.get_post_html", fail_render)
+    response = client.get("/feed.atom", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_feed_modified_by_new_post(app, client):
+    etag = client.get("/feed.atom").headers["ETag"]
+    add_posts(app, 1)
+    response = client.get("/feed.atom", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b"paged post #0" in response.data
+
+
+def test_feed_of_empty_blog(client, auth):
+    auth.login()
+    client.post("/1/delete")
+    response = client.get("/feed.atom")
+    assert response.status_code == 200
+    assert b"<entry>" not in response.data
+
+
+def test_feed_if_modified_since_ignored_after_update(client, auth):
+    client.get("/feed.atom")
+    auth.login()
+    client.post("/1/update", data={"title": "updated", "body": "new body"})
+    response = client.get(
+        "/feed.atom",
+        headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+    )
+    assert response.status_code == 200
+    assert b"<title>updated</title>" in response.data
+
+
+def test_feed_modified_by_post_update(client, auth):
+    etag = client.get("/feed.atom").headers["ETag"]
+    auth.login()
+    client.post("/1/update", data={"title": "updated", "body": "new body"})
+    response = client.get("/feed.atom", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"<title>updated</title>" in response.data
+
+
+def test_index_not_modified_for_anonymous_user(client, monkeypatch):
+    response = client.get("/")
+    etag = response.headers["ETag"]
+    assert response.cache_control.public
+
+    def fail_render(post):
+        raise AssertionError("index rendered when not modified")
+
+    monkeypatch.setattr("shrikenet.blog.get_post_html", fail_render)
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_index_etag_depends_on_page(app, client):
+    add_posts(app, 3)
+    first_page = client.get("/")
+    assert app.test_client().get("/").headers["ETag"] == (
+        first_page.headers["ETag"]
+    )
+    with app.app_context():
+        oldest = get_services().storage_provider.get_posts_page(limit=4)[-1]
+    older_page = client.get(
+        "/",
+        query_string={
+            "before_time": oldest.created_time.isoformat(),
+            "before_oid": oldest.oid,
+        },
+    )
+    assert older_page.headers["ETag"] != first_page.headers["ETag"]
+
+
+def test_index_modified_by_new_post(app, client):
+    etag = client.get("/").headers["ETag"]
+    add_posts(app, 1)
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"paged post #0" in response.data
+    assert response.headers["ETag"] != etag
+
+
+def test_index_not_cached_for_logged_in_user(client, auth):
+    auth.login()
+    response = client.get("/")
+    assert "ETag" not in response.headers
+    assert not response.cache_control.public
+
+
+def test_search_highlights_matches(client):
+    response = client.get("/search", query_string={"q": "body"})
+    assert response.status_code == 200
+    assert b"test title" in response.data
+    assert b"test <mark>body</mark>" in response.data
+    match = re.search(r'<h1><a href="([^"]+)"', response.data.decode())
+    link = match.group(1).replace("&amp;", "&")
+    assert link.endswith("before_oid=2#post-1")
+    assert b"test title" in client.get(link).data
+
+
+def test_search_escapes_post_text(app, client, auth):
+    auth.login()
+    client.post(
+        "/create",
+        data={"title": "<script>", "body": "<b>needle</b> & more"},
+    )
+    response = client.get("/search", query_string={"q": "needle"})
+    assert b"<script>" not in response.data
+    assert b"&lt;b&gt;<mark>needle</mark>&lt;/b&gt; &amp; more" in (
+        response.data
+    )
+
+
+def test_search_without_matches(client):
+    response = client.get("/search", query_string={"q": "nothing here"})
+    assert b"No posts match." in response.data
+    assert b"No posts match." not in client.get("/search").data
+
+
+def test_search_is_paginated(app, client):
+    app.config["POSTS_PER_PAGE"] = 2
+    add_posts(app, 3)
+    response = client.get("/search", query_string={"q": "paged"})
+    assert response.data.count(b"<mark>paged</mark>") == 2
+    more_url = get_link(response.data, "older")
+    response = client.get(more_url)
+    assert response.data.count(b"<mark>paged</mark>") == 1
+    assert b'class="older"' not in response.data
+
+
+def test_search_rejects_bad_cursor(client):
+    response = client.get(
+        "/search", query_string={"q": "body", "after_rank": "x"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,99 @@
+from datetime import datetime
+import io
+import json
+
+import pytest
+
+from shrikenet import data_transfer
+from shrikenet.adapters.memory import Memory
+from shrikenet.entities.app_user import AppUser
+from shrikenet.entities.post import Post
+
+
+@pytest.fixture
+def source():
+    db = Memory()
+    db.open()
+    for index in range(1, 4):
+        app_user = AppUser(
+            f"user{index}",
+            f"User {index}",
+            "hash",
+            oid=db.get_next_app_user_oid(),
+            last_password_failure_time=datetime(2024, 2, index, 8, 30),
+        )
+        db.add_app_user(app_user)
+    for index in range(1, 6):
+        post = Post(
+            f"title {index}",
+            f"body {index}",
+            oid=db.get_next_post_oid(),
+            author_oid=index % 3 + 1,
+            created_time=datetime(2024, 3, index),
+        )
+        db.add_post(post)
+    db.commit()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def target():
+    db = Memory()
+    db.open()
+    yield db
+    db.close()
+
+
+def export_to_text(db, batch_size=2, progress=None):
+    output_file = io.StringIO()
+    counts = data_transfer.export_data(
+        db, output_file, batch_size, progress
+    )
+    return counts, output_file.getvalue()
+
+
+def test_export_writes_one_record_per_line(source):
+    counts, text = export_to_text(source)
+    records = [json.loads(line) for line in text.splitlines()]
+    assert counts == {"app_user": 3, "post": 5}
+    assert [record["type"] for record in records] == ["app_user"] * 3 + [
+        "post"
+    ] * 5
+    assert records[0]["last_password_failure_time"] == (
+        "2024-02-01T08:30:00.000000"
+    )
+    assert records[3]["created_time"] == "2024-03-05T00:00:00.000000"
+
+
+def test_export_reports_progress_per_batch(source):
+    totals = []
+    export_to_text(source, batch_size=3, progress=totals.append)
+    assert totals == [3, 6]
+
+
+def test_import_round_trips_export(source, target):
+    _, text = export_to_text(source)
+    counts = data_transfer.import_data(target, io.StringIO(text), 2)
+    target.rollback()  # the import committed, so nothing is lost
+    assert counts == {"app_user": 3, "post": 5}
+    assert target.get_app_users_page() == source.get_app_users_page()
+    assert target.get_posts() == source.get_posts()
+    assert target.get_posts()[0].author_username == "user3"
+
+
+def test_import_rolls_back_on_bad_line(source, target):
+    _, text = export_to_text(source)
+    lines = text.splitlines()
+    lines.insert(4, '{"type": "comment", "oid": 1}')
+    regex = "can not import line 5, reason: unknown record type 'comment'"
+    with pytest.raises(ValueError, match=regex):
+        data_transfer.import_data(target, io.StringIO("\n".join(lines)), 2)
+    assert target.get_app_user_count() == 0
+    assert target.get_post_count() == 0
+
+
+def test_import_rejects_invalid_json(target):
+    regex = "can not import line 1, reason: Expecting value"
+    with pytest.raises(ValueError, match=regex):
+        data_transfer.import_data(target, io.StringIO("not json\n"))
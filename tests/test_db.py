@@ -1,5 +1,16 @@
+import sqlite3
+
 import pytest
-from shrikenet.db import get_services
+
+from shrikenet import create_app
+from shrikenet.adapters.buffered_log import BufferedLogEntryWriter
+from shrikenet.adapters.login_throttle import (
+    MemoryLoginThrottle,
+    SQLiteLoginThrottle,
+)
+from shrikenet.adapters.werkzeug import WerkzeugAdapter
+from shrikenet.db import get_services, load_class
+from shrikenet.entities.exceptions import DatastoreError
 
 
 def test_get_close_storage_provider(app):
@@ -13,6 +24,58 @@ def test_get_close_storage_provider(app):
     assert "outside of application context" in str(excinfo.value)
 
 
+def test_services_built_on_first_use(app):
+    with app.app_context():
+        services = get_services()
+        assert not services.is_created("storage_provider")
+        storage_provider = services.storage_provider
+        assert services.is_created("storage_provider")
+        assert services.storage_provider is storage_provider
+        assert not services.is_created("crypto_provider")
+
+
+def test_unused_storage_provider_not_opened(app, client, monkeypatch):
+    opened = []
+    storage_class = load_class("shrikenet.adapters.sqlite", "SQLiteAdapter")
+    original_open = storage_class.open
+
+    def recording_open(self):
+        opened.append(self)
+        original_open(self)
+
+    monkeypatch.setattr(storage_class, "open", recording_open)
+    assert client.get("/hello").status_code == 200
+    assert opened == []
+    assert client.get("/").status_code == 200
+    assert len(opened) == 1
+    assert not opened[0].is_open
+
+
+def test_provider_classes_looked_up_once(app):
+    load_class.cache_clear()
+    with app.app_context():
+        get_services().text_transformer
+    with app.app_context():
+        get_services().text_transformer
+    assert load_class.cache_info().misses == 1
+
+
+def test_login_throttle_shared_by_requests(app):
+    with app.app_context():
+        login_throttle = get_services().login_throttle
+    assert isinstance(login_throttle, MemoryLoginThrottle)
+    with app.app_context():
+        assert get_services().login_throttle is login_throttle
+
+
+def test_login_throttle_in_sqlite_when_configured(app, tmp_path):
+    app.config["LOGIN_THROTTLE_DB"] = str(tmp_path / "throttle.db")
+    with app.app_context():
+        login_throttle = get_services().login_throttle
+        assert isinstance(login_throttle, SQLiteLoginThrottle)
+        login_throttle.close()
+
+
 def test_init_db_command(runner, monkeypatch):
     class Recorder(object):
         called = False
@@ -24,3 +87,114 @@ def test_init_db_command(runner, monkeypatch):
     result = runner.invoke(args=["init-db"])
     assert "Initialized" in result.output
     assert Recorder.called
+
+
+def test_upgrade_db_command_reports_current(runner):
+    result = runner.invoke(args=["upgrade-db"])
+    assert "Database schema is current" in result.output
+
+
+def test_export_then_import_data_commands(app, runner, tmp_path):
+    export_file = tmp_path / "export.jsonl"
+    with app.app_context():
+        db = get_services().storage_provider
+        user_count = db.get_app_user_count()
+        posts = db.get_posts()
+
+    result = runner.invoke(args=["export-data", str(export_file)])
+    assert result.exit_code == 0
+    assert f"Exported {user_count} app users and {len(posts)} posts." in (
+        result.output
+    )
+
+    runner.invoke(args=["init-db"])
+    result = runner.invoke(args=["import-data", str(export_file)])
+    assert result.exit_code == 0
+    assert f"Imported {user_count} app users and {len(posts)} posts." in (
+        result.output
+    )
+    with app.app_context():
+        assert get_services().storage_provider.get_posts() == posts
+
+
+def test_import_data_command_reports_failure(runner, tmp_path):
+    import_file = tmp_path / "import.jsonl"
+    import_file.write_text('{"type": "comment"}\n')
+    result = runner.invoke(args=["import-data", str(import_file)])
+    assert result.exit_code == 1
+    assert "Import failed, nothing stored." in result.output
+
+
+def test_db_timing_headers_in_debug(app, client):
+    app.config["STORAGE_PROVIDER_INSTRUMENT"] = True
+    app.debug = True
+    response = client.get("/")
+    assert float(response.headers["X-DB-Time"]) > 0
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "statements" in response.headers["Server-Timing"]
+
+
+def test_no_db_timing_headers_without_debug(app, client):
+    app.config["STORAGE_PROVIDER_INSTRUMENT"] = True
+    response = client.get("/")
+    assert "X-DB-Time" not in response.headers
+    assert "Server-Timing" not in response.headers
+
+
+def test_log_entry_writer_buffers_for_shared_storage(app):
+    with app.app_context():
+        log_entry_writer = get_services().log_entry_writer
+    assert isinstance(log_entry_writer, BufferedLogEntryWriter)
+    assert log_entry_writer.synchronous
+    log_entry_writer.close()
+
+
+def test_log_entries_written_inline_for_memory_storage(app):
+    app.config["STORAGE_PROVIDER_MODULE"] = "shrikenet.adapters.memory"
+    app.config["STORAGE_PROVIDER_CLASS"] = "Memory"
+    with app.app_context():
+        assert get_services().log_entry_writer is None
+
+
+def test_default_provider_classes_load():
+    load_class.cache_clear()
+    app = create_app({"TESTING": True})
+    assert (
+        load_class(
+            app.config["CRYPTO_PROVIDER_MODULE"],
+            app.config["CRYPTO_PROVIDER_CLASS"],
+        )
+        is WerkzeugAdapter
+    )
+
+
+def test_unknown_provider_class_fails_on_first_use(caplog):
+    app = create_app(
+        {"TESTING": True, "TEXT_TRANSFORMER_CLASS": "NoSuchAdapter"}
+    )
+    assert "NoSuchAdapter" in caplog.text
+    with app.app_context():
+        with pytest.raises(AttributeError):
+            get_services().text_transformer
+
+
+def test_out_of_date_schema_refused_until_upgraded(app, runner):
+    connection = sqlite3.connect(app.config["STORAGE_PROVIDER_DB"])
+    connection.execute("PRAGMA user_version = 4")
+    connection.close()
+    with app.app_context():
+        with pytest.raises(DatastoreError) as excinfo:
+            get_services().storage_provider
+    assert "flask upgrade-db" in str(excinfo.value)
+    result = runner.invoke(args=["upgrade-db"])
+    assert "from version 4 to 5" in result.output
+    with app.app_context():
+        assert get_services().storage_provider.get_schema_version() == 5
+
+
+def test_rules_cache_shared_with_storage_provider(app):
+    with app.app_context():
+        services = get_services()
+        rules_cache = services.rules_cache
+        assert not services.is_created("storage_provider")
+        assert rules_cache is services.storage_provider.rules_cache
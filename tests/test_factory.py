@@ -1,3 +1,5 @@
+from flask import request
+
 from shrikenet import create_app
 
 
@@ -9,3 +11,29 @@ from shrikenet import create_app
 def test_hello(client):
     response = client.get("/hello")
     assert response.data == b"Hello, World!"
+
+
+def test_client_address_from_trusted_proxy():
+    app = create_app({"TESTING": True, "TRUSTED_PROXY_COUNT": 1})
+
+    @app.route("/remote_addr")
+    def remote_addr():
+        return request.remote_addr
+
+    response = app.test_client().get(
+        "/remote_addr", headers={"X-Forwarded-For": "10.1.2.3"}
+    )
+    assert response.data == b"10.1.2.3"
+
+
+def test_forwarded_address_ignored_by_default():
+    app = create_app({"TESTING": True})
+
+    @app.route("/remote_addr")
+    def remote_addr():
+        return request.remote_addr
+
+    response = app.test_client().get(
+        "/remote_addr", headers={"X-Forwarded-For": "10.1.2.3"}
+    )
+    assert response.data == b"127.0.0.1"
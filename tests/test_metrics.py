@@ -0,0 +1,44 @@
+import pytest
+
+from shrikenet.entities.metrics import CONTENT_TYPE
+
+
+@pytest.fixture
+def metrics_app(app):
+    app.config["METRICS_ENABLED"] = True
+    app.config["STORAGE_PROVIDER_INSTRUMENT"] = True
+    return app
+
+
+def test_metrics_not_found_when_disabled(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_exposed_when_enabled(metrics_app, client, auth):
+    client.get("/")
+    auth.login()
+    client.get("/api/hello-get")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type == CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert (
+        'shrikenet_request_seconds_count{endpoint="blog.index"} 1' in text
+    )
+    assert 'shrikenet_logins_total{tag="user_login"} 1.0' in text
+    assert 'shrikenet_token_verifications_total{error_code="1"} 1.0' in text
+    assert (
+        'shrikenet_password_hash_seconds_count{operation="check"}' in text
+    )
+    assert "shrikenet_markdown_render_seconds_count" in text
+    assert "shrikenet_sql_request_seconds_count" in text
+    assert 'shrikenet_sql_statements_total{slow="false"}' in text
+
+
+def test_metrics_shared_through_directory(metrics_app, client, tmp_path):
+    metrics_app.config["METRICS_DIR"] = str(tmp_path)
+    client.get("/")
+    text = client.get("/metrics").get_data(as_text=True)
+    metrics_app.extensions["metrics"].close()
+    assert 'shrikenet_request_seconds_count{endpoint="blog.index"}' in text
+    assert list(tmp_path.glob("metrics_*.json"))
@@ -1,8 +1,11 @@
 from datetime import datetime, timedelta
 
+from shrikenet.adapters.buffered_log import BufferedLogEntryWriter
+from shrikenet.adapters.sqlite import SQLiteAdapter
 from shrikenet.entities.log_entry_tag import LogEntryTag
 from shrikenet.usecases.login_to_system import LoginToSystem
 from tests.usecases.login_to_system.setup_class import (
+    DATABASE,
     SetupClass,
     GOOD_USER_USERNAME,
     GOOD_USER_PASSWORD,
@@ -67,3 +70,53 @@ class TestGoodCredentialPaths(SetupClass):
         self.db.rollback()
         user = self.db.get_app_user_by_username(GOOD_USER_USERNAME)
         assert user.ongoing_password_failure_count == 0
+
+    def test_successful_login_recorded_by_log_entry_writer(self):
+        user = self.create_and_store_user("max", "some_password")
+        time_before = datetime.now() - timedelta(seconds=1)
+        self.services.log_entry_writer = BufferedLogEntryWriter(
+            lambda: SQLiteAdapter(DATABASE), max_seconds=60
+        )
+        login_to_system = LoginToSystem(self.services)
+        login_to_system.run("max", "some_password", "1.2.3.4")
+        assert self.services.log_entry_writer.get_buffered_count() == 1
+        self.services.log_entry_writer.close()
+        self.db.rollback()
+        expected_text = (
+            "App user (username=max) from 1.2.3.4 "
+            "successfully logged in."
+        )
+        self.validate_log_entry_recorded(
+            time_before=time_before,
+            app_user_oid=user.oid,
+            tag=LogEntryTag.user_login,
+            text=expected_text,
+            usecase_tag="login_to_system",
+        )
+
+    def test_user_update_committed_before_log_entry_writer_stores(self):
+        user = self.create_good_user()
+        user.ongoing_password_failure_count = 2
+        self.db.update_app_user(user)
+        self.db.commit()
+        self.services.log_entry_writer = BufferedLogEntryWriter(
+            lambda: SQLiteAdapter(DATABASE), synchronous=True
+        )
+        login_to_system = LoginToSystem(self.services)
+        login_to_system.run(
+            GOOD_USER_USERNAME, GOOD_USER_PASSWORD, GOOD_IP_ADDRESS
+        )
+        assert self.services.log_entry_writer.get_buffered_count() == 0
+        assert self.services.log_entry_writer.written_count == 1
+        self.services.log_entry_writer.close()
+
+    def test_successful_login_runs_minimum_statements(self):
+        self.create_good_user()
+        login_to_system = LoginToSystem(self.services)
+        count = self.db.statement_count
+        result = login_to_system.run(
+            GOOD_USER_USERNAME, GOOD_USER_PASSWORD, GOOD_IP_ADDRESS
+        )
+        assert not result.has_failed
+        # one user lookup, then BEGIN, the log entry INSERT and COMMIT
+        assert self.db.statement_count - count == 4
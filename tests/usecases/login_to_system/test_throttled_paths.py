@@ -0,0 +1,170 @@
+from shrikenet.adapters.login_throttle import MemoryLoginThrottle
+from shrikenet.entities.log_entry_tag import LogEntryTag
+from shrikenet.entities.rules_cache import RulesCache
+from shrikenet.entities.services import LazyServices
+from shrikenet.usecases.login_to_system import LoginToSystem
+from tests.usecases.login_to_system.setup_class import (
+    GOOD_IP_ADDRESS,
+    GOOD_USER_PASSWORD,
+    GOOD_USER_USERNAME,
+    SetupClass,
+)
+
+THROTTLED_MESSAGE = (
+    "Login attempt failed. Too many attempts, try again later."
+)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestThrottledPaths(SetupClass):
+
+    def setup_method(self, method):
+        super().setup_method(method)
+        self.clock = FakeClock()
+        self.services.login_throttle = MemoryLoginThrottle(clock=self.clock)
+        self.db.rules_cache = RulesCache(30, clock=self.clock)
+        self.services.rules_cache = self.db.rules_cache
+        rules = self.db.get_rules()
+        rules.login_throttle_ip_attempts = 3
+        rules.login_throttle_username_attempts = 2
+        rules.login_throttle_window_seconds = 60
+        self.db.save_rules(rules)
+        self.db.commit()
+
+    def run_login(self, username, password, ip_address=GOOD_IP_ADDRESS):
+        login_to_system = LoginToSystem(self.services)
+        return login_to_system.run(username, password, ip_address)
+
+    def get_log_entries(self, tag):
+        sql = "SELECT text FROM log_entry WHERE tag = ? ORDER BY oid"
+        rows = self.db.connection.execute(sql, [tag]).fetchall()
+        return [row[0] for row in rows]
+
+    def test_login_fails_over_username_limit(self):
+        self.create_good_user()
+        self.run_login(GOOD_USER_USERNAME, "wrong", "10.0.0.1")
+        self.run_login(GOOD_USER_USERNAME, "wrong", "10.0.0.2")
+        result = self.run_login(
+            GOOD_USER_USERNAME, GOOD_USER_PASSWORD, "10.0.0.3"
+        )
+        assert result.has_failed
+        assert result.message == THROTTLED_MESSAGE
+
+    def test_login_fails_over_ip_address_limit(self):
+        self.create_good_user()
+        for index in range(3):
+            self.run_login(f"unknown{index}", "password")
+        result = self.run_login(GOOD_USER_USERNAME, GOOD_USER_PASSWORD)
+        assert result.message == THROTTLED_MESSAGE
+        result = self.run_login(
+            GOOD_USER_USERNAME, GOOD_USER_PASSWORD, "10.0.0.1"
+        )
+        assert not result.has_failed
+
+    def test_throttled_attempt_skips_lookup_and_hashing(self, monkeypatch):
+        self.create_good_user()
+        self.run_login(GOOD_USER_USERNAME, "wrong")
+        self.run_login(GOOD_USER_USERNAME, "wrong")
+
+        def fail(*args):
+            raise AssertionError("throttled attempt reached the database")
+
+        monkeypatch.setattr(self.db, "find_app_user_by_username", fail)
+        monkeypatch.setattr(self.crypto, "hash_matches_string", fail)
+        result = self.run_login(GOOD_USER_USERNAME, GOOD_USER_PASSWORD)
+        assert result.message == THROTTLED_MESSAGE
+        user = self.db.get_app_user_by_username(GOOD_USER_USERNAME)
+        assert user.ongoing_password_failure_count == 2
+
+    def test_throttled_attempt_runs_no_statements(self):
+        for index in range(3):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        statement_count = self.db.statement_count
+        result = self.run_login("mrunknown", "password", "10.0.0.9")
+        assert result.message == THROTTLED_MESSAGE
+        assert self.db.statement_count == statement_count
+
+    def test_throttled_attempt_opens_no_connection(self):
+        for index in range(3):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        created = []
+
+        def get_storage_provider():
+            created.append("storage_provider")
+            return self.db
+
+        services = LazyServices(
+            {
+                "storage_provider": get_storage_provider,
+                "login_throttle": lambda: self.services.login_throttle,
+                "rules_cache": lambda: self.services.rules_cache,
+            }
+        )
+        result = LoginToSystem(services).run(
+            "mrunknown", "password", "10.0.0.9"
+        )
+        assert result.message == THROTTLED_MESSAGE
+        assert created == []
+        assert not services.is_created("storage_provider")
+
+    def test_limit_changes_saved_here_apply_at_once(self):
+        for index in range(3):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        rules = self.db.get_rules()
+        rules.login_throttle_username_attempts = 100
+        self.db.save_rules(rules)
+        self.db.commit()
+        # a second refills under 1 attempt at the old limit, 1.7 at the new
+        self.clock.now += 1
+        result = self.run_login("mrunknown", "password", "10.0.0.9")
+        assert result.message == "Login attempt failed."
+
+    def test_limit_changes_saved_elsewhere_apply_once_rules_expire(self):
+        for index in range(3):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        self.db.connection.executescript("""
+            UPDATE rule SET tag_value = '100'
+            WHERE tag = 'login_throttle_username_attempts';
+            UPDATE change_counter SET value = value + 1 WHERE tag = 'rule';
+            """)
+        result = self.run_login("mrunknown", "password", "10.0.0.9")
+        assert result.message == THROTTLED_MESSAGE
+        self.clock.now += 31
+        for index in range(5):
+            result = self.run_login(
+                "mrunknown", "password", f"10.0.1.{index}"
+            )
+            assert result.message == "Login attempt failed."
+
+    def test_rejections_recorded_once_per_run(self):
+        for index in range(10):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        assert len(self.get_log_entries(LogEntryTag.unknown_user)) == 2
+        assert self.get_log_entries(LogEntryTag.login_throttled) == [
+            "Login attempts (username=mrunknown) from 10.0.0.2 exceeded "
+            "2 per 60 seconds and are throttled."
+        ]
+
+    def test_end_of_rejections_recorded_with_count(self):
+        for index in range(5):
+            self.run_login("mrunknown", "password", f"10.0.0.{index}")
+        self.clock.now += 60
+        self.run_login("mrunknown", "password")
+        assert self.get_log_entries(LogEntryTag.login_throttled)[-1] == (
+            "Login attempts (username=mrunknown) are no longer throttled, "
+            "3 were rejected."
+        )
+
+    def test_no_throttle_without_service(self):
+        self.services.login_throttle = None
+        for _ in range(5):
+            result = self.run_login("mrunknown", "password")
+        assert result.message == "Login attempt failed."